@@ -0,0 +1,155 @@
+import os
+from multiprocessing import Pool
+
+from drunkbot import Drunkbot
+from drunkbot_engine import DrunkbotEngine
+
+
+class BatchResult():
+    """
+    The class BatchResult describes the outcome of one run of a batch.
+
+    See run_batch()
+    """
+
+    def __init__(self, parameter, positions, broken, quiescent_turn, summary):
+        """
+        Creates a new batch result.
+
+        Parameter parameter is the value that the scenario was created with: object
+
+        Parameter positions contains the final (x, y) location of each robot in turn order: list
+
+        Parameter broken is the number of broken robots at the end of the run: int
+
+        Parameter quiescent_turn is the number of full turns after which no robot could act any more, or None if
+        some robot could still act at the end of the run: int
+
+        Parameter summary is the summary of the run: RunSummary
+        """
+        self.parameter = parameter              # fixed value
+        self.positions = positions              # fixed value
+        self.broken = broken                    # fixed value
+        self.quiescent_turn = quiescent_turn    # fixed value
+        self.summary = summary                  # fixed value
+
+
+    def get_parameter(self):
+        """
+        Returns the value that the scenario was created with: object
+        """
+        return self.parameter
+
+
+    def get_positions(self):
+        """
+        Returns the final (x, y) location of each robot in turn order: list
+        """
+        return self.positions
+
+
+    def get_broken(self):
+        """
+        Returns the number of broken robots at the end of the run: int
+        """
+        return self.broken
+
+
+    def get_quiescent_turn(self):
+        """
+        Returns the number of full turns after which no robot could act any more, or None if some robot could
+        still act at the end of the run: int
+        """
+        return self.quiescent_turn
+
+
+    def get_summary(self):
+        """
+        Returns the summary of the run: RunSummary
+        """
+        return self.summary
+
+
+def run_scenario(scenario, parameter, turns):
+    """
+    Creates a world with the given scenario function and runs it for the given number of full turns, or until no
+    robot can act any more. Worlds populated only by drunkbots are run with a DrunkbotEngine, which gives exactly
+    the same results.
+
+    Parameter scenario is a function that creates a world from the given parameter: function
+
+    Parameter parameter is the value to pass to the scenario function, e.g. a random seed: object
+
+    Parameter turns is the maximum number of full turns to run: int
+
+    Returns the outcome of the run: BatchResult
+    """
+    world = scenario(parameter)
+    quiescent = lambda world: not world.active
+    if world.robots and all(isinstance(robot.get_brain(), Drunkbot) for robot in world.robots):
+        summary = DrunkbotEngine(world).run(turns, stop_when=quiescent)
+    else:
+        summary = world.run(turns, stop_when=quiescent)
+    if quiescent(world):
+        quiescent_turn = summary.get_turns()
+    else:
+        quiescent_turn = None
+    positions = [(robot.get_location().get_x(), robot.get_location().get_y()) for robot in world.robots]
+    broken = sum(1 for robot in world.robots if robot.is_broken())
+    return BatchResult(parameter, positions, broken, quiescent_turn, summary)
+
+
+def _run_task(task):
+    """
+    Runs one task of a batch in a worker process.
+
+    Parameter task is a tuple of the scenario function, its parameter and the number of turns: tuple
+
+    Returns the outcome of the run: BatchResult
+    """
+    return run_scenario(*task)
+
+
+def run_batch(scenario, parameters, turns, workers=None, chunksize=None):
+    """
+    Runs a scenario once for each of the given parameters, e.g. for a range of random seeds, using a pool of
+    worker processes. The results are yielded as they become available, but always in the order of the
+    parameters. Each run only depends on its own parameter, so the results are the same whatever the number
+    of workers.
+
+    Parameter scenario is a module level function that creates a world from a parameter. It must be picklable
+    so that it can be sent to the worker processes: function
+
+    Parameter parameters contains the parameters to run the scenario with: list
+
+    Parameter turns is the maximum number of full turns of each run: int
+
+    Parameter workers is the number of worker processes, by default the number of processors. With one worker
+    the runs are done in this process: int
+
+    Parameter chunksize is the number of runs sent to a worker at a time, by default chosen so that each worker
+    gets about four chunks: int
+
+    Returns a generator of the outcomes of the runs: BatchResult
+    """
+    parameters = list(parameters)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = [(scenario, parameter, turns) for parameter in parameters]
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _run_task(task)
+        return
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (workers * 4))
+    with Pool(workers) as pool:
+        for result in pool.imap(_run_task, tasks, chunksize):
+            yield result
+
+
+if __name__ == "__main__":
+    from scenarios import create_main_world
+
+    for result in run_batch(create_main_world, range(20), 1000):
+        print('seed {}: {} broken, quiescent after {} turns, {}'.format(
+            result.get_parameter(), result.get_broken(), result.get_quiescent_turn(), result.get_summary()))
@@ -0,0 +1,339 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from robotworld import RobotWorld
+from robot import Robot
+from coordinates import Coordinates
+from direction import Direction
+from nosebot import Nosebot
+from scenarios import BRAIN_MIXES, create_benchmark_world, create_navigation_world
+from navigator import Navigator, ReplanningNavigator
+from drunkbot_engine import DrunkbotEngine
+
+
+def create_edge_nosebot_world(size):
+    """
+    Creates a square robot world whose border squares are filled with every other square with a nosebot.
+    The nosebots face along the edge in a clockwise direction so that they keep hugging the edges of the world.
+    Every square they visit is next to the wall border, so the blocked masks of their squares are never empty,
+    and they turn at the corners.
+
+    Parameter size is the width and height of the world in squares: int
+
+    Returns the created world: RobotWorld
+    """
+    world = RobotWorld(size, size)
+    edges = [
+        ([Coordinates(x, 0) for x in range(0, size - 1, 2)], Direction.EAST),
+        ([Coordinates(size - 1, y) for y in range(0, size - 1, 2)], Direction.SOUTH),
+        ([Coordinates(x, size - 1) for x in range(size - 1, 0, -2)], Direction.WEST),
+        ([Coordinates(0, y) for y in range(size - 1, 0, -2)], Direction.NORTH),
+    ]
+    for locations, facing in edges:
+        for location in locations:
+            body = Robot('Nose')
+            body.set_brain(Nosebot(body))
+            world.add_robot(body, location, facing)
+    return world
+
+
+def benchmark_edge_nosebots(size=200, turns=200):
+    """
+    Measures how fast edge-hugging nosebots take their turns. The peak memory use is measured as in
+    run_benchmark, so the results can be saved and compared with save_results and compare_results.
+
+    Parameter size is the width and height of the world in squares: int
+
+    Parameter turns is the number of full turns to run: int
+
+    Returns the results as a dict that can be saved as JSON, see run_benchmark: dict
+    """
+    world = create_edge_nosebot_world(size)
+    robots = world.get_number_of_robots()
+    start = time.perf_counter()
+    for count in range(turns):      # stepper
+        world.next_full_turn()
+    elapsed = time.perf_counter() - start
+    del world
+
+    tracemalloc.start()
+    try:
+        world = create_edge_nosebot_world(size)
+        world.run(1)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'scenario': 'edge-nosebots-{}'.format(size),
+        'robots': robots,
+        'size': size,
+        'turns': turns,
+        'seconds': elapsed,
+        'turns_per_second': turns / elapsed,
+        'robot_turns_per_second': robots * turns / elapsed,
+        'peak_memory_bytes': peak,
+    }
+
+
+ROBOT_COUNTS = (10, 1000, 100000)    # robot counts of the standard suite
+QUICK_ROBOT_COUNTS = (10, 1000)       # robot counts of the quick suite
+ROBOT_TURNS = 300000                  # robot turns run in each benchmark, within the limits of MIN_TURNS and MAX_TURNS
+MIN_TURNS = 3
+MAX_TURNS = 1000
+
+
+def get_suite(robot_counts=ROBOT_COUNTS):
+    """
+    Returns the standard benchmark scenarios: every brain mix of scenarios.BRAIN_MIXES with each of the given
+    robot counts, in an open and in a walled world.
+
+    Parameter robot_counts contains the numbers of robots: tuple
+
+    Returns the scenarios as (brains, robots, walled) tuples: list
+    """
+    return [(brains, robots, walled) for robots in robot_counts for brains in BRAIN_MIXES for walled in (False, True)]
+
+
+def run_benchmark(brains, robots, walled, turns=None):
+    """
+    Measures a scenario created with scenarios.create_benchmark_world.
+
+    The world is created and run without tracing memory, so that the timings are not disturbed. The peak
+    memory use is then measured with tracemalloc by creating the world again and running one full turn.
+
+    Parameter brains is the brain mix, one of scenarios.BRAIN_MIXES: string
+
+    Parameter robots is the number of robots: int
+
+    Parameter walled is True for a world with walls: boolean
+
+    Parameter turns is the number of full turns to run, by default ROBOT_TURNS robot turns' worth: int
+
+    Returns the results as a dict that can be saved as JSON: dict
+    """
+    if turns is None:
+        turns = max(MIN_TURNS, min(MAX_TURNS, ROBOT_TURNS // robots))
+    start = time.perf_counter()
+    world = create_benchmark_world(robots, brains, walled)
+    construction = time.perf_counter() - start
+    active = world.get_number_of_active_robots()
+    start = time.perf_counter()
+    world.run(turns)
+    elapsed = time.perf_counter() - start
+    active_after = world.get_number_of_active_robots()
+    del world
+
+    tracemalloc.start()
+    try:
+        world = create_benchmark_world(robots, brains, walled)
+        world.run(1)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'scenario': '{}-{}-{}'.format(brains, robots, 'walled' if walled else 'open'),
+        'brains': brains,
+        'robots': robots,
+        'walled': walled,
+        'size': world.get_width(),
+        'active_robots': active,            # robots that could act at the start, broken and stuck ones skip turns
+        'active_robots_after': active_after,
+        'turns': turns,
+        'seconds': elapsed,
+        'construction_seconds': construction,
+        'turns_per_second': turns / elapsed,
+        'robot_turns_per_second': robots * turns / elapsed,
+        'peak_memory_bytes': peak,
+    }
+
+
+def run_suite(suite, output=sys.stdout):
+    """
+    Runs the given benchmark scenarios and prints a line for each of them.
+
+    Parameter suite contains the scenarios as (brains, robots, walled) tuples, see get_suite: list
+
+    Parameter output is the stream to print to, or None to print nothing: file
+
+    Returns the results of the scenarios, see run_benchmark: list
+    """
+    results = []
+    for brains, robots, walled in suite:
+        result = run_benchmark(brains, robots, walled)
+        results.append(result)
+        if output is not None:
+            print('{:28} {:10.1f} turns/s {:12.0f} robot turns/s {:9.3f} s to create {:9.1f} MiB'.format(
+                result['scenario'], result['turns_per_second'], result['robot_turns_per_second'],
+                result['construction_seconds'], result['peak_memory_bytes'] / 2 ** 20), file=output)
+    return results
+
+
+def save_results(results, path):
+    """
+    Saves benchmark results as JSON together with the versions of Python and the platform.
+
+    Parameter results contains the results of the scenarios, see run_benchmark: list
+
+    Parameter path is the name of the file: string
+    """
+    document = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(path, 'w') as file:
+        json.dump(document, file, indent=2)
+
+
+def compare_results(results, path, output=sys.stdout):
+    """
+    Prints the speed of the given results relative to earlier results saved with save_results, so that
+    regressions between versions are visible. Only the scenarios found in both are compared.
+
+    Parameter results contains the new results, see run_benchmark: list
+
+    Parameter path is the name of the file with the earlier results: string
+
+    Parameter output is the stream to print to: file
+
+    Returns the ratio of new to old robot turns per second by scenario: dict
+    """
+    with open(path) as file:
+        earlier = {result['scenario']: result for result in json.load(file)['results']}
+    ratios = {}
+    for result in results:
+        old = earlier.get(result['scenario'])
+        if old is None:
+            continue
+        ratio = result['robot_turns_per_second'] / old['robot_turns_per_second']
+        ratios[result['scenario']] = ratio
+        print('{:28} {:6.2f}x robot turns/s {:6.2f}x memory'.format(
+            result['scenario'], ratio, result['peak_memory_bytes'] / max(1, old['peak_memory_bytes'])), file=output)
+    return ratios
+
+
+def benchmark_navigation(size=100, obstacles=300, seeds=3, max_turns=1000):
+    """
+    Compares the incremental replanning of Navigator to planning from scratch on every turn with
+    ReplanningNavigator, in worlds created with scenarios.create_navigation_world. Only the time spent in the
+    brains of the navigating robots is measured, using the profiler of the world.
+
+    Parameter size is the width and height of the worlds in squares: int
+
+    Parameter obstacles is the number of moving nosebots in each world: int
+
+    Parameter seeds is the number of worlds: int
+
+    Parameter max_turns is the number of full turns after which a navigator that has not arrived is given up on: int
+
+    Returns the results by brain class name, dicts with the keys 'turns', 'seconds', 'seconds_per_turn',
+    'expansions' and 'arrived': dict
+    """
+    results = {}
+    for brain_class in (Navigator, ReplanningNavigator):
+        totals = {'turns': 0, 'seconds': 0.0, 'expansions': 0, 'arrived': 0}
+        for seed in range(seeds):
+            world, body, distance = create_navigation_world(size, brain_class, obstacles, seed)
+            goal = body.get_brain().get_goal()
+            world.start_profiling()
+            turns = 0
+            while body.get_location() != goal and turns < max_turns:
+                world.next_full_turn()
+                turns += 1
+            report = world.stop_profiling()['brains'][brain_class.__name__]
+            totals['turns'] += report['calls']
+            totals['seconds'] += report['seconds']
+            totals['expansions'] += body.get_brain().get_expansions()
+            totals['arrived'] += body.get_location() == goal
+        totals['seconds_per_turn'] = totals['seconds'] / max(1, totals['turns'])
+        results[brain_class.__name__] = totals
+    return results
+
+
+ENGINE_CASES = ((10, 1000), (1000, 300), (10000, 20), (100000, 20))    # robots and full turns of the engine benchmark
+
+
+def benchmark_drunkbot_engine(cases=ENGINE_CASES, walled=False):
+    """
+    Compares running drunkbot worlds created with scenarios.create_benchmark_world with a DrunkbotEngine to
+    running them with RobotWorld.run. Both runs start from identical worlds, and the engine must give the same
+    results.
+
+    Parameter cases contains the numbers of robots and full turns to run as (robots, turns) tuples: tuple
+
+    Parameter walled is True for worlds with walls: boolean
+
+    Returns the results of the cases as dicts with the keys 'robots', 'turns', 'run_seconds', 'engine_seconds',
+    'speedup' and 'active_robots_after': list
+
+    Raises ValueError if the engine gives different results than RobotWorld.run.
+    """
+    results = []
+    for robots, turns in cases:
+        seconds = []
+        summaries = []
+        for run in (RobotWorld.run, lambda world, turns: DrunkbotEngine(world).run(turns)):
+            world = create_benchmark_world(robots, 'drunkbot', walled)
+            start = time.perf_counter()
+            summaries.append(str(run(world, turns)))
+            seconds.append(time.perf_counter() - start)
+        if summaries[0] != summaries[1]:
+            raise ValueError('the engine gave {} instead of {}'.format(summaries[1], summaries[0]))
+        results.append({
+            'robots': robots,
+            'turns': turns,
+            'run_seconds': seconds[0],
+            'engine_seconds': seconds[1],
+            'speedup': seconds[0] / seconds[1],
+            'active_robots_after': world.get_number_of_active_robots(),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs the standard robot world benchmarks.')
+    parser.add_argument('--quick', action='store_true', help='leave out the largest robot counts')
+    parser.add_argument('--output', help='save the results as JSON in this file')
+    parser.add_argument('--compare', help='compare the results to earlier results saved with --output')
+    parser.add_argument('--edge', action='store_true',
+                        help='run only the edge nosebot benchmark, which can be saved and compared as well')
+    parser.add_argument('--navigation', action='store_true', help='run only the navigation benchmark')
+    parser.add_argument('--engine', action='store_true',
+                        help='run only the benchmark of the drunkbot engine against RobotWorld.run')
+    arguments = parser.parse_args()
+
+    if arguments.navigation:
+        for name, result in benchmark_navigation().items():
+            print('{:20} {:6} turns {:8.1f} us/turn {:9} expansions {} arrived'.format(
+                name, result['turns'], 1e6 * result['seconds_per_turn'], result['expansions'], result['arrived']))
+        return
+    if arguments.engine:
+        for result in benchmark_drunkbot_engine():
+            print('{:7} robots {:5} turns {:9.3f} s run {:9.3f} s engine {:6.2f}x {:7} active after'.format(
+                result['robots'], result['turns'], result['run_seconds'], result['engine_seconds'],
+                result['speedup'], result['active_robots_after']))
+        return
+    if arguments.edge:
+        result = benchmark_edge_nosebots()
+        results = [result]
+        print('{:28} {:10.1f} turns/s {:12.0f} robot turns/s {:9.1f} MiB'.format(
+            result['scenario'], result['turns_per_second'], result['robot_turns_per_second'],
+            result['peak_memory_bytes'] / 2 ** 20))
+    else:
+        results = run_suite(get_suite(QUICK_ROBOT_COUNTS if arguments.quick else ROBOT_COUNTS))
+    if arguments.output:
+        save_results(results, arguments.output)
+    if arguments.compare:
+        compare_results(results, arguments.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,15 @@ class Coordinates():
     As is common in programming environments, the x values
     increase towards the right (east) and the y values
     increase downwards (south). A coordinate object is immutable
-    after creation.
+    after creation. Equal coordinate pairs have equal hashes, so
+    coordinates can be used as dictionary keys and set members.
+
+    Robot worlds intern the coordinates of their squares, see
+    RobotWorld.get_coordinates and RobotWorld.get_neighbor.
     """
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         """
         Creates a new coordinate pair.
@@ -18,8 +24,17 @@ class Coordinates():
 
         Parameter y: int
         """
-        self.x = x    # fixed value
-        self.y = y    # fixed value
+        object.__setattr__(self, 'x', x)    # fixed value
+        object.__setattr__(self, 'y', y)    # fixed value
+
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Coordinates are immutable')
+
+
+    def __reduce__(self):
+        # Coordinates can not be restored attribute by attribute, since they are immutable.
+        return (Coordinates, (self.x, self.y))
 
 
     def get_x(self):
@@ -40,11 +55,11 @@ class Coordinates():
         """
         Returns the coordinates that are next to these ones, in the given direction.
 
-        Parameter direction: tuple
+        Parameter direction: tuple or int (a direction code)
 
         Returns the neighboring coordinates (Coordinates)
         """
-        return self.get_relative(direction, 1)
+        return Coordinates(self.x + Direction.get_x_step(direction), self.y + Direction.get_y_step(direction))
 
 
     def get_relative(self, new_direction, distance):
@@ -52,7 +67,7 @@ class Coordinates():
         Returns the coordinates that are a given distance from these coordinates, in the given direction.  E.g. if these
         coordinates are (2, 2), and the parameters are direction.EAST and 3, the result is (5, 2).
 
-        Parameter direction: tuple
+        Parameter direction: tuple or int (a direction code)
 
         Parameter distance: (non-negative) int
 
@@ -62,6 +77,20 @@ class Coordinates():
                            self.get_y() + Direction.get_y_step(new_direction) * distance)
 
 
+    def __eq__(self, other):
+        if not isinstance(other, Coordinates):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y
+
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+
+    def __repr__(self):
+        return 'Coordinates({}, {})'.format(self.x, self.y)
+
+
     def __str__(self):
         """
         Returns a string of the form (X, Y) representing of the coordinate pair
@@ -2,12 +2,47 @@ class Direction():
     """
     These constants represent the main
     compass directions that robots can move in.
+
+    Each direction is a tuple of its x and y steps. The directions also have
+    integer codes from 0 to 3 in clockwise order starting from north, which
+    can be used to index the tables of this class (and other tables, e.g.
+    neighbor offsets) directly. All the methods of this class accept either
+    a direction tuple or a direction code, and the methods that return a
+    direction return one of the same kind as they were given, except get_value,
+    which always returns the tuple.
     """
     NORTH = (0, -1)
     EAST = (1, 0)
     SOUTH = (0, 1)
     WEST = (-1, 0)
 
+    VALUES = (NORTH, EAST, SOUTH, WEST)    # directions by code
+    X_STEPS = (0, 1, 0, -1)                 # x steps by code
+    Y_STEPS = (-1, 0, 1, 0)                 # y steps by code
+    DEGREES = (0, 90, 180, 270)             # degrees by code
+    CLOCKWISE = (1, 2, 3, 0)                # code of the next clockwise direction by code
+    COUNTER_CLOCKWISE = (3, 0, 1, 2)        # code of the next counterclockwise direction by code
+
+    CODES = {NORTH: 0, EAST: 1, SOUTH: 2, WEST: 3}
+
+    # Lookup tables keyed by both the direction tuples and the direction codes
+    _VALUE = {}
+    _X_STEP = {}
+    _Y_STEP = {}
+    _DEGREES = {}
+    _NEXT_CLOCKWISE = {}
+    _NEXT_COUNTER_CLOCKWISE = {}
+    for _code, _direction in enumerate(VALUES):
+        _VALUE[_code] = _VALUE[_direction] = _direction
+        _X_STEP[_code] = _X_STEP[_direction] = X_STEPS[_code]
+        _Y_STEP[_code] = _Y_STEP[_direction] = Y_STEPS[_code]
+        _DEGREES[_code] = _DEGREES[_direction] = DEGREES[_code]
+        _NEXT_CLOCKWISE[_code] = CLOCKWISE[_code]
+        _NEXT_CLOCKWISE[_direction] = VALUES[CLOCKWISE[_code]]
+        _NEXT_COUNTER_CLOCKWISE[_code] = COUNTER_CLOCKWISE[_code]
+        _NEXT_COUNTER_CLOCKWISE[_direction] = VALUES[COUNTER_CLOCKWISE[_code]]
+    del _code, _direction
+
     @staticmethod
     def get_x_step(facing):
         """
@@ -21,7 +56,7 @@ class Direction():
 
         See the documentation of class Coordinates
         """
-        return facing[0]
+        return Direction._X_STEP[facing]
 
 
     @staticmethod
@@ -37,7 +72,7 @@ class Direction():
 
         See the documentation of class Coordinates
         """
-        return facing[1]
+        return Direction._Y_STEP[facing]
 
 
     @staticmethod
@@ -48,7 +83,42 @@ class Direction():
 
         Returns: list of direction tuples
         """
-        return [Direction.NORTH, Direction.EAST, Direction.SOUTH, Direction.WEST]
+        return list(Direction.VALUES)
+
+
+    @staticmethod
+    def get_code(direction):
+        """
+        Returns the integer code of the given direction tuple: 0 for north, 1 for east, 2 for south and 3 for west.
+
+        Raises ValueError if the given value is not a direction.
+
+        Returns: int
+        """
+        try:
+            return Direction.CODES[direction]
+        except (KeyError, TypeError):
+            raise ValueError('Invalid direction: {!r}'.format(direction))
+
+
+    @staticmethod
+    def from_code(code):
+        """
+        Returns the direction tuple that has the given integer code.
+
+        Returns: tuple
+        """
+        return Direction.VALUES[code]
+
+
+    @staticmethod
+    def get_value(direction):
+        """
+        Returns the direction tuple of the given direction tuple or direction code.
+
+        Returns: tuple
+        """
+        return Direction._VALUE[direction]
 
 
     @staticmethod
@@ -58,9 +128,7 @@ class Direction():
 
         Returns: another direction tuple clockwise from this one: tuple
         """
-        direction_list = Direction.get_values()
-        index = direction_list.index(direction)
-        return direction_list[(index + 1) % 4]
+        return Direction._NEXT_CLOCKWISE[direction]
 
 
     @staticmethod
@@ -70,23 +138,17 @@ class Direction():
 
         Returns: another direction counterclockwise from this one: tuple
         """
-        direction_list = Direction.get_values()
-        index = direction_list.index(direction)
-        return direction_list[(index + 3) % 4]
+        return Direction._NEXT_COUNTER_CLOCKWISE[direction]
 
 
     @staticmethod
     def get_degrees(direction):
         """
+        Raises ValueError if the given value is not a direction.
+
         Returns: the direction as degrees from 0 to 360.
         """
-        if (direction == Direction.NORTH):
-            return 0
-        elif (direction == Direction.EAST):
-            return 90
-        elif (direction == Direction.SOUTH):
-            return 180
-        elif (direction == Direction.WEST):
-            return 270
-        else:
-            print("Invalid direction given to get_degrees")
+        try:
+            return Direction._DEGREES[direction]
+        except (KeyError, TypeError):
+            raise ValueError('Invalid direction given to get_degrees: {!r}'.format(direction))
@@ -0,0 +1,229 @@
+import random
+from array import array
+from bisect import bisect_left
+
+from direction import Direction
+from drunkbot import Drunkbot
+from run_summary import RunSummary
+
+
+def _supports_direct_draws():
+    """
+    Checks that choosing one of the four directions with random.Random.choice is the same as drawing three
+    random bits with getrandbits(3) and drawing again while the value is four or more. This is how CPython
+    implements choice, and it lets the engine pick exactly the same directions as Drunkbot.get_random_direction
+    with a single cheap call per draw, leaving the generator in the same state.
+
+    Returns a boolean value stating whether the directions can be drawn as bits: boolean
+    """
+    reference = random.Random(2)
+    generator = random.Random(2)
+    for count in range(100):       # stepper
+        code = generator.getrandbits(3)
+        while code > 3:
+            code = generator.getrandbits(3)
+        if Direction.VALUES[code] != reference.choice(Direction.VALUES):
+            return False
+    return generator.getstate() == reference.getstate()
+
+
+def _choice_draw(generator):
+    """
+    Returns a function that draws a direction code with the choice method of the given generator, for Python
+    implementations where the directions can not be drawn as bits. The function takes the number of bits as a
+    parameter like getrandbits, but ignores it.
+
+    Parameter generator is the random number generator of a drunkbot: random.Random
+
+    Returns the drawing function: function
+    """
+    def draw(bits):
+        return Direction.CODES[generator.choice(Direction.VALUES)]
+    return draw
+
+
+DIRECT_DRAWS = _supports_direct_draws()
+
+
+class DrunkbotEngine():
+    """
+    The class DrunkbotEngine runs robot worlds populated by drunkbots faster than RobotWorld.run.
+
+    During a run, the locations, facings and broken flags of the robots are kept in flat arrays and the turns
+    are resolved directly on the wall and occupant layers, the spatial index and the robot counts of the world,
+    without calling the methods of the Robot and Drunkbot objects. Each random direction is drawn from the
+    drunkbot's own random number generator with a single getrandbits call, which picks the same direction as
+    Drunkbot.get_random_direction. The robots take their turns in the same round-robin order as in
+    RobotWorld.next_robot_turn and the results are exactly the same as with RobotWorld.run: earlier robots move
+    first, a robot that collides with a wall breaks and a robot that is collided with breaks.
+
+    The turns are still resolved one robot at a time, since every move depends on the moves of the robots before
+    it. The engine saves the method calls of each turn, but it copies the active robots into the arrays at the
+    start of a run and back at the end, which costs about as much as a full turn. Runs of several full turns are
+    several times faster than with RobotWorld.run, while a single full turn of a large world gains nothing.
+    See benchmark.benchmark_drunkbot_engine.
+
+    The Robot objects of the world are brought up to date at the end of each run, so the world can be run with
+    the engine and with its own methods interchangeably. Worlds that have listeners or are being profiled are
+    simply run with RobotWorld.run, since every change must then be written to the event log or measured.
+
+    See the documentation of RobotWorld and Drunkbot
+    """
+
+    def __init__(self, world):
+        """
+        Creates a new engine for the given world.
+
+        Parameter world is a robot world whose robots all have drunkbot brains: RobotWorld
+
+        Raises ValueError if some robot of the world is not a drunkbot.
+        """
+        for robot in world.robots:
+            if not isinstance(robot.get_brain(), Drunkbot):
+                raise ValueError('{} is not a drunkbot'.format(robot.get_name()))
+        self.world = world    # fixed value
+
+
+    def run(self, n_turns, stop_when=None):
+        """
+        Runs the given number of full turns.
+
+        Parameter n_turns is the number of full turns to run: int
+
+        Parameter stop_when is an optional function that is called with the world after each full turn. If it
+        returns a true value, the run stops early. The locations, facings and broken flags of the robots are up
+        to date when it is called: function
+
+        Returns a summary of what happened during the run: RunSummary
+
+        See RobotWorld.run()
+        """
+        world = self.world
+        if world.listeners or world.profiler is not None:
+            # Every change must be written to the event log or measured, which only the robots themselves do.
+            return world.run(n_turns, stop_when)
+        robots = world.robots
+        # Drunkbots are never fixed and no walls are added during a run, so the robots that are active at the
+        # start of the run are the only ones that can act. Broken robots are dropped after each full turn.
+        start = bisect_left(world.active, world.turn)
+        order = world.active[start:] + world.active[:start]
+        acting = order          # fixed value, the only robots that can change during the run
+        walls = world.walls
+        occupants = world.occupants
+        adjacent_walls = world.adjacent_walls
+        block_square = world.block_square
+        unblock_square = world.unblock_square
+        spatial_index = world.spatial_index
+        robot_counts = world.robot_counts
+        stride = world.stride
+        offsets = world.get_neighbor_offsets()
+        # Only the active robots are copied into the arrays. The others can neither act nor be collided with,
+        # since a stuck robot is surrounded by walls, so they count as broken.
+        positions = array('l', [0]) * len(robots)      # square index of each robot
+        facings = bytearray(len(robots))                # direction code of each robot
+        destroyed = bytearray(b'\x01') * len(robots)    # broken flag of each robot
+        draws = [None] * len(robots)                    # function drawing random bits for each robot
+        for number in acting:       # stepper
+            robot = robots[number]
+            location = robot.location
+            positions[number] = (location.y + 1) * stride + location.x + 1     # see RobotWorld.get_index
+            facings[number] = Direction.CODES[robot.facing]
+            destroyed[number] = 0
+            generator = robot.get_brain().random
+            draws[number] = generator.getrandbits if DIRECT_DRAWS else _choice_draw(generator)
+
+        moves = wall_collisions = robot_collisions = breakdowns = 0
+        turns = 0
+        try:
+            while turns < n_turns:
+                taking_turns = order
+                for number in order:
+                    if destroyed[number]:
+                        continue
+                    position = positions[number]
+                    if adjacent_walls[position] == 4:
+                        continue        # stuck
+                    draw = draws[number]
+                    code = draw(3)
+                    while code > 3:
+                        code = draw(3)
+                    facings[number] = code
+                    target = position + offsets[code]
+                    occupant = occupants[target]
+                    if walls[target]:
+                        wall_collisions += 1
+                        destroyed[number] = 1
+                        breakdowns += 1
+                    elif occupant:
+                        robot_collisions += 1
+                        if not destroyed[occupant - 1]:
+                            destroyed[occupant - 1] = 1
+                            breakdowns += 1
+                    else:
+                        occupants[position] = 0
+                        occupants[target] = number + 1
+                        unblock_square(position)
+                        block_square(target)
+                        positions[number] = target
+                        if spatial_index is not None:
+                            spatial_index.move(number, target)
+                        if robot_counts is not None:
+                            robot_counts.add(position % stride - 1, position // stride - 1, -1)
+                            robot_counts.add(target % stride - 1, target // stride - 1, 1)
+                        moves += 1
+                        code = draw(3)
+                        while code > 3:
+                            code = draw(3)
+                        facings[number] = code
+                turns += 1
+                world.full_turns += 1
+                order = [number for number in order if not destroyed[number]]
+                if stop_when is not None:
+                    self.store_robots(taking_turns, positions, facings, destroyed)
+                    if stop_when(world):
+                        break
+        finally:
+            self.store_robots(acting, positions, facings, destroyed)
+            world.moves += moves
+            world.wall_collisions += wall_collisions
+            world.robot_collisions += robot_collisions
+            world.breakdowns += breakdowns
+        return RunSummary(turns, moves, wall_collisions, robot_collisions, breakdowns)
+
+
+    def store_robots(self, numbers, positions, facings, destroyed):
+        """
+        Copies the locations, facings and broken flags of the given robots from the arrays of the engine to the
+        Robot objects. Only the robots that took turns can have changed, since a robot can only break another
+        robot that is still active.
+
+        Parameter numbers are the turn numbers of the robots to copy: list
+
+        Parameter positions is the square index of each robot: array
+
+        Parameter facings is the direction code of each robot: bytearray
+
+        Parameter destroyed is the broken flag of each robot: bytearray
+        """
+        world = self.world
+        robots = world.robots
+        stride = world.stride
+        interned = world.interned
+        broken = []             # gatherer, robots broken since the previous copy
+        for number in numbers:  # stepper
+            robot = robots[number]
+            position = positions[number]
+            location = interned.get(position)
+            if location is None:
+                location = world.get_coordinates(position % stride - 1, position // stride - 1)
+            robot.location = location
+            robot.facing = Direction.VALUES[facings[number]]
+            if destroyed[number] and not robot.destroyed:
+                robot.destroyed = True
+                broken.append(number)
+        if broken:
+            # Drunkbots are never fixed during a run. Removing the broken robots from the active robots one at a
+            # time with RobotWorld.update_activity would take quadratic time in a large world.
+            world.active[:] = [number for number in world.active if not destroyed[number]]
+            if world.change_tracker is not None:
+                world.change_tracker.changed.update(broken)
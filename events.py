@@ -0,0 +1,186 @@
+import struct
+import sys
+from array import array
+
+from coordinates import Coordinates
+from direction import Direction
+
+
+EVENT = struct.Struct('<qqq')    # an event in the event log of a world: kind and robot, source, target
+
+
+class Event():
+    """
+    The class Event is a lightweight record of a single change in a robot world.
+
+    The robots of a world that has listeners (see RobotWorld.add_listener) write their changes to the event
+    log of the world, a bytearray, as three little-endian 64-bit integers each (see EVENT): the kind of the
+    change shifted left by 32 bits and combined with the turn number of the robot, the source and the target.
+    Squares are written as square indices, facings as direction codes and missing values as -1. The function
+    get_values reads these integers from the log, and decode turns them into Event objects.
+
+    The source and the target of an event depend on its kind:
+
+     - MOVE: the squares the robot moved from and to.
+
+     - SPIN: the old and the new facing of the robot.
+
+     - WALL_COLLISION: the square of the robot and the wall square it collided with.
+
+     - ROBOT_COLLISION: the square of the robot and the square of the robot it collided with.
+
+     - DESTROY and FIX: the square of the robot, and None.
+
+    Squares are given as Coordinates and facings as direction tuples. A robot that moves or collides turns to face
+    the target square, but the turn is not written as a separate spin, since the source and the target show it. A
+    robot that turns several quarter turns at once, e.g. a nosebot, writes a spin for each quarter turn.
+    """
+
+    MOVE = 0
+    SPIN = 1
+    WALL_COLLISION = 2
+    ROBOT_COLLISION = 3
+    DESTROY = 4
+    FIX = 5
+
+    NAMES = ('move', 'spin', 'wall collision', 'robot collision', 'destroy', 'fix')
+
+    __slots__ = ('turn', 'robot', 'kind', 'source', 'target')
+
+    def __init__(self, turn, robot, kind, source, target):
+        """
+        Creates a new event record.
+
+        Parameter turn is the number of the full turn during which the event happened: int
+
+        Parameter robot is the turn number of the robot that the event concerns: int
+
+        Parameter kind is the kind of the event, one of the constants of this class: int
+
+        Parameter source is the square the event started from, or the old facing for spins: Coordinates or tuple
+
+        Parameter target is the square the event ended in, or the new facing for spins: Coordinates or tuple
+        """
+        self.turn = turn        # fixed value
+        self.robot = robot      # fixed value
+        self.kind = kind        # fixed value
+        self.source = source    # fixed value
+        self.target = target    # fixed value
+
+
+    def __str__(self):
+        return 'turn {}: robot {} {} {} -> {}'.format(self.turn, self.robot, Event.NAMES[self.kind],
+                                                       self.source, self.target)
+
+
+def get_values(data):
+    """
+    Reads the integers of an event log.
+
+    Parameter data is an event log or a part of it, see Event: bytes or bytearray
+
+    Returns the integers: array
+    """
+    values = array('q')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def decode(values, stride, turn):
+    """
+    Turns the integers of an event log into event records.
+
+    Parameter values contains three integers for each event, see Event: array
+
+    Parameter stride is the length of a row of squares in the world, border included: int
+
+    Parameter turn is the number of the full turn during which the events happened: int
+
+    Returns a generator of events: Event
+    """
+    for position in range(0, len(values), 3):
+        robot = values[position]
+        kind = robot >> 32
+        source = values[position + 1]
+        target = values[position + 2]
+        if kind == Event.SPIN:
+            source = Direction.VALUES[source] if source >= 0 else None
+            target = Direction.VALUES[target]
+        else:
+            y, x = divmod(source, stride)
+            source = Coordinates(x - 1, y - 1)
+            if target >= 0:
+                y, x = divmod(target, stride)
+                target = Coordinates(x - 1, y - 1)
+            else:
+                target = None
+        yield Event(turn, robot & 0xffffffff, kind, source, target)
+
+
+class EventCollector():
+    """
+    The class EventCollector is a world listener that keeps a copy of the event log of the last full turn.
+
+    See RobotWorld.add_listener and RobotWorld.iter_events
+    """
+
+    def __init__(self):
+        self.values = array('q')    # most-recent holder, event log of the last full turn
+
+
+    def turn_ended(self, world):
+        """
+        Copies the event log of the world. See RobotWorld.add_listener.
+        """
+        self.values = get_values(world.event_log)
+
+
+class ChangeTracker():
+    """
+    The class ChangeTracker is a world listener that gathers the turn numbers of the robots that have changed,
+    both during full turns and between them, until they are taken with take_changed.
+
+    See RobotWorld.get_changed_robots
+    """
+
+    def __init__(self):
+        self.changed = set()    # gatherer, turn numbers of the changed robots
+        self.position = 0       # stepper, number of bytes of the event log of the world already gathered
+
+
+    def turn_ended(self, world):
+        """
+        Gathers the robots changed during the turn before the event log is cleared. See RobotWorld.add_listener.
+        """
+        self.gather(world)
+        self.position = 0
+
+
+    def gather(self, world):
+        """
+        Gathers the robots that have changed since the previous call from the event log of the world.
+
+        Parameter world is the world that is tracked: RobotWorld
+        """
+        log = world.event_log
+        if self.position > len(log):    # the log was cleared outside of a full turn, e.g. by Recorder.close
+            self.position = 0
+        for robot, source, target in EVENT.iter_unpack(log[self.position:]):
+            self.changed.add(robot & 0xffffffff)
+        self.position = len(log)
+
+
+    def take_changed(self, world):
+        """
+        Returns the turn numbers of the robots that have changed since the previous call and forgets them.
+
+        Parameter world is the world that is tracked: RobotWorld
+
+        Returns the turn numbers: set
+        """
+        self.gather(world)
+        changed = self.changed
+        self.changed = set()
+        return changed
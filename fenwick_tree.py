@@ -0,0 +1,147 @@
+import sys
+from array import array
+
+
+class FenwickTree():
+    """
+    The class FenwickTree is a two dimensional binary indexed tree of counts, one count for each square of a
+    width x height grid. It can add to the count of a square and sum the counts of any rectangle of squares, both
+    in O(log width * log height) time, so the number of walls or robots in a rectangle can be kept and queried
+    without examining the squares of the rectangle.
+
+    Entry (i, j) of the tree, counting from 1, holds the sum of the counts of the squares in the columns
+    i - (i & -i) ... i - 1 and the rows j - (j & -j) ... j - 1. The entries are stored row by row in a flat
+    array, or in a dict-like layer that only stores the non-zero entries (see SparseRobotWorld).
+
+    See RobotWorld.count_walls and RobotWorld.count_robots
+    """
+
+    def __init__(self, width, height, tree=None):
+        """
+        Creates a new tree in which every count is zero.
+
+        Parameter width is the number of columns: int
+
+        Parameter height is the number of rows: int
+
+        Parameter tree is an optional empty container for the entries that returns zero for missing entries: dict
+        """
+        self.width = width                      # fixed value
+        self.height = height                    # fixed value
+        self.stride = width + 1                 # fixed value, length of a row of entries
+        if tree is None:
+            tree = array('i', [0]) * (self.stride * (height + 1))
+        self.tree = tree                        # container, the entries by index, row by row
+
+
+    def build(self, counts):
+        """
+        Sets the counts of all the squares at once in O(width * height) time. The tree must be empty and stored
+        in an array.
+
+        The entries of a row are handled as the fields of one large integer, so that whole levels of a row, and
+        whole rows, are added to their parents with a few integer operations instead of a loop over the squares.
+        The entries are sums of counts, which are never negative, so adding them never carries from one field to
+        the next.
+
+        Parameter counts is the count of each square, row by row: bytearray
+        """
+        tree = self.tree
+        width = self.width
+        stride = self.stride
+        size = tree.itemsize
+        length = width * size
+        entries = memoryview(tree).cast('B')
+        # The entries i whose parents i + (i & -i) are in the same row, as masks of their fields, one mask for each
+        # value of i & -i together with the shift that moves the fields to the fields of the parents.
+        levels = []
+        step = 1
+        while step < width:
+            mask = bytearray(length)
+            for i in range(step, width - step + 1, 2 * step):   # stepper
+                mask[(i - 1) * size:i * size] = b'\xff' * size
+            levels.append((int.from_bytes(mask, 'little'), 8 * size * step))
+            step *= 2
+        for j in range(1, self.height + 1):     # stepper
+            row = bytearray(length)
+            row[::size] = counts[(j - 1) * width:j * width]
+            value = int.from_bytes(row, 'little')
+            for mask, shift in levels:          # stepper
+                # The entries of the level are complete, since the entries of the levels below have been added.
+                value += (value & mask) << shift
+            start = (j * stride + 1) * size
+            entries[start:start + length] = value.to_bytes(length, 'little')
+        for j in range(1, self.height + 1):     # stepper
+            parent = j + (j & -j)
+            if parent <= self.height:
+                start = (j * stride + 1) * size
+                parent_start = (parent * stride + 1) * size
+                value = (int.from_bytes(entries[parent_start:parent_start + length], 'little')
+                         + int.from_bytes(entries[start:start + length], 'little'))
+                entries[parent_start:parent_start + length] = value.to_bytes(length, 'little')
+        entries.release()
+        if sys.byteorder == 'big':
+            tree.byteswap()
+
+
+    def add(self, x, y, amount):
+        """
+        Adds the given amount to the count of a square.
+
+        Parameter x is the column of the square, from 0 to width - 1: int
+
+        Parameter y is the row of the square, from 0 to height - 1: int
+
+        Parameter amount is the amount to add: int
+        """
+        tree = self.tree
+        stride = self.stride
+        j = y + 1
+        while j <= self.height:
+            i = x + 1
+            while i <= self.width:
+                tree[j * stride + i] += amount
+                i += i & -i
+            j += j & -j
+
+
+    def get_prefix_sum(self, x, y):
+        """
+        Returns the sum of the counts of the squares in the columns 0...x - 1 and the rows 0...y - 1: int
+        """
+        tree = self.tree
+        stride = self.stride
+        total = 0
+        j = y
+        while j > 0:
+            i = x
+            while i > 0:
+                total += tree[j * stride + i]
+                i -= i & -i
+            j -= j & -j
+        return total
+
+
+    def get_sum(self, left, top, right, bottom):
+        """
+        Returns the sum of the counts of the squares in a rectangle. The edges are included, and the parts of the
+        rectangle outside of the grid are ignored.
+
+        Parameter left is the first column of the rectangle: int
+
+        Parameter top is the first row of the rectangle: int
+
+        Parameter right is the last column of the rectangle: int
+
+        Parameter bottom is the last row of the rectangle: int
+
+        Returns the sum: int
+        """
+        left = max(left, 0)
+        top = max(top, 0)
+        right = min(right, self.width - 1)
+        bottom = min(bottom, self.height - 1)
+        if left > right or top > bottom:
+            return 0
+        return (self.get_prefix_sum(right + 1, bottom + 1) - self.get_prefix_sum(left, bottom + 1)
+                - self.get_prefix_sum(right + 1, top) + self.get_prefix_sum(left, top))
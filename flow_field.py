@@ -0,0 +1,101 @@
+from array import array
+from collections import OrderedDict
+
+
+def compute_distances(world, target):
+    """
+    Computes the length of the shortest path from every square of the world to the target square with a breadth
+    first search. Paths go around walls but not around robots, which move all the time.
+
+    Parameter world is the world: RobotWorld
+
+    Parameter target is the index of the target square: int
+
+    Returns the distance of each square by index, -1 for walls and squares that can not reach the target: array
+    """
+    walls = world.walls
+    offsets = world.get_neighbor_offsets()
+    distances = array('i', [-1]) * len(walls)
+    distances[target] = 0
+    frontier = [target]
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for index in frontier:              # stepper
+            for offset in offsets:          # stepper
+                neighbor = index + offset
+                if distances[neighbor] < 0 and not walls[neighbor]:
+                    distances[neighbor] = distance
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances
+
+
+class FlowFieldCache():
+    """
+    The class FlowFieldCache keeps the distance fields (see compute_distances) of the most recently used target
+    squares of a world, so that all the robots heading for the same square share one breadth first search
+    instead of searching for a path each. The fields only depend on the walls, so they are all discarded
+    when walls are added to the world.
+
+    Each field has four bytes for every square of the world, so the number of fields kept is limited by their
+    total number of squares as well as by their number. A large world keeps fewer fields, but always at least one.
+
+    See RobotWorld.get_distance_field
+    """
+
+    def __init__(self, world, size=16, cells=1 << 22):
+        """
+        Creates a new, empty cache.
+
+        Parameter world is the world whose fields are cached: RobotWorld
+
+        Parameter size is the largest number of fields to keep: int
+
+        Parameter cells is the largest total number of squares of the fields kept, 16 MB of fields by default: int
+        """
+        self.world = world                          # fixed value
+        self.size = max(1, min(size, cells // len(world.walls)))    # fixed value, number of fields to keep
+        self.fields = OrderedDict()                 # container, distance fields by target index, least recent first
+        self.wall_changes = world.wall_changes      # most-recent holder, wall changes of the world the fields are for
+        self.searches = 0                           # gatherer, fields computed
+        self.hits = 0                               # gatherer, fields found in the cache
+
+
+    def get_field(self, target):
+        """
+        Returns the distance field of the given target square, computing it only if it is not in the cache.
+
+        Parameter target is the index of the target square: int
+
+        Returns the distance of each square to the target by index, see compute_distances: array
+        """
+        if self.wall_changes != self.world.wall_changes:
+            self.fields.clear()
+            self.wall_changes = self.world.wall_changes
+        field = self.fields.get(target)
+        if field is not None:
+            self.fields.move_to_end(target)
+            self.hits += 1
+            return field
+        field = compute_distances(self.world, target)
+        self.searches += 1
+        self.fields[target] = field
+        if len(self.fields) > self.size:
+            self.fields.popitem(last=False)
+        return field
+
+
+    def get_searches(self):
+        """
+        Returns the number of distance fields computed: int
+        """
+        return self.searches
+
+
+    def get_hits(self):
+        """
+        Returns the number of times a distance field was found in the cache: int
+        """
+        return self.hits
@@ -4,6 +4,7 @@ from robot_graphics_item import RobotGraphicsItem
 from coordinates import Coordinates
 
 from gui_exercise import GuiExercise
+from simulation_worker import SimulationWorker
 
 
 class GUI(QtWidgets.QMainWindow):
@@ -12,6 +13,9 @@ class GUI(QtWidgets.QMainWindow):
     interact with it.
     """
 
+    FRAMES_PER_SECOND = 30      # the robots are drawn at most this often
+    MAX_SPEED = 61              # the slider value meaning "as fast as possible"
+
     def __init__(self, world, square_size):
         super().__init__()
         self.setCentralWidget(QtWidgets.QWidget()) # QMainWindown must have a centralWidget to be able to add layouts
@@ -19,11 +23,12 @@ class GUI(QtWidgets.QMainWindow):
         self.centralWidget().setLayout(self.horizontal)
         self.world = world
         self.square_size = square_size
+        # The world is simulated in a separate thread, see SimulationWorker
+        self.worker = SimulationWorker(self.world, 10)
         self.init_window()
         self.init_buttons()
-        self.gui_exercise = GuiExercise(self.world, self.scene, self.square_size)
+        self.gui_exercise = GuiExercise(self.world, self.scene, self.square_size, self.worker)
 
-        self.add_robot_world_grid_items()
         self.add_robot_world_grid_items()
         self.add_robot_graphics_items()
         self.update_robots()
@@ -31,35 +36,32 @@ class GUI(QtWidgets.QMainWindow):
         # Set a timer to call the update function periodically
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.update_robots)
-        self.timer.start(10) # Milliseconds
+        self.timer.start(1000 // GUI.FRAMES_PER_SECOND) # Milliseconds
 
 
     def add_robot_world_grid_items(self):
         """
         Implement me in gui_exercise.py!
 
-        Adds an QGraphicsItem for each square in the robot world.
-        Qt uses QGraphicsItems to draw objects in the QGraphicsScene.
-        QGraphicsRectItem is a subclass of QGraphicsItem, and is useful for
-        easily drawing rectangular items.
-        This method should only be called once, otherwise it creates duplicates!
+        Adds a single QGraphicsPixmapItem that draws the floor and the walls of the robot world.
+        The image is only redrawn when walls are added to the world, see update_grid().
         """
         # Calls your code in gui_exercise.py
         self.gui_exercise.add_robot_world_grid_items()
 
 
+    def update_grid(self):
+        """
+        Redraws the floor and the walls if walls have been added to the robot world.
+        """
+        self.gui_exercise.update_grid()
+
+
     def get_robot_graphics_items(self):
         """
         Returns all the RobotGraphicsItem in the scene.
-
-        NOTE: This is a silly implementation, it would be much more efficient to store
-        all RobotGraphicsItems in a list and simply return that list.
         """
-        items = []
-        for item in self.scene.items():
-            if type(item) is RobotGraphicsItem:
-                items.append(item)
-        return items
+        return list(self.gui_exercise.robot_items.values())
 
 
     def add_robot_graphics_items(self):
@@ -79,19 +81,72 @@ class GUI(QtWidgets.QMainWindow):
         """
         Adds buttons to the window and connects them to their respective functions
         See: QPushButton at http://doc.qt.io/qt-5/qpushbutton.html
+        and QSlider at http://doc.qt.io/qt-5/qslider.html
         """
+        controls = QtWidgets.QVBoxLayout()
+        self.horizontal.addLayout(controls)
+
+        self.play_btn = QtWidgets.QPushButton("Play")
+        self.play_btn.clicked.connect(self.toggle_play)
+        controls.addWidget(self.play_btn)
+
         self.next_turn_btn = QtWidgets.QPushButton("Next full turn")
-        self.next_turn_btn.clicked.connect(self.world.next_full_turn)
-        self.horizontal.addWidget(self.next_turn_btn)
+        self.next_turn_btn.clicked.connect(self.worker.step)
+        controls.addWidget(self.next_turn_btn)
+
+        self.speed_label = QtWidgets.QLabel()
+        controls.addWidget(self.speed_label)
+        self.speed_slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        self.speed_slider.setRange(1, GUI.MAX_SPEED)
+        self.speed_slider.valueChanged.connect(self.set_speed)
+        self.speed_slider.setValue(10)
+        controls.addWidget(self.speed_slider)
+        controls.addStretch()
+
+
+    def toggle_play(self):
+        """
+        Starts the simulation if it is paused, and pauses it otherwise.
+        """
+        if self.worker.is_playing():
+            self.worker.pause()
+            self.play_btn.setText("Play")
+        else:
+            self.worker.play()
+            self.play_btn.setText("Pause")
+        self.next_turn_btn.setEnabled(not self.worker.is_playing())
+
+
+    def set_speed(self, value):
+        """
+        Sets the speed of the simulation from the value of the speed slider.
+
+        Parameter value is the number of full turns per second, or MAX_SPEED for as fast as possible: int
+        """
+        if value >= GUI.MAX_SPEED:
+            self.worker.set_turns_per_second(None)
+            self.speed_label.setText("Speed: max")
+        else:
+            self.worker.set_turns_per_second(value)
+            self.speed_label.setText("Speed: {} turns/s".format(value))
 
 
     def update_robots(self):
         """
-        Iterates over all robot items and updates their position to match
-        their physical representations in the robot world.
+        Updates the robot items whose robots have changed since the previous update to match
+        the latest frame published by the simulation worker. A frame never changes, so the world is drawn
+        without holding the lock of the worker and drawing never delays the simulation.
+        If no robot has changed, nothing is redrawn.
+
+        See: SimulationWorker.take_frame()
         """
-        for robot_item in self.get_robot_graphics_items():
-            robot_item.updateAll()
+        frame, changed = self.worker.take_frame()
+        self.update_grid()
+        if len(frame.robots) > len(self.gui_exercise.robot_items):
+            # Robots were added after the items were created
+            self.add_robot_graphics_items()
+        for number in changed:
+            self.gui_exercise.get_robot_graphics_item(frame.robots[number]).updateFromFrame(frame)
 
 
     def init_window(self):
@@ -111,3 +166,11 @@ class GUI(QtWidgets.QMainWindow):
         self.view.adjustSize()
         self.view.show()
         self.horizontal.addWidget(self.view)
+
+
+    def closeEvent(self, event):
+        """
+        Stops the simulation thread when the window is closed.
+        """
+        self.worker.stop()
+        super().closeEvent(event)
@@ -1,29 +1,37 @@
 from coordinates import Coordinates
-from PyQt5 import QtWidgets, QtGui
+from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtGui import QBrush, QColor
 from PyQt5.QtWidgets import *
 from robotworld import RobotWorld
 from robot_graphics_item import RobotGraphicsItem
+from simulation_worker import get_wall_rows
 
 
 
-class GuiExercise(QGraphicsRectItem, QBrush, QColor):
+class GuiExercise():
     """
     Normally these methods would be implemented in gui.py, but to make automatic
     exercise grading easier, they are implemented here.
     """
 
-    def __init__(self, robot_world, scene, square_size):
+    COLOR_TABLE = [QColor(211, 211, 211).rgb(), QColor(20, 20, 20).rgb()]    # floor and wall colors by wall flag
+
+    def __init__(self, robot_world, scene, square_size, worker=None):
         """
         Parameters:
         robot_world: RobotWorld of the Gui-class
         scene: The QGraphicsScene of the Gui-class
         square_size: The width and height of a single square
+        worker: The SimulationWorker of the Gui-class, or None. With a worker the world is drawn from
+                the latest frame of the worker, see SimulationWorker.take_frame
         """
         self.robot_world = robot_world
         self.scene = scene
         self.square_size = square_size
-        self.added_robots = []
+        self.worker = worker
+        self.robot_items = {}           # container, RobotGraphicsItem of each robot
+        self.grid_item = None           # fixed value, the image of the floor and the walls once added
+        self.grid_wall_changes = -1     # most-recent holder, wall changes of the world when the image was drawn
 
 
     def add_robot_world_grid_items(self):
@@ -34,7 +42,10 @@ class GuiExercise(QGraphicsRectItem, QBrush, QColor):
         Qt uses QGraphicsItems to draw objects in the QGraphicsScene.
         QGraphicsRectItem is a subclass of QGraphicsItem, and is useful for
         easily drawing rectangular items.
-        This method should only be called once, otherwise it creates duplicates!
+
+        NOTE: Large worlds would need hundreds of thousands of rectangle items, so this
+        implementation draws all the squares as the pixels of one QGraphicsPixmapItem
+        instead. Calling this method again only redraws the image if walls have been added.
 
         What to do:
 
@@ -68,22 +79,39 @@ class GuiExercise(QGraphicsRectItem, QBrush, QColor):
         and QBrush at http://doc.qt.io/qt-5/qbrush.html
         and QColor at http://doc.qt.io/qt-5/qcolor.html
         """
-        # Iterate over all squares in robot world
-
+        # The whole floor is a single image with one pixel per square, scaled up to the square size.
+        # A single item is much cheaper for the scene than one item per square.
+        if self.grid_item is None:
+            self.grid_item = QGraphicsPixmapItem()
+            self.grid_item.setScale(self.square_size)
+            self.grid_item.setTransformationMode(QtCore.Qt.FastTransformation)
+            self.grid_item.setZValue(-1)
+            self.scene.addItem(self.grid_item)
+        self.update_grid()
+
+
+    def update_grid(self):
+        """
+        Redraws the image of the floor and the walls of the robot world if walls have been added since it was
+        last drawn.
+        """
+        if self.worker is not None:
+            frame = self.worker.frame
+            if self.grid_wall_changes == frame.wall_changes:
+                return
+            wall_changes = frame.wall_changes
+            pixels = frame.walls            # the image uses this data without copying it
+        else:
+            if self.grid_wall_changes == self.robot_world.wall_changes:
+                return
+            wall_changes = self.robot_world.wall_changes
+            pixels = get_wall_rows(self.robot_world)
         world_width = RobotWorld.get_width(self.robot_world)
         world_height = RobotWorld.get_height(self.robot_world)
-        if called = False:
-            for x in range(world_width):
-                for y in range(world_height):
-                    new_rect = QGraphicsRectItem((self.square_size * x), (self.square_size * y), 50, 50)
-                    if RobotWorld.get_square(self.robot_world, Coordinates(x, y)).is_wall_square() == True:
-                        new_rect.setBrush(QBrush(QColor(20, 20, 20)))
-                        self.scene.addItem(new_rect)
-                    else:
-                        new_rect.setBrush(QBrush(QColor(211, 211, 211)))
-                        self.scene.addItem(new_rect)
-            called = True
-        pass
+        image = QtGui.QImage(pixels, world_width, world_height, world_width, QtGui.QImage.Format_Indexed8)
+        image.setColorTable(GuiExercise.COLOR_TABLE)
+        self.grid_item.setPixmap(QtGui.QPixmap.fromImage(image))
+        self.grid_wall_changes = wall_changes
 
 
     def add_robot_graphics_items(self):
@@ -101,12 +129,24 @@ class GuiExercise(QGraphicsRectItem, QBrush, QColor):
         1. Find all robots in the RobotWorld, which do not yet have a RobotGraphicsItem.
         2. Create RobotGraphicsItem for all such robots and add these items to the QGraphicsScene.
 
-        Hint: You can utilize the empty self.added_robots list for checking which robots have already been added
+        Hint: You can utilize the self.robot_items dict for checking which robots have already been added
 
         See: RobotGraphicsItem and RobotWorld
         """
 
-        for robot in self.added_robots:
-            if not robot.RobotGraphicsItem():
-                new_robot = RobotGraphicsItem(robot, self.square_size)
+        if self.worker is not None:
+            robots = self.worker.frame.robots
+        else:
+            robots = RobotWorld.get_robots(self.robot_world)
+        for robot in robots:
+            if robot not in self.robot_items:
+                new_robot = RobotGraphicsItem(robot, self.square_size, self.worker)
                 self.scene.addItem(new_robot)
+                self.robot_items[robot] = new_robot
+
+
+    def get_robot_graphics_item(self, robot):
+        """
+        Returns the RobotGraphicsItem of the given robot, or None if it has none: RobotGraphicsItem
+        """
+        return self.robot_items.get(robot)
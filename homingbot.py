@@ -0,0 +1,43 @@
+from direction import Direction
+from lovebot import Lovebot
+
+
+class Homingbot(Lovebot):
+    """
+    The class Homingbot represents the "brains" (or AI) of robots that home in on their beloved like lovebots, but
+    find their way around walls and never collide with anything. A homingbot follows the shortest path to its
+    beloved, using the distance field of the square of the beloved that the world shares between all the robots
+    heading for that square (see RobotWorld.get_distance_field).
+
+    See the documentation of Lovebot
+    """
+
+    def determine_direction(self, current_location):
+        """
+        Determines the direction the homingbot will move in: one step along a shortest path to its beloved, into
+        an empty square. The homingbot keeps its facing if it can, and otherwise takes the first such direction
+        clockwise from north. If the homingbot is already next to its beloved, or every step closer is blocked by
+        robots, or there is no path, it stays where it is.
+
+        Parameter current_location is the homingbot's current location: Coordinates
+
+        Returns the direction of movement, or None to stay: tuple
+
+        See move_body()
+        """
+        target_location = self.get_beloved().get_location()
+        if target_location is None or current_location is None:
+            return None
+        world = self.body.get_world()
+        field = world.get_distance_field(target_location)
+        index = world.get_index(current_location)
+        distance = field[index]
+        if distance <= 1:
+            return None
+        blocked = world.get_blocked_mask(index)
+        offsets = world.get_neighbor_offsets()
+        facing = Direction.CODES[self.body.get_facing()]
+        for code in (facing, 0, 1, 2, 3):       # stepper
+            if not blocked & 1 << code and field[index + offsets[code]] == distance - 1:
+                return Direction.VALUES[code]
+        return None
@@ -61,7 +61,7 @@ class Lovebot(RobotBrain):
         See move_body()
         """
         target_location = self.get_beloved().get_location()
-        if target_location != None and current_location != None:
+        if target_location is not None and current_location is not None:
             distance_x = target_location.get_x() - current_location.get_x()
             distance_y = target_location.get_y() - current_location.get_y()
             if math.fabs(distance_x) >= math.fabs(distance_y):
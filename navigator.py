@@ -0,0 +1,322 @@
+import heapq
+
+from direction import Direction
+from robot_brain import RobotBrain
+
+
+INFINITY = float('inf')
+
+
+class Navigator(RobotBrain):
+    """
+    The class Navigator represents the "brains" (or AI) of robots that travel to a goal square along a shortest
+    path, going around walls and the robots they see on their way, without ever colliding with anything.
+
+    A navigator plans its path once with the D* Lite algorithm, which searches backwards from the goal, and keeps
+    the search (the distance estimates g and rhs of the squares it has examined) as its path cache. On each turn
+    the navigator looks at the four squares next to it. If a robot has appeared in one of them or has left one of
+    them, only the part of the search affected by that square is repaired. A robot that has been seen is
+    remembered as an obstacle until the navigator sees its square empty or has not seen the robot for MEMORY
+    turns, since robots move on; forgetting an obstacle repairs the search the same way. If nothing has changed,
+    the turn costs no searching at all, so the time a navigator spends depends on how much changes, not on the
+    size of the map. Adding walls to the world makes the navigator plan again from scratch.
+
+    See ReplanningNavigator for a navigator that plans from scratch on every turn.
+    """
+
+    MEMORY = 20     # turns an obstacle is remembered after it was last seen
+
+    def __init__(self, body, goal):
+        """
+        Creates a new navigator brain for the given robot body.
+
+        Parameter body is the robot whose actions the navigator brain is supposed to control: Robot
+
+        Parameter goal is the square to travel to: Coordinates
+        """
+        super(Navigator, self).__init__(body)
+        self.goal = goal            # fixed value
+        self.world = None           # most-recent holder, the world the search was made in
+        self.wall_changes = -1      # most-recent holder, wall changes of the world when the search was started
+        self.obstacles = {}         # container, the turn each remembered obstacle was last seen by index, oldest first
+        self.turns = 0              # stepper, turns in which the navigator has looked around
+        self.g = {}                 # container, distance to the goal from each examined square by index
+        self.rhs = {}               # container, distance to the goal through the best neighbor by index
+        self.queue = []             # container, heap of (key, index) of squares whose g and rhs differ
+        self.keys = {}              # container, the current key of each square in the queue
+        self.start = None           # most-recent holder, index of the square of the robot
+        self.last = None            # most-recent holder, the square of the robot when the search was last repaired
+        self.km = 0                 # gatherer, heuristic distance moved since the search was started
+        self.expansions = 0         # gatherer, squares expanded by all the searches
+
+
+    def get_goal(self):
+        """
+        Returns the square the navigator travels to: Coordinates
+        """
+        return self.goal
+
+
+    def get_expansions(self):
+        """
+        Returns the number of squares expanded in all the searches of the navigator so far: int
+        """
+        return self.expansions
+
+
+    def move_body(self):
+        """
+        Moves the robot one step along its shortest path to the goal. The robot does nothing if it is at the goal
+        or if every path to the goal is blocked.
+
+        This method assumes that it is called only if the robot is not broken or stuck.
+        """
+        world = self.body.get_world()
+        self.start = world.get_index(self.body.get_location())
+        goal = world.get_index(self.goal)
+        if self.start == goal:
+            return
+        changed = self.observe(world)
+        if world is not self.world or world.wall_changes != self.wall_changes:
+            self.initialize(world)
+            self.compute_shortest_path()
+        elif changed:
+            self.km += self.heuristic(self.last, self.start)
+            self.last = self.start
+            for index in changed:       # stepper
+                self.update_vertex(index)
+                for offset in world.get_neighbor_offsets():     # stepper
+                    self.update_vertex(index + offset)
+            self.compute_shortest_path()
+        code = self.choose_step()
+        if code is not None:
+            self.body.move(Direction.VALUES[code])
+
+
+    def observe(self, world):
+        """
+        Looks at the squares next to the robot and updates the obstacles seen in them, and forgets the obstacles
+        that have not been seen for MEMORY turns.
+
+        Parameter world is the world of the robot: RobotWorld
+
+        Returns the indices of the squares whose obstacle status changed: list
+        """
+        self.turns += 1
+        changed = []
+        obstacles = self.obstacles
+        occupants = world.occupants
+        for offset in world.get_neighbor_offsets():     # stepper
+            index = self.start + offset
+            if occupants[index]:
+                if obstacles.pop(index, None) is None:
+                    changed.append(index)
+                obstacles[index] = self.turns           # moved to the end, the most recently seen
+            elif index in obstacles:
+                del obstacles[index]
+                changed.append(index)
+        while obstacles:
+            index = next(iter(obstacles))
+            if self.turns - obstacles[index] <= self.MEMORY:
+                break
+            del obstacles[index]
+            changed.append(index)
+        return changed
+
+
+    def choose_step(self):
+        """
+        Returns the code of the direction of the free neighbor from which the goal is the closest, or None if the
+        goal can not be reached: int
+        """
+        world = self.world
+        best = INFINITY
+        best_code = None
+        for code, offset in enumerate(world.get_neighbor_offsets()):    # stepper
+            neighbor = self.start + offset
+            if self.is_free(neighbor):
+                distance = self.g.get(neighbor, INFINITY)
+                if distance < best:
+                    best = distance
+                    best_code = code
+        return best_code
+
+
+    def initialize(self, world):
+        """
+        Starts a new search in the given world.
+
+        Parameter world is the world of the robot: RobotWorld
+        """
+        self.world = world
+        self.wall_changes = world.wall_changes
+        self.g = {}
+        self.rhs = {}
+        self.queue = []
+        self.keys = {}
+        self.km = 0
+        self.last = self.start
+        goal = world.get_index(self.goal)
+        self.rhs[goal] = 0
+        key = (self.heuristic(self.start, goal), 0)
+        self.keys[goal] = key
+        heapq.heappush(self.queue, (key, goal))
+
+
+    def heuristic(self, first, second):
+        """
+        Returns the Manhattan distance between the squares with the given indices: int
+        """
+        stride = self.world.stride
+        return abs(first % stride - second % stride) + abs(first // stride - second // stride)
+
+
+    def is_free(self, index):
+        """
+        Returns a boolean value stating whether the navigator may move to the square with the given index: boolean
+        """
+        return not self.world.walls[index] and index not in self.obstacles
+
+
+    def calculate_key(self, index):
+        """
+        Returns the priority of the square with the given index in the search: tuple
+        """
+        distance = min(self.g.get(index, INFINITY), self.rhs.get(index, INFINITY))
+        return (distance + self.heuristic(self.start, index) + self.km, distance)
+
+
+    def update_vertex(self, index):
+        """
+        Recomputes the rhs value of the square with the given index from its neighbors, and queues the square
+        if its g and rhs values differ.
+
+        Parameter index is the index of the square: int
+        """
+        if index != self.world.get_index(self.goal):
+            best = INFINITY
+            if self.is_free(index):
+                g = self.g
+                for offset in self.world.get_neighbor_offsets():    # stepper
+                    neighbor = index + offset
+                    if self.is_free(neighbor):
+                        distance = g.get(neighbor, INFINITY) + 1
+                        if distance < best:
+                            best = distance
+            self.rhs[index] = best
+        if self.g.get(index, INFINITY) != self.rhs.get(index, INFINITY):
+            key = self.calculate_key(index)
+            self.keys[index] = key
+            heapq.heappush(self.queue, (key, index))
+        else:
+            self.keys.pop(index, None)
+
+
+    def compute_shortest_path(self):
+        """
+        Expands squares until the distance of the square of the robot to the goal is known.
+        """
+        queue = self.queue
+        keys = self.keys
+        g = self.g
+        rhs = self.rhs
+        offsets = self.world.get_neighbor_offsets()
+        start = self.start
+        while queue:
+            key, index = queue[0]
+            if keys.get(index) != key:
+                heapq.heappop(queue)        # an outdated entry
+                continue
+            if not (key < self.calculate_key(start) or rhs.get(start, INFINITY) != g.get(start, INFINITY)):
+                break
+            heapq.heappop(queue)
+            new_key = self.calculate_key(index)
+            if key < new_key:
+                keys[index] = new_key
+                heapq.heappush(queue, (new_key, index))
+                continue
+            self.expansions += 1
+            del keys[index]
+            if g.get(index, INFINITY) > rhs.get(index, INFINITY):
+                g[index] = rhs[index]
+            else:
+                g[index] = INFINITY
+                self.update_vertex(index)
+            for offset in offsets:          # stepper
+                self.update_vertex(index + offset)
+
+
+    def get_path(self):
+        """
+        Returns the squares of the currently planned path from the square after the robot to the goal, or None
+        if the goal can not be reached: list
+        """
+        if self.world is None:
+            return None
+        world = self.world
+        goal = world.get_index(self.goal)
+        index = self.start
+        path = []
+        while index != goal:
+            best = INFINITY
+            for offset in world.get_neighbor_offsets():     # stepper
+                neighbor = index + offset
+                if self.is_free(neighbor) and self.g.get(neighbor, INFINITY) < best:
+                    best = self.g.get(neighbor, INFINITY)
+                    index = neighbor
+            if best == INFINITY or len(path) > len(self.g):
+                return None
+            path.append(world.get_coordinates(index % world.stride - 1, index // world.stride - 1))
+        return path
+
+
+class ReplanningNavigator(Navigator):
+    """
+    The class ReplanningNavigator represents navigators that plan their path from scratch with an A* search on
+    every turn. It sees the same obstacles as a Navigator and also follows a shortest path, so it can be used to
+    measure what the incremental repairs of Navigator save.
+    """
+
+    def move_body(self):
+        """
+        Moves the robot one step along a shortest path to the goal, planned from scratch.
+
+        This method assumes that it is called only if the robot is not broken or stuck.
+        """
+        world = self.body.get_world()
+        self.world = world
+        self.start = world.get_index(self.body.get_location())
+        goal = world.get_index(self.goal)
+        if self.start == goal:
+            return
+        self.observe(world)
+        self.g = self.find_distances(goal)
+        code = self.choose_step()
+        if code is not None:
+            self.body.move(Direction.VALUES[code])
+
+
+    def find_distances(self, goal):
+        """
+        Searches backwards from the goal towards the robot with A*.
+
+        Parameter goal is the index of the goal square: int
+
+        Returns the distances to the goal of the squares around the robot, as far as they are known: dict
+        """
+        offsets = self.world.get_neighbor_offsets()
+        distances = {goal: 0}
+        queue = [(self.heuristic(self.start, goal), 0, goal)]
+        while queue:
+            estimate, distance, index = heapq.heappop(queue)
+            if distance > distances.get(index, INFINITY):
+                continue
+            self.expansions += 1
+            if index == self.start:
+                break
+            for offset in offsets:          # stepper
+                neighbor = index + offset
+                if (self.is_free(neighbor) or neighbor == self.start) and distance + 1 < distances.get(neighbor, INFINITY):
+                    distances[neighbor] = distance + 1
+                    heapq.heappush(queue, (distance + 1 + self.heuristic(self.start, neighbor), distance + 1, neighbor))
+        return distances
@@ -19,18 +19,40 @@ class Nosebot(RobotBrain):
         looks where it's going, so it can never collide with anything during its own turn.
 
         This method assumes that it is called only if the robot is not broken or stuck.
+
+        The blocked mask of the square of the robot (see RobotWorld.get_blocked_mask) tells at once how many times
+        the robot has to turn, so the squares are not examined one by one. The robot still spins once for every
+        turn while the changes of the world are being recorded, so that every spin is recorded as before.
         """
-        
-        turned = 0
-        while (turned < 360):
-            position = self.body.get_location()
-            facing = self.body.get_facing()
-            next_coordinate = position.get_neighbor(facing)
-            next_square = self.body.get_world().get_square(next_coordinate)
-            if (next_square.is_empty()):
-                self.body.move_forward()
-                return
-            else:
-                facing = Direction.get_next_clockwise(facing)
-                self.body.spin(facing)
-                turned += 90
+        body = self.body
+        world = body.world
+        code = Direction.CODES[body.facing]
+        turns = Nosebot.TURNS[code << 4 | world.blocked[world.get_index(body.location)]]
+        if world.event_log is None:
+            if turns % 4:
+                body.spin(Direction.VALUES[(code + turns) % 4])
+        else:
+            for turn in range(1, turns + 1):        # stepper
+                body.spin(Direction.VALUES[(code + turn) % 4])
+        if turns < 4:
+            body.move_forward()
+
+
+def _count_turns(code, mask):
+    """
+    Counts the clockwise quarter turns a nosebot facing in the direction with the given code has to make to face
+    an empty square.
+
+    Parameter code is the direction code of the facing of the nosebot: int
+
+    Parameter mask is the blocked mask of the square of the nosebot: int
+
+    Returns the number of turns, or 4 if every neighbor is blocked: int
+    """
+    for turns in range(4):                          # stepper
+        if not mask & 1 << (code + turns) % 4:
+            return turns
+    return 4
+
+
+Nosebot.TURNS = bytes(_count_turns(code, mask) for code in range(4) for mask in range(16))    # by code << 4 | mask
@@ -0,0 +1,117 @@
+import time
+
+
+class Profiler():
+    """
+    The class Profiler measures where the time of the full turns of a robot world goes. For each brain class it
+    records the number of turns taken and the time spent in them, and the moves, failed moves (moves that ended in
+    a collision instead), wall collisions and robot collisions made during them. It also counts the stuck checks
+    made before the turns.
+
+    A profiler is installed with RobotWorld.start_profiling. While a world has a profiler, RobotWorld.next_full_turn
+    lets the profiler take the turn of each robot and tells it when each full turn starts and ends. Worlds that
+    are not profiled only check that they have no profiler, so profiling costs next to nothing when it is not used.
+    Turns taken one robot at a time with next_robot_turn are not measured.
+
+    See RobotWorld.start_profiling and get_report()
+    """
+
+    def __init__(self, world):
+        """
+        Creates a new profiler for the given world.
+
+        Parameter world is the world to profile: RobotWorld
+        """
+        self.world = world          # fixed value
+        self.full_turns = 0         # gatherer, full turns measured
+        self.seconds = 0.0          # gatherer, time spent in the measured full turns
+        self.stuck_checks = 0       # gatherer, stuck checks made before the turns of the robots
+        self.brains = {}            # container, [turns, seconds, moves, wall collisions, robot collisions] by brain class
+        self.full_turn_start = 0.0  # most-recent holder, the time the current full turn started
+
+
+    def full_turn_started(self):
+        """
+        Starts measuring a full turn. This is called by RobotWorld.next_full_turn.
+        """
+        self.full_turn_start = time.perf_counter()
+
+
+    def full_turn_ended(self):
+        """
+        Stops measuring a full turn, after the listeners of the world have been notified. This is called by
+        RobotWorld.next_full_turn.
+        """
+        self.full_turns += 1
+        self.seconds += time.perf_counter() - self.full_turn_start
+
+
+    def take_turn(self, robot):
+        """
+        Lets the given robot take its turn exactly like Robot.take_turn, measuring the turn. This is called by
+        RobotWorld.next_full_turn.
+
+        Parameter robot is the robot whose turn it is: Robot
+        """
+        self.stuck_checks += 1
+        if not robot.is_stuck() and not robot.is_broken():
+            world = self.world
+            brain = robot.brain
+            moves = world.moves
+            wall_collisions = world.wall_collisions
+            robot_collisions = world.robot_collisions
+            start = time.perf_counter()
+            brain.move_body()
+            elapsed = time.perf_counter() - start
+            totals = self.brains.get(type(brain))
+            if totals is None:
+                totals = self.brains[type(brain)] = [0, 0.0, 0, 0, 0]
+            totals[0] += 1
+            totals[1] += elapsed
+            totals[2] += world.moves - moves
+            totals[3] += world.wall_collisions - wall_collisions
+            totals[4] += world.robot_collisions - robot_collisions
+
+
+    def get_report(self):
+        """
+        Returns what has been measured as a dict with the following keys:
+
+         - 'full_turns', 'seconds' and 'stuck_checks': the number of full turns, the time spent in them and the
+           number of stuck checks made before the turns of the robots.
+
+         - 'moves', 'failed_moves', 'wall_collisions' and 'robot_collisions': the totals of all the brains. A
+           failed move is a call of Robot.move that returned False. Broken robots do not get turns, so during
+           the turns every failed move is a wall collision or a robot collision.
+
+         - 'brains': a dict by brain class name of dicts with the keys 'calls' and 'seconds' for the number of
+           turns and the time spent in the move_body method of the brain, and the keys of the totals above.
+
+        Returns the report: dict
+        """
+        brains = {}
+        totals = {'moves': 0, 'failed_moves': 0, 'wall_collisions': 0, 'robot_collisions': 0}
+        for brain_class, (calls, seconds, moves, wall_collisions, robot_collisions) in self.brains.items():
+            brain = {'calls': calls, 'seconds': seconds, 'moves': moves,
+                     'failed_moves': wall_collisions + robot_collisions,
+                     'wall_collisions': wall_collisions, 'robot_collisions': robot_collisions}
+            brains[brain_class.__name__] = brain
+            for key in totals:
+                totals[key] += brain[key]
+        report = {'full_turns': self.full_turns, 'seconds': self.seconds, 'stuck_checks': self.stuck_checks}
+        report.update(totals)
+        report['brains'] = brains
+        return report
+
+
+    def __str__(self):
+        report = self.get_report()
+        lines = ['{} full turns in {:.3f} s, {} stuck checks, {} moves, {} failed moves, {} wall collisions, '
+                 '{} robot collisions'.format(report['full_turns'], report['seconds'], report['stuck_checks'],
+                                              report['moves'], report['failed_moves'], report['wall_collisions'],
+                                              report['robot_collisions'])]
+        for name, brain in sorted(report['brains'].items(), key=lambda item: -item[1]['seconds']):
+            lines.append('  {:12} {:8} calls {:9.3f} s {:8.2f} us/call {:8} moves {:8} failed'.format(
+                name, brain['calls'], brain['seconds'], 1e6 * brain['seconds'] / brain['calls'], brain['moves'],
+                brain['failed_moves']))
+        return '\n'.join(lines)
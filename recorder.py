@@ -0,0 +1,305 @@
+import queue
+import struct
+import threading
+import zlib
+
+from events import decode, get_values
+import snapshot
+
+
+MAGIC = b'RWREC\x00'
+VERSION = 2
+HEADER = struct.Struct('<6sHIII')    # magic, version, keyframe interval, width, height
+CHUNK = struct.Struct('<cQII')        # chunk type, first full turn, number of full turns, payload length
+KEYFRAME = b'K'                       # payload: a snapshot of the world before the full turn
+EVENTS = b'E'                         # payload: the events of the full turns, compressed with zlib
+CHUNK_VALUES = 1 << 20                # event log values after which the events are written before the next keyframe
+
+
+class Recorder():
+    """
+    The class Recorder records everything that happens in a robot world in a compact binary file.
+
+    The file consists of chunks. The events of each full turn, i.e. the moves, spins, collisions, breakdowns and
+    fixes copied from the event log of the world (see events.Event), which already holds them as little-endian
+    64-bit integers, are kept in memory until it is time for a keyframe, or until there are more than CHUNK_VALUES
+    of them. Then the events of all these full turns are written as one chunk compressed with zlib: the number of
+    values of each full turn, followed by the values. Every keyframe_interval full turns there is also a keyframe
+    chunk containing a full snapshot of the world, so that a Recording can restore the world at any turn without
+    replaying the whole run.
+
+    The chunks are compressed and written by a writer thread of the recorder. zlib releases the global
+    interpreter lock while it compresses, so on a computer with several cores the simulation only pays for
+    writing the event log, copying it and taking the snapshots.
+
+    The last events are written when the recorder is closed, so the recorder should be used in a with statement
+    or closed in a finally clause.
+
+    See Recording and snapshot.dumps(world)
+    """
+
+    def __init__(self, world, path, keyframe_interval=100):
+        """
+        Creates a new recorder that starts recording the given world immediately, beginning with a keyframe.
+
+        Parameter world is the world to record. The brains of all its robots must be supported by snapshots: RobotWorld
+
+        Parameter path is the name of the file to record to: string
+
+        Parameter keyframe_interval is the number of full turns between keyframes: int
+
+        Raises ValueError if snapshots do not support the world, see snapshot.dumps(world).
+        """
+        self.world = world                              # fixed value
+        self.stride = world.stride                      # fixed value
+        self.keyframe_interval = keyframe_interval      # fixed value
+        self.first_turn = world.full_turns              # stepper, the first full turn whose events are kept
+        self.lengths = []                               # gatherer, number of values of each full turn kept
+        self.packed = []                                # gatherer, packed event log of each full turn kept
+        self.values = 0                                 # gatherer, number of values kept
+        self.chunks = queue.Queue(2)                    # container, chunks waiting for the writer thread
+        self.error = None                               # most-recent holder, error raised in the writer thread
+        # The first keyframe is taken before the file is opened, so a world that can not be recorded leaves
+        # nothing behind.
+        keyframe = snapshot.dumps(world)
+        self.file = open(path, 'wb')
+        try:
+            self.file.write(HEADER.pack(MAGIC, VERSION, keyframe_interval, world.width, world.height))
+        except OSError:
+            self.file.close()
+            raise
+        self.writer = threading.Thread(target=self.write_chunks, name='Recorder', daemon=True)
+        self.writer.start()
+        self.put_chunk(KEYFRAME, world.full_turns, 0, [keyframe])
+        world.add_listener(self)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+
+    def turn_ended(self, world):
+        """
+        Keeps the events of the full turn that ended, and writes them and a keyframe if it is time for one.
+        See RobotWorld.add_listener.
+        """
+        log = world.event_log
+        self.packed.append(bytes(log))      # the log is already packed, see events.EVENT
+        self.lengths.append(len(log) // 8)  # the log has eight bytes per value
+        self.values += len(log) // 8
+        if world.full_turns % self.keyframe_interval == 0:
+            self.write_events()
+            self.write_keyframe()
+        elif self.values > CHUNK_VALUES:
+            self.write_events()
+
+
+    def write_events(self):
+        """
+        Gives the events kept since the previous chunk of events to the writer thread as one chunk, if there
+        are any.
+        """
+        if not self.lengths:
+            return
+        lengths = struct.pack('<{}q'.format(len(self.lengths)), *self.lengths)
+        self.put_chunk(EVENTS, self.first_turn, len(self.lengths), [lengths] + self.packed)
+        self.first_turn += len(self.lengths)
+        self.lengths = []
+        self.packed = []
+        self.values = 0
+
+
+    def write_keyframe(self):
+        """
+        Gives a snapshot of the world as it is at the start of its next full turn to the writer thread.
+        """
+        self.put_chunk(KEYFRAME, self.world.full_turns, 0, [snapshot.dumps(self.world)])
+
+
+    def put_chunk(self, chunk_type, turn, turns, parts):
+        """
+        Gives a chunk to the writer thread. Waits if the writer thread has fallen behind.
+
+        Parameter chunk_type is EVENTS or KEYFRAME: bytes
+
+        Parameter turn is the first full turn of the chunk: int
+
+        Parameter turns is the number of full turns whose events the chunk contains: int
+
+        Parameter parts are the parts of the payload, which are compressed in the case of events: list
+
+        Raises OSError if the writer thread has failed to write an earlier chunk.
+        """
+        if self.error is not None:
+            raise self.error
+        self.chunks.put((chunk_type, turn, turns, parts))
+
+
+    def write_chunks(self):
+        """
+        The loop of the writer thread. Compresses and writes chunks until it is given None. After an error
+        the remaining chunks are ignored.
+        """
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                return
+            chunk_type, turn, turns, parts = chunk
+            if self.error is not None:
+                continue
+            if chunk_type == EVENTS:
+                compressor = zlib.compressobj(1)
+                parts = [compressor.compress(part) for part in parts]
+                parts.append(compressor.flush())
+            try:
+                self.file.write(CHUNK.pack(chunk_type, turn, turns, sum(len(part) for part in parts)))
+                self.file.writelines(parts)
+            except OSError as error:
+                self.error = error
+
+
+    def close(self):
+        """
+        Stops recording, writes the events that have not been written yet and closes the file. Events recorded
+        after the last full turn are written as events of the next full turn.
+
+        Raises OSError if the writer thread has failed to write the file.
+        """
+        try:
+            log = self.world.event_log
+            if log:
+                self.packed.append(bytes(log))
+                self.lengths.append(len(log) // 8)
+                del log[:]
+            self.world.remove_listener(self)
+            self.write_events()
+        finally:
+            self.chunks.put(None)
+            self.writer.join()
+            self.file.close()
+        if self.error is not None:
+            raise self.error
+
+
+class Recording():
+    """
+    The class Recording reads files written by a Recorder.
+
+    See Recorder
+    """
+
+    def __init__(self, path):
+        """
+        Opens a recording and indexes its chunks. Only the chunk headers are read.
+
+        Parameter path is the name of the file: string
+
+        Raises ValueError if the file is not a recording or has an unsupported format version.
+        """
+        self.file = open(path, 'rb')
+        header = self.file.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            self.file.close()
+            raise ValueError('{} is not a robot world recording'.format(path))
+        magic, self.version, self.keyframe_interval, self.width, self.height = HEADER.unpack(header)
+        if self.version != VERSION:
+            self.file.close()
+            raise ValueError('unsupported recording version {}'.format(self.version))
+        self.stride = self.width + 2
+        self.keyframes = []    # container, (turn, offset, length) of each keyframe
+        self.chunks = []       # container, (first turn, number of turns, offset, length) of each event chunk
+        while True:
+            chunk_header = self.file.read(CHUNK.size)
+            if len(chunk_header) < CHUNK.size:
+                break
+            chunk_type, turn, turns, length = CHUNK.unpack(chunk_header)
+            offset = self.file.tell()
+            if chunk_type == KEYFRAME:
+                self.keyframes.append((turn, offset, length))
+            else:
+                self.chunks.append((turn, turns, offset, length))
+            self.file.seek(length, 1)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+
+    def get_keyframe_turns(self):
+        """
+        Returns the full turns at which the recording has a keyframe: list
+        """
+        return [turn for turn, offset, length in self.keyframes]
+
+
+    def get_last_turn(self):
+        """
+        Returns the number of the last full turn whose events were recorded, or -1 if there are none: int
+        """
+        if not self.chunks:
+            return -1
+        turn, turns, offset, length = self.chunks[-1]
+        return turn + turns - 1
+
+
+    def iter_events(self, start=0, end=None):
+        """
+        Yields the recorded events of the full turns from start up to but not including end, in the order in which
+        they happened. The events are read lazily, one chunk at a time.
+
+        Parameter start is the first full turn: int
+
+        Parameter end is the full turn after the last one, or None to read until the end of the recording: int
+
+        Returns a generator of events: Event
+        """
+        for first, turns, offset, length in self.chunks:
+            if first + turns <= start or (end is not None and first >= end):
+                continue
+            self.file.seek(offset)
+            values = get_values(zlib.decompress(self.file.read(length)))
+            lengths = values[:turns]
+            position = turns
+            for turn, count in enumerate(lengths, first):      # stepper
+                if turn >= start and (end is None or turn < end):
+                    for event in decode(values[position:position + count], self.stride, turn):
+                        yield event
+                position += count
+
+
+    def load_world(self, turn):
+        """
+        Restores the recorded world as it was at the start of the given full turn. The world is restored from
+        the nearest keyframe before the turn, and the remaining turns are simulated again, which gives exactly
+        the same results as the original run. Note that changes made from outside of the simulation, e.g. robots
+        fixed in the GUI, are only restored if they happened before the keyframe.
+
+        Parameter turn is the number of the full turn: int
+
+        Returns the restored world: RobotWorld
+
+        Raises ValueError if the recording has no keyframe before the turn.
+        """
+        keyframes = [keyframe for keyframe in self.keyframes if keyframe[0] <= turn]
+        if not keyframes:
+            raise ValueError('no keyframe before turn {}'.format(turn))
+        keyframe_turn, offset, length = keyframes[-1]
+        self.file.seek(offset)
+        world = snapshot.loads(self.file.read(length))
+        world.run(turn - keyframe_turn)
+        return world
+
+
+    def close(self):
+        """
+        Closes the file of the recording.
+        """
+        self.file.close()
@@ -0,0 +1,388 @@
+import math
+import struct
+import zlib
+
+from direction import Direction
+
+
+PALETTE = ((211, 211, 211), (20, 20, 20), (0, 255, 0), (255, 255, 0), (255, 0, 0))    # colors by pixel value
+FLOOR = 0
+WALL = 1
+WORKING = 2
+STUCK = 3
+BROKEN = 4
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+GIF_CODE_SIZE = 3          # the smallest LZW code size that fits the colors of the palette
+GIF_MAX_CODES = 4096       # the LZW code table of GIF images is limited to 12-bit codes
+
+
+class Renderer():
+    """
+    The class Renderer draws a robot world as an image without Qt, e.g. for test artifacts and batch reports.
+
+    The images look like the GUI: walls are dark gray, the floor is light gray and the robots are triangles
+    pointing in their facing, drawn in red if they are broken, in yellow if they are stuck and in green otherwise.
+
+    An image is a bytearray with one byte per pixel, row by row, holding indices to PALETTE. The floor and the walls
+    are drawn once and copied for each image, and only redrawn when walls have been added to the world. The robots
+    are drawn as horizontal spans of pixels computed once for each facing.
+
+    See write_png and GifWriter
+    """
+
+    def __init__(self, world, square_size=4):
+        """
+        Creates a new renderer for the given world.
+
+        Parameter world is the world to draw: RobotWorld
+
+        Parameter square_size is the width and height of a square in pixels: int
+        """
+        self.world = world                                  # fixed value
+        self.square_size = square_size                      # fixed value
+        self.width = world.get_width() * square_size        # fixed value, width of the images in pixels
+        self.height = world.get_height() * square_size      # fixed value, height of the images in pixels
+        self.background = None                              # most-recent holder, the floor and the walls
+        self.background_wall_changes = -1                   # most-recent holder, wall changes of the world when drawn
+        self.spans = {}                                     # container, pixel spans of a robot by facing in degrees
+
+
+    def get_width(self):
+        """
+        Returns the width of the images in pixels: int
+        """
+        return self.width
+
+
+    def get_height(self):
+        """
+        Returns the height of the images in pixels: int
+        """
+        return self.height
+
+
+    def draw_background(self):
+        """
+        Draws the floor and the walls of the world if walls have been added since they were last drawn.
+
+        Returns the image of the floor and the walls: bytearray
+        """
+        world = self.world
+        if self.background_wall_changes == world.wall_changes:
+            return self.background
+        size = self.square_size
+        squares = (bytes([FLOOR]) * size, bytes([WALL]) * size)
+        walls = world.walls
+        background = bytearray()
+        for y in range(world.get_height()):         # stepper
+            start = (y + 1) * world.stride + 1
+            if isinstance(walls, dict):             # sparse wall layers can not be sliced
+                row = [walls[index] for index in range(start, start + world.get_width())]
+            else:
+                row = walls[start:start + world.get_width()]
+            background += b''.join([squares[wall] for wall in row]) * size
+        self.background = background
+        self.background_wall_changes = world.wall_changes
+        return background
+
+
+    def get_spans(self, degrees):
+        """
+        Returns the pixels covered by a robot facing in the given direction, as a list of (row, start, end) spans
+        relative to the top left corner of its square. The shape is the triangle of RobotGraphicsItem rotated
+        clockwise around the center of the square.
+
+        Parameter degrees is the facing of the robot, see Direction.get_degrees: int
+
+        Returns the spans: list
+        """
+        spans = self.spans.get(degrees)
+        if spans is None:
+            size = self.square_size
+            half = size / 2
+            cos = math.cos(math.radians(degrees))
+            sin = math.sin(math.radians(degrees))
+            spans = []
+            for row in range(size):                 # stepper
+                covered = []
+                for column in range(size):          # stepper
+                    # Rotate the center of the pixel back to the unrotated triangle and test if it is inside
+                    dx = column + 0.5 - half
+                    dy = row + 0.5 - half
+                    x = dx * cos + dy * sin + half
+                    y = -dx * sin + dy * cos + half
+                    if y <= size and abs(x - half) <= y / 2:
+                        covered.append(column)
+                if covered:
+                    spans.append((row, covered[0], covered[-1] + 1))
+            self.spans[degrees] = spans
+        return spans
+
+
+    def render(self):
+        """
+        Draws the current state of the world.
+
+        Returns the image: bytearray
+        """
+        world = self.world
+        image = bytearray(self.draw_background())
+        size = self.square_size
+        width = self.width
+        for robot in world.get_robots():            # stepper
+            location = robot.get_location()
+            if robot.is_broken():
+                color = BROKEN
+            elif world.is_stuck_at(world.get_index(location)):
+                color = STUCK
+            else:
+                color = WORKING
+            corner = location.y * size * width + location.x * size
+            for row, start, end in self.get_spans(Direction.get_degrees(robot.get_facing())):
+                position = corner + row * width
+                image[position + start:position + end] = bytes([color]) * (end - start)
+        return image
+
+
+    def save_png(self, path):
+        """
+        Saves the current state of the world as a PNG image.
+
+        Parameter path is the name of the file: string
+        """
+        write_png(path, self.width, self.height, self.render())
+
+
+    def save_frames(self, path_format, frames, turns_per_frame=1):
+        """
+        Runs the world and saves a PNG image of it before the first full turn and after every turns_per_frame
+        full turns.
+
+        Parameter path_format is the name of the files with a place for the frame number, e.g. 'frame{:05d}.png': string
+
+        Parameter frames is the number of images to save: int
+
+        Parameter turns_per_frame is the number of full turns between the images: int
+        """
+        for frame in range(frames):                 # stepper
+            if frame:
+                self.world.run(turns_per_frame)
+            self.save_png(path_format.format(frame))
+
+
+    def save_gif(self, path, frames, turns_per_frame=1, delay=10):
+        """
+        Runs the world and saves an animated GIF image of it with a frame before the first full turn and after
+        every turns_per_frame full turns.
+
+        Parameter path is the name of the file: string
+
+        Parameter frames is the number of frames: int
+
+        Parameter turns_per_frame is the number of full turns between the frames: int
+
+        Parameter delay is the time each frame is shown in hundredths of a second: int
+        """
+        with GifWriter(path, self.width, self.height, delay) as gif:
+            for frame in range(frames):             # stepper
+                if frame:
+                    self.world.run(turns_per_frame)
+                gif.add_frame(self.render())
+
+
+def write_png(path, width, height, image):
+    """
+    Saves an image as an indexed-color PNG file.
+
+    Parameter path is the name of the file: string
+
+    Parameter width is the width of the image in pixels: int
+
+    Parameter height is the height of the image in pixels: int
+
+    Parameter image holds one index to PALETTE for each pixel, row by row: bytearray
+    """
+    rows = bytearray()
+    for y in range(height):                         # stepper
+        rows.append(0)                              # no filter
+        rows += image[y * width:(y + 1) * width]
+    with open(path, 'wb') as file:
+        file.write(PNG_SIGNATURE)
+        file.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)))
+        file.write(_png_chunk(b'PLTE', b''.join(bytes(color) for color in PALETTE)))
+        file.write(_png_chunk(b'IDAT', zlib.compress(bytes(rows), 6)))
+        file.write(_png_chunk(b'IEND', b''))
+
+
+def _png_chunk(chunk_type, data):
+    """
+    Returns a PNG chunk with the given type and data: bytes
+    """
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+class GifWriter():
+    """
+    The class GifWriter writes animated GIF images frame by frame. Each frame only stores the smallest rectangle
+    that contains all the pixels changed since the previous frame, so frames in which few robots move are small
+    and quick to encode.
+
+    GifWriters can be used in with statements, which close them at the end.
+    """
+
+    def __init__(self, path, width, height, delay=10):
+        """
+        Creates a new GIF file.
+
+        Parameter path is the name of the file: string
+
+        Parameter width is the width of the frames in pixels: int
+
+        Parameter height is the height of the frames in pixels: int
+
+        Parameter delay is the time each frame is shown in hundredths of a second: int
+        """
+        self.width = width          # fixed value
+        self.height = height        # fixed value
+        self.delay = delay          # fixed value
+        self.previous = None        # most-recent holder, the previous frame
+        self.file = open(path, 'wb')
+        palette = b''.join(bytes(color) for color in PALETTE)
+        palette += bytes(3 * (2 ** GIF_CODE_SIZE) - len(palette))
+        self.file.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0xf0 | (GIF_CODE_SIZE - 1), 0, 0))
+        self.file.write(palette)
+        # Loop forever
+        self.file.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+
+
+    def add_frame(self, image):
+        """
+        Adds a frame to the animation.
+
+        Parameter image holds one index to PALETTE for each pixel, row by row: bytearray
+        """
+        width = self.width
+        left, top, right, bottom = 0, 0, width, self.height
+        if self.previous is not None:
+            left, top, right, bottom = _changed_area(self.previous, image, width, self.height)
+            if right == 0:
+                # Nothing changed, but the frame is still needed for the timing
+                left, top, right, bottom = 0, 0, 1, 1
+        self.previous = bytes(image)
+        pixels = bytearray()
+        for y in range(top, bottom):                # stepper
+            pixels += image[y * width + left:y * width + right]
+        self.file.write(struct.pack('<BBBBHBB', 0x21, 0xf9, 4, 0x04, self.delay, 0, 0))
+        self.file.write(struct.pack('<BHHHHB', 0x2c, left, top, right - left, bottom - top, 0))
+        self.file.write(bytes([GIF_CODE_SIZE]))
+        data = _lzw_encode(pixels, GIF_CODE_SIZE)
+        for start in range(0, len(data), 255):      # stepper
+            block = data[start:start + 255]
+            self.file.write(bytes([len(block)]) + block)
+        self.file.write(b'\x00')
+
+
+    def close(self):
+        """
+        Ends the animation and closes the file.
+        """
+        self.file.write(b'\x3b')
+        self.file.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _changed_area(previous, image, width, height):
+    """
+    Finds the smallest rectangle that contains all the pixels that differ between two images.
+
+    Returns the left, top, right and bottom edges of the rectangle, or zeros if the images are equal: tuple
+    """
+    top = None
+    bottom = 0
+    left = width
+    right = 0
+    for y in range(height):                         # stepper
+        start = y * width
+        old = previous[start:start + width]
+        new = image[start:start + width]
+        if old == new:
+            continue
+        if top is None:
+            top = y
+        bottom = y + 1
+        # The differing bits of the rows as one integer, the first pixel being the most significant byte
+        difference = int.from_bytes(old, 'big') ^ int.from_bytes(new, 'big')
+        left = min(left, width - (difference.bit_length() + 7) // 8)
+        right = max(right, width - ((difference & -difference).bit_length() - 1) // 8)
+    if top is None:
+        return 0, 0, 0, 0
+    return left, top, right, bottom
+
+
+def _lzw_encode(pixels, code_size):
+    """
+    Compresses pixels with the variable-length LZW coding of GIF images.
+
+    Parameter pixels holds the pixel values: bytearray
+
+    Parameter code_size is the number of bits of the pixel values: int
+
+    Returns the compressed data: bytes
+    """
+    clear = 1 << code_size
+    end = clear + 1
+    output = bytearray()
+    buffer = 0          # gatherer, bits not yet written
+    bits = 0            # gatherer, number of bits in buffer
+    width = code_size + 1
+    table = {}
+    next_code = end + 1
+    buffer |= clear << bits
+    bits += width
+    prefix = -1
+    for pixel in pixels:                            # stepper
+        if prefix < 0:
+            prefix = pixel
+            continue
+        key = (prefix << 8) | pixel
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        buffer |= prefix << bits
+        bits += width
+        if next_code < GIF_MAX_CODES:
+            table[key] = next_code
+            if next_code == 1 << width:
+                width += 1
+            next_code += 1
+        else:
+            # The code table is full, start over
+            buffer |= clear << bits
+            bits += width
+            table = {}
+            next_code = end + 1
+            width = code_size + 1
+        prefix = pixel
+        while bits >= 8:
+            output.append(buffer & 0xff)
+            buffer >>= 8
+            bits -= 8
+    if prefix >= 0:
+        buffer |= prefix << bits
+        bits += width
+    buffer |= end << bits
+    bits += width
+    while bits > 0:
+        output.append(buffer & 0xff)
+        buffer >>= 8
+        bits -= 8
+    return bytes(output)
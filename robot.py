@@ -1,4 +1,16 @@
 from direction import Direction
+from events import EVENT, Event
+
+
+# The kinds of the events shifted to their place in the first integer of an event in the event log, see events.Event
+MOVE = Event.MOVE << 32
+SPIN = Event.SPIN << 32
+WALL_COLLISION = Event.WALL_COLLISION << 32
+ROBOT_COLLISION = Event.ROBOT_COLLISION << 32
+DESTROY = Event.DESTROY << 32
+FIX = Event.FIX << 32
+
+pack_event = EVENT.pack    # packs the three integers of an event for the event log, see events.EVENT
 
 
 class Robot():
@@ -47,6 +59,7 @@ class Robot():
         self.destroyed = False   # flag
         self.brain = None        # most-recent holder
         self.facing = None       # most-recent holder
+        self.turn_number = None  # fixed value, assigned by RobotWorld.add_robot
 
 
     def set_name(self, name):
@@ -78,6 +91,8 @@ class Robot():
         Parameter new_brain is the artificial intelligence that controls the robot: spinbot/lovebot/drunkbot/... object
         """
         self.brain = new_brain
+        if self.world is not None:
+            self.world.update_activity(self)
 
 
     def get_brain(self):
@@ -126,7 +141,14 @@ class Robot():
 
         See fix() and take_turn()
         """
-        self.destroyed = True
+        if not self.destroyed:
+            self.destroyed = True
+            if self.world is not None:
+                self.world.breakdowns += 1
+                self.world.update_activity(self)
+                if self.world.event_log is not None:
+                    self.world.event_log.extend(pack_event(DESTROY | self.turn_number,
+                                                           self.world.get_index(self.location), -1))
 
 
     def fix(self):
@@ -135,7 +157,13 @@ class Robot():
 
         See destroy()
         """
-        self.destroyed = False
+        if self.destroyed:
+            self.destroyed = False
+            if self.world is not None:
+                self.world.update_activity(self)
+                if self.world.event_log is not None:
+                    self.world.event_log.extend(pack_event(FIX | self.turn_number,
+                                                           self.world.get_index(self.location), -1))
 
 
     def is_broken(self):
@@ -166,10 +194,7 @@ class Robot():
         if world is None:
             return True
 
-        for value in Direction.get_values():          # most-recent holder
-            if not world.get_square(self.get_location().get_neighbor(value)).is_wall_square():
-                return False
-        return True
+        return world.is_stuck_at(world.get_index(self.get_location()))
 
 
     def set_world(self, world,  location,  facing):
@@ -184,7 +209,7 @@ class Robot():
 
         Parameter location is the coordinates at which the bot is placed: Coordinates
 
-        Parameter facing is the direction the robot is facing initially : tuple
+        Parameter facing is the direction the robot is facing initially, or its direction code : tuple or int
 
         Returns False if the square at the given location is not empty or the robot is already located in some world (the given one or some other world), True otherwise: boolean
 
@@ -196,7 +221,7 @@ class Robot():
         else:
             self.world = world
             self.location = location
-            self.facing = facing
+            self.facing = Direction.get_value(facing)
             return True
 
 
@@ -205,9 +230,14 @@ class Robot():
         Turns the robot in the specified direction, if the
         robot is intact. If the robot is broken, the method does nothing.
 
-        Parameter new_facing is the new facing direction of the robot: tuple
+        Parameter new_facing is the new facing direction of the robot, or its direction code: tuple or int
         """
         if not self.is_broken():
+            new_facing = Direction.get_value(new_facing)
+            world = self.world
+            if world is not None and world.event_log is not None and new_facing != self.facing:
+                world.event_log.extend(pack_event(SPIN | self.turn_number, Direction.CODES[self.facing],
+                                                  Direction.CODES[new_facing]))
             self.facing = new_facing
 
 
@@ -229,26 +259,44 @@ class Robot():
         another robot, the other robot breaks and the moving robot
         stays intact.
 
-        Parameter direction is the direction to move in: tuple
+        Parameter direction is the direction to move in, or its direction code: tuple or int
 
         Returns a boolean value indicating if the movement was successful (False means that either the robot was broken to begin with or that it collided with something instead of successfully moving): boolean
         """
         if self.is_broken():
             return False
 
-        target = self.get_location().get_neighbor(direction)
+        world = self.get_world()
+        target = world.get_neighbor(self.get_location(), direction)
         current_square = self.get_location_square()
-        target_square = self.get_world().get_square(target)
-        self.spin(direction)
+        target_square = world.get_square(target)
+        # The event of the move or the collision shows the new facing, so the turn is not written as a spin.
+        self.facing = Direction.get_value(direction)
         if target_square.is_empty():
             current_square.remove_robot()
+            if world.event_log is not None:
+                world.event_log.extend(pack_event(MOVE | self.turn_number, current_square.index, target_square.index))
+            if world.robot_counts is not None:
+                world.robot_counts.add(self.location.x, self.location.y, -1)
+                world.robot_counts.add(target.x, target.y, 1)
             self.location = target
             target_square.set_robot(self)
+            if world.spatial_index is not None:
+                world.spatial_index.move(self.turn_number, target_square.index)
+            world.moves += 1
             return True
         elif target_square.get_robot() is not None:
+            world.robot_collisions += 1
+            if world.event_log is not None:
+                world.event_log.extend(pack_event(ROBOT_COLLISION | self.turn_number, current_square.index,
+                                                  target_square.index))
             target_square.get_robot().destroy()
             return False
         else:   # collided with wall
+            world.wall_collisions += 1
+            if world.event_log is not None:
+                world.event_log.extend(pack_event(WALL_COLLISION | self.turn_number, current_square.index,
+                                                  world.get_index(target)))
             self.destroy()
             return False
 
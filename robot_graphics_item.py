@@ -17,17 +17,26 @@ class RobotGraphicsItem(QtWidgets.QGraphicsPolygonItem):
     method names. (for example: updatePosition() vs update_position())
     """
 
-    def __init__(self, robot, square_size):
+    # The brushes are shared by all the items instead of being created again on every update
+    BROKEN_BRUSH = QBrush(QColor(255, 0, 0))
+    STUCK_BRUSH = QBrush(QColor(255, 255, 0))
+    WORKING_BRUSH = QBrush(QColor(0, 255, 0))
+
+    def __init__(self, robot, square_size, worker=None):
         # Call init of the parent object
         super(RobotGraphicsItem, self).__init__()
 
         # Do other stuff
         self.robot = robot
         self.square_size = square_size
+        self.worker = worker    # fixed value, the SimulationWorker that simulates the robot, or None
         brush = QtGui.QBrush(1) # 1 for even fill
         self.setBrush(brush)
         self.constructTriangleVertices()
-        self.updateAll()
+        if worker is None:
+            self.updateAll()
+        else:
+            self.updateFromFrame(worker.frame)
 
 
     def constructTriangleVertices(self):
@@ -65,6 +74,24 @@ class RobotGraphicsItem(QtWidgets.QGraphicsPolygonItem):
         self.updateColor()
 
 
+    def updateFromFrame(self, frame):
+        """
+        Updates the visual representation to match the location, direction and status of the parent robot
+        in the given frame. The robot itself is not read, so the simulation may go on meanwhile.
+
+        See: Frame in simulation_worker.py
+        """
+        number = self.robot.turn_number
+        self.setPos(self.square_size * frame.xs[number], self.square_size * frame.ys[number])
+        self.setRotation(Direction.get_degrees(Direction.VALUES[frame.facings[number]]))
+        if frame.broken[number]:
+            self.setBrush(RobotGraphicsItem.BROKEN_BRUSH)
+        elif frame.stuck[number]:
+            self.setBrush(RobotGraphicsItem.STUCK_BRUSH)
+        else:
+            self.setBrush(RobotGraphicsItem.WORKING_BRUSH)
+
+
     def updatePosition(self):
         """
         Implement me!
@@ -84,7 +111,7 @@ class RobotGraphicsItem(QtWidgets.QGraphicsPolygonItem):
         loc = Robot.get_location(self.robot)
         x = Coordinates.get_x(loc)
         y = Coordinates.get_y(loc)
-        self.setPos(self.square_size * x), (self.square_size * y)
+        self.setPos(self.square_size * x, self.square_size * y)
 
 
     def updateRotation(self):
@@ -97,8 +124,7 @@ class RobotGraphicsItem(QtWidgets.QGraphicsPolygonItem):
         """
         facing = Robot.get_facing(self.robot)
         direction = Direction.get_degrees(facing)
-        transform = QTransform()
-        transform.rotate(direction)
+        self.setRotation(direction)
 
 
     def updateColor(self):
@@ -119,11 +145,11 @@ class RobotGraphicsItem(QtWidgets.QGraphicsPolygonItem):
         Look at robot.py for checking the status of the robot.
         """
         if Robot.is_broken(self.robot) is True:
-            self.robot.setBrush(QBrush(QColor(255, 0, 0)))
-        if Robot.is_stuck(self.robot) is True:
-            self.robot.setBrush(QBrush(QColor(255, 255, 0)))
+            self.setBrush(RobotGraphicsItem.BROKEN_BRUSH)
+        elif Robot.is_stuck(self.robot) is True:
+            self.setBrush(RobotGraphicsItem.STUCK_BRUSH)
         else:
-            self.robot.setBrush(QBrush(QColor(0, 255, 0)))
+            self.setBrush(RobotGraphicsItem.WORKING_BRUSH)
 
     def mousePressEvent(self, *args, **kwargs):
         """
@@ -134,5 +160,8 @@ class RobotGraphicsItem(QtWidgets.QGraphicsPolygonItem):
 
         Hint: You don't need to do anything with the *args or **kwargs. One line solution should be sufficient.
         """
-        if Robot.is_broken(self.robot) is True:
-            Robot.fix(self.robot)
+        if self.worker is None:
+            if Robot.is_broken(self.robot) is True:
+                Robot.fix(self.robot)
+        else:
+            self.worker.fix_robot(self.robot)
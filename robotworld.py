@@ -1,4 +1,17 @@
-from square import Square
+from array import array
+from bisect import bisect_left, bisect_right
+
+from coordinates import Coordinates
+from direction import Direction
+from run_summary import RunSummary
+from events import ChangeTracker, EventCollector, decode
+from profiler import Profiler
+from flow_field import FlowFieldCache
+from spatial_index import SpatialIndex
+from fenwick_tree import FenwickTree
+import snapshot
+import world_map
+from square import Square, OUTSIDE
 
 
 class RobotWorld():
@@ -6,46 +19,116 @@ class RobotWorld():
     The class RobotWorld describes a two dimensional world made up
     of squares that different kinds of robots can inhabit. The squares are
     identified by unique coordinates which range from 0...width-1 and
-    0...height-1. Each square is represented by a Square object.
+    0...height-1.
+
+    The state of the squares is kept in two flat layers indexed by square:
+    a wall layer (a bytearray with one byte per square) and an occupant
+    layer (an integer array holding the turn number plus one of the robot in
+    each square, or zero for no robot). Derived layers count the walls next
+    to each square and mark which neighbors of each square are blocked. Square objects are only lightweight
+    views of these layers which are created on demand by get_square.
+    The layers are surrounded by a border of wall squares one square wide,
+    so the neighbors of any square in the world can be examined without
+    bounds checks.
 
     Robots can be added to the robot world, and the robot world
     maintains a robot listing which allows robots to take their turns in
     a round-robin fashion, in the order in which they were added.
-    Each robot is represented by a Robot object.
+    Each robot is represented by a Robot object. The world also keeps a
+    sorted list of the turn numbers of the active robots, i.e. the robots
+    that are neither broken nor stuck, so that a full turn only visits the
+    robots that can actually do something.
 
     See the documentation Robot, Square, Coordinates
     """
 
-    def __init__ (self, width, height):
+    def __init__ (self, width, height, walls=None, adjacent_walls=None, occupants=None, blocked=None):
         """
         Creates a new robot world with the specified dimensions.
-        Initially all the squares of the new world are empty.
+        Initially all the squares of the new world are empty, unless
+        existing wall layers are given.
 
         Parameter width is the width of the world in squares: int
 
         Parameter height is the height of the world in squares: int
+
+        Parameter walls is an optional existing wall layer, border included, e.g. a memory-mapped one: bytearray
+
+        Parameter adjacent_walls is the number of walls next to each square of the given wall layer: bytearray
+
+        Parameter occupants is an optional empty occupant layer, border included: array
+
+        Parameter blocked is the blocked mask of each square of the given wall layer, see get_blocked_mask: bytearray
+
+        See open_map(path)
         """
-        self.squares = [None] * width
-        for x in range(self.get_width()):      # stepper
-            self.squares[x] = [None] * height
-            for y in range(self.get_height()):    # stepper
-                self.squares[x][y] = Square()    # fixed value
+        self.width = width                      # fixed value
+        self.height = height                    # fixed value
+        self.stride = width + 2                 # fixed value, length of a row including the border
+        area = self.stride * (height + 2)
+        self.walls_writable = True              # flag, False for read-only memory-mapped wall layers
+        if walls is None:
+            walls = bytearray(b'\x01') * area
+            for y in range(height):             # stepper
+                start = (y + 1) * self.stride + 1
+                walls[start:start + width] = bytes(width)
+            adjacent_walls = bytearray(area)
+            for x in range(width):              # stepper
+                adjacent_walls[self.stride + x + 1] += 1
+                adjacent_walls[height * self.stride + x + 1] += 1
+            for y in range(height):             # stepper
+                adjacent_walls[(y + 1) * self.stride + 1] += 1
+                adjacent_walls[(y + 1) * self.stride + width] += 1
+            blocked = bytearray(area)
+            for x in range(width):              # stepper
+                blocked[self.stride + x + 1] |= 1                   # the border is to the north
+                blocked[height * self.stride + x + 1] |= 4          # the border is to the south
+            for y in range(height):             # stepper
+                blocked[(y + 1) * self.stride + width] |= 2         # the border is to the east
+                blocked[(y + 1) * self.stride + 1] |= 8             # the border is to the west
+        self.walls = walls                                    # wall flag of each square, border included
+        self.adjacent_walls = adjacent_walls                  # number of walls next to each square
+        if occupants is None:
+            occupants = array('l', [0]) * area
+        self.occupants = occupants                            # robot turn number + 1 in each square, 0 if empty
+        self.blocked = blocked                                # blocked neighbors of each square, see get_blocked_mask
+        self.neighbor_offsets = {}                            # index offset of the neighbor by direction and direction code
+        for code, direction in enumerate(Direction.VALUES):    # stepper
+            self.neighbor_offsets[direction] = self.neighbor_offsets[code] = direction[1] * self.stride + direction[0]
+        self.interned = {}                                    # interned coordinates of squares by index
         self.robots = []                        # container
+        self.active = []                        # container, sorted turn numbers of robots that are not broken or stuck
         self.turn = 0                         # kinda like stepper (but not quite) index to robots list
+        self.moves = 0                        # gatherer, successful moves
+        self.wall_collisions = 0              # gatherer, collisions with walls
+        self.robot_collisions = 0             # gatherer, collisions with other robots
+        self.breakdowns = 0                   # gatherer, intact robots that have been broken
+        self.full_turns = 0                   # stepper, full turns taken with next_full_turn
+        self.wall_changes = 0                 # stepper, walls added with add_wall, tells views when to redraw walls
+        self.listeners = []                   # container, objects notified at the end of each full turn
+        self.event_log = None                 # gatherer, changes during the current full turn, None if not recorded
+        self.change_tracker = None            # fixed value, tracker of changed robots once get_changed_robots is called
+        self.profiler = None                  # most-recent holder, the profiler while profiling, see start_profiling
+        self.flow_fields = None               # fixed value, cache of distance fields once get_distance_field is called
+        self.spatial_index = None             # fixed value, index of robot locations once it is first queried
+        self.wall_counts = None               # fixed value, tree of wall counts once count_walls is called
+        self.robot_counts = None              # fixed value, tree of robot counts once count_robots is called
+        if blocked is None:
+            self.recount_blocked()
 
 
     def get_width(self):
         """
         Returns width of the world in squares: int
         """
-        return len(self.squares)
+        return self.width
 
 
     def get_height(self):
         """
         Returns the height of the world in squares: int
         """
-        return len(self.squares[0])
+        return self.height
 
 
     def add_robot(self, robot, location, facing):
@@ -65,8 +148,16 @@ class RobotWorld():
         See Robot.set_world(RobotWorld, Coordinates, Direction)
         """
         if robot.set_world(self, location, facing):
+            robot.turn_number = len(self.robots)
             self.robots.append(robot)
             self.get_square(location).set_robot(robot)
+            self.update_activity(robot)
+            if self.change_tracker is not None:
+                self.change_tracker.changed.add(robot.turn_number)
+            if self.spatial_index is not None:
+                self.spatial_index.add(robot.turn_number, self.get_index(location))
+            if self.robot_counts is not None:
+                self.robot_counts.add(location.get_x(), location.get_y(), 1)
             return True
         else:
             return False
@@ -80,9 +171,357 @@ class RobotWorld():
 
         Parameter location is the location of the wall: Coordinates
 
+        Walls can not be added to worlds whose wall layer is a read-only memory-mapped file.
+
         Returns a boolean value indicating if the operation succeeded: boolean
         """
-        return self.get_square(location).set_wall()
+        if not self.walls_writable or not self.get_square(location).set_wall():
+            return False
+        self.wall_changes += 1
+        if self.wall_counts is not None:
+            self.wall_counts.add(location.get_x(), location.get_y(), 1)
+        index = self.get_index(location)
+        for offset in self.get_neighbor_offsets():      # stepper
+            self.adjacent_walls[index + offset] += 1
+            if self.adjacent_walls[index + offset] == 4 and self.occupants[index + offset]:
+                self.update_activity(self.robots[self.occupants[index + offset] - 1])
+        return True
+
+
+    def recount_adjacent_walls(self):
+        """
+        Recomputes the number of walls next to each square from the wall layer. This is needed when the
+        wall layer has been filled in directly instead of with add_wall.
+        """
+        walls = self.walls
+        counts = bytearray(len(walls))
+        offsets = self.get_neighbor_offsets()
+        index = walls.find(1)
+        while index != -1:
+            for offset in offsets:      # stepper
+                if 0 <= index + offset < len(counts):
+                    counts[index + offset] += 1
+            index = walls.find(1, index + 1)
+        self.adjacent_walls = counts
+
+
+    def recount_blocked(self):
+        """
+        Recomputes the blocked mask of each square from the wall and occupant layers. This is needed when the
+        layers have been filled in directly instead of with add_wall and add_robot.
+
+        See get_blocked_mask(index)
+        """
+        self.blocked = self.compute_blocked()
+
+
+    def compute_blocked(self, robots=True):
+        """
+        Computes the blocked mask of each square from the wall layer and the locations of the robots.
+
+        Parameter robots states whether the robots block squares. If not, only the walls do: boolean
+
+        Returns the masks of all the squares, border included: bytearray
+
+        See get_blocked_mask(index)
+        """
+        area = len(self.walls)
+        cells = bytearray(self.walls)
+        if robots:
+            for robot in self.robots:       # stepper
+                cells[self.get_index(robot.get_location())] = 1
+        # The layer as one integer, one byte per square, so that all the squares are shifted to their
+        # neighbors at once: byte i of north is 1 if square i - stride is blocked, and so on.
+        layer = int.from_bytes(cells, 'little')
+        north = layer << 8 * self.stride
+        east = layer >> 8
+        south = layer >> 8 * self.stride
+        west = layer << 8
+        mask = (north | east << 1 | south << 2 | west << 3) & ((1 << 8 * area) - 1)
+        return bytearray(mask.to_bytes(area, 'little'))
+
+
+    def block_square(self, index):
+        """
+        Marks the square with the given index as blocked in the blocked masks of its neighbors. This is done
+        whenever a wall or a robot is placed in a square.
+
+        Parameter index is the index of the square: int
+        """
+        blocked = self.blocked
+        stride = self.stride
+        blocked[index + stride] |= 1        # the square below has this square to the north
+        blocked[index - 1] |= 2             # the square on the left has this square to the east
+        blocked[index - stride] |= 4        # the square above has this square to the south
+        blocked[index + 1] |= 8             # the square on the right has this square to the west
+
+
+    def unblock_square(self, index):
+        """
+        Marks the square with the given index as empty in the blocked masks of its neighbors. This is done
+        whenever a robot leaves a square.
+
+        Parameter index is the index of the square: int
+        """
+        blocked = self.blocked
+        stride = self.stride
+        blocked[index + stride] &= 14
+        blocked[index - 1] &= 13
+        blocked[index - stride] &= 11
+        blocked[index + 1] &= 7
+
+
+    def get_blocked_mask(self, index):
+        """
+        Returns the blocked mask of the square with the given index. Bit number c of the mask (1 << c) is set if the
+        neighbor in the direction with code c contains a wall or a robot, see Direction.get_code. The masks are
+        kept up to date as robots move, so brains can see all the blocked directions with one lookup. The masks
+        of wall squares are not used and not kept up to date.
+
+        Parameter index is the index of the square: int
+
+        Returns the mask from 0 to 15: int
+        """
+        return self.blocked[index]
+
+
+    def update_activity(self, robot):
+        """
+        Adds the given robot to the active robots of this world or removes it from them, depending on whether the
+        robot is broken or stuck. This is called by the robots whenever they are broken, fixed or given a new brain,
+        and by the world when a new wall makes a robot stuck.
+
+        Parameter robot is a robot of this world: Robot
+        """
+        number = robot.turn_number
+        if self.change_tracker is not None:
+            self.change_tracker.changed.add(number)
+        position = bisect_left(self.active, number)
+        present = position < len(self.active) and self.active[position] == number
+        if robot.is_broken() or robot.is_stuck():
+            if present:
+                del self.active[position]
+        elif not present:
+            self.active.insert(position, number)
+
+
+    def add_listener(self, listener):
+        """
+        Adds a listener that is notified at the end of each full turn. The listener must have the method
+        turn_ended(world), which can read the changes made during the turn from the event log of the world
+        before the log is cleared.
+
+        While the world has listeners, its robots append every move, spin, collision, breakdown and fix to the
+        event log, a bytearray of packed integers (see events.Event). A listener can copy the log as it is, e.g. to
+        a file, without unpacking it. When the world has no listeners the event log is None and recording costs
+        nothing but that check.
+
+        Parameter listener is the object to notify: object
+
+        See events.get_values(data) and events.decode(values, stride, turn)
+        """
+        self.listeners.append(listener)
+        if self.event_log is None:
+            self.event_log = bytearray()
+
+
+    def remove_listener(self, listener):
+        """
+        Removes a listener added with add_listener.
+
+        Parameter listener is the object to remove: object
+        """
+        self.listeners.remove(listener)
+        if not self.listeners:
+            self.event_log = None
+
+
+    def get_distance_field(self, target):
+        """
+        Returns the length of the shortest path around the walls from every square of the world to the given
+        target square. The fields of recently used targets are cached, so all the robots heading for the same
+        square share one search, and the cache is emptied when walls are added.
+
+        Parameter target is the location of the target square: Coordinates
+
+        Returns the distance of each square by index, -1 for walls and unreachable squares: array
+
+        See flow_field.FlowFieldCache
+        """
+        if self.flow_fields is None:
+            self.flow_fields = FlowFieldCache(self)
+        return self.flow_fields.get_field(self.get_index(target))
+
+
+    def get_spatial_index(self):
+        """
+        Returns the index of the locations of the robots of this world. The index is created when it is first
+        needed and from then on kept up to date as robots are added and move.
+
+        Returns the index: SpatialIndex
+
+        See spatial_index.SpatialIndex
+        """
+        if self.spatial_index is None:
+            self.spatial_index = SpatialIndex(self)
+        return self.spatial_index
+
+
+    def nearest_robot(self, location, predicate=None):
+        """
+        Returns the robot nearest to the given location, counting the steps between the squares, among the robots
+        for which the predicate is true. Only the robots near the location are examined, not all the robots.
+
+        Parameter location is the location to search from: Coordinates
+
+        Parameter predicate is an optional function that is called with a robot and returns whether the robot
+        may be returned, e.g. to skip the robot searching or broken robots: function
+
+        Returns the nearest robot, or None if there is no such robot: Robot
+
+        See spatial_index.SpatialIndex.nearest_robot
+        """
+        return self.get_spatial_index().nearest_robot(location, predicate)
+
+
+    def robots_within(self, location, radius):
+        """
+        Returns the robots at most the given number of steps away from the given location. Only the robots near
+        the location are examined, not all the robots.
+
+        Parameter location is the center of the area: Coordinates
+
+        Parameter radius is the largest number of steps included: int
+
+        Returns the robots in turn order: list
+
+        See spatial_index.SpatialIndex.robots_within
+        """
+        return self.get_spatial_index().robots_within(location, radius)
+
+
+    def get_wall_counts(self):
+        """
+        Returns the tree of the number of walls in each square of this world. The tree is created from the wall
+        layer when it is first needed and from then on kept up to date in add_wall.
+
+        Returns the tree: FenwickTree
+        """
+        if self.wall_counts is None:
+            counts = bytearray()
+            for y in range(self.height):        # stepper
+                start = (y + 1) * self.stride + 1
+                counts += self.walls[start:start + self.width]
+            self.wall_counts = FenwickTree(self.width, self.height)
+            self.wall_counts.build(counts)
+        return self.wall_counts
+
+
+    def get_robot_counts(self):
+        """
+        Returns the tree of the number of robots in each square of this world. The tree is created from the
+        locations of the robots when it is first needed and from then on kept up to date as robots are added
+        and move.
+
+        Returns the tree: FenwickTree
+        """
+        if self.robot_counts is None:
+            counts = bytearray(self.width * self.height)
+            for robot in self.robots:           # stepper
+                location = robot.get_location()
+                counts[location.get_y() * self.width + location.get_x()] = 1
+            self.robot_counts = FenwickTree(self.width, self.height)
+            self.robot_counts.build(counts)
+        return self.robot_counts
+
+
+    def count_walls(self, first, second):
+        """
+        Counts the walls in a rectangle of squares in O(log width * log height) time. The corner squares are
+        included in the rectangle, and the wall border around the world is not counted.
+
+        Parameter first is a corner of the rectangle: Coordinates
+
+        Parameter second is the opposite corner of the rectangle: Coordinates
+
+        Returns the number of walls: int
+
+        See fenwick_tree.FenwickTree
+        """
+        return self.get_wall_counts().get_sum(min(first.get_x(), second.get_x()), min(first.get_y(), second.get_y()),
+                                              max(first.get_x(), second.get_x()), max(first.get_y(), second.get_y()))
+
+
+    def count_robots(self, first, second):
+        """
+        Counts the robots, broken ones included, in a rectangle of squares in O(log width * log height) time.
+        The corner squares are included in the rectangle.
+
+        Parameter first is a corner of the rectangle: Coordinates
+
+        Parameter second is the opposite corner of the rectangle: Coordinates
+
+        Returns the number of robots: int
+
+        See fenwick_tree.FenwickTree
+        """
+        return self.get_robot_counts().get_sum(min(first.get_x(), second.get_x()), min(first.get_y(), second.get_y()),
+                                               max(first.get_x(), second.get_x()), max(first.get_y(), second.get_y()))
+
+
+    def start_profiling(self):
+        """
+        Starts measuring the full turns of this world: the time spent in each brain class, the moves, failed
+        moves and collisions, and the stuck checks. Only this world is affected. Profiling again starts from zero.
+
+        See profiler.Profiler and get_profile_report()
+        """
+        self.profiler = Profiler(self)
+
+
+    def stop_profiling(self):
+        """
+        Stops measuring the full turns of this world.
+
+        Returns the final report, or None if the world was not being profiled: dict
+
+        See get_profile_report()
+        """
+        report = self.get_profile_report()
+        self.profiler = None
+        return report
+
+
+    def get_profile_report(self):
+        """
+        Returns what has been measured since profiling was started, see profiler.Profiler.get_report, or None if
+        the world is not being profiled: dict
+        """
+        if self.profiler is None:
+            return None
+        return self.profiler.get_report()
+
+
+    def get_changed_robots(self):
+        """
+        Returns the robots that have changed in any way since the previous call: robots that have moved, spun,
+        been broken or fixed, become stuck or been added to the world. The first call starts tracking the changes
+        and returns all the robots. Tracking uses the event log of the world, see add_listener.
+
+        Returns the changed robots in turn order: list
+        """
+        if self.change_tracker is None:
+            self.change_tracker = ChangeTracker()
+            self.add_listener(self.change_tracker)
+            return self.get_robots()
+        return [self.robots[number] for number in sorted(self.change_tracker.take_changed(self))]
+
+
+    def get_number_of_active_robots(self):
+        """
+        Returns the number of robots in this world that are neither broken nor stuck: int
+        """
+        return len(self.active)
 
 
     def get_square(self, coordinates):
@@ -93,9 +532,96 @@ class RobotWorld():
         this method returns a square that contains a wall and is not located in any robot world: Square
         """
         if self.contains(coordinates):
-            return self.squares[coordinates.get_x()][coordinates.get_y()]
+            return Square(self, self.get_index(coordinates))
         else:
-            return Square(True)
+            return OUTSIDE
+
+
+    def get_index(self, coordinates):
+        """
+        Returns the index of the square at the given location in the wall and occupant layers of this world.
+        The squares are stored row by row. The coordinates may also point to the wall border just outside of the world.
+
+        Parameter coordinates is a location in the world: Coordinates
+
+        Returns the index of the square: int
+        """
+        return (coordinates.get_y() + 1) * self.stride + coordinates.get_x() + 1
+
+
+    def get_neighbor_offset(self, direction):
+        """
+        Returns the difference between the index of a square and the index of its neighbor in the given direction.
+
+        Parameter direction is a compass direction or a direction code: tuple or int
+
+        Returns the index offset: int
+        """
+        return self.neighbor_offsets[direction]
+
+
+    def get_neighbor_offsets(self):
+        """
+        Returns the neighbor index offsets in all four directions, in the order of the direction codes: list
+        """
+        return [self.neighbor_offsets[code] for code in range(4)]
+
+
+    def is_stuck_at(self, index):
+        """
+        Determines whether all four neighbors of the square with the given index are walls. The number of walls
+        next to each square is kept up to date in add_wall, so this is a single lookup.
+
+        Parameter index is the index of a square of this world: int
+
+        Returns a boolean value stating whether the square is surrounded by walls: boolean
+        """
+        return self.adjacent_walls[index] == 4
+
+
+    def get_coordinates(self, x, y):
+        """
+        Returns the interned coordinates of a square of this world or of its wall border. Repeated calls with
+        the same values return the same Coordinates object.
+
+        Parameter x: int
+
+        Parameter y: int
+
+        Returns the coordinate pair: Coordinates
+        """
+        if not (-1 <= x <= self.width and -1 <= y <= self.height):
+            return Coordinates(x, y)
+        index = (y + 1) * self.stride + x + 1
+        coordinates = self.interned.get(index)
+        if coordinates is None:
+            coordinates = self.interned[index] = Coordinates(x, y)
+        return coordinates
+
+
+    def get_neighbor(self, coordinates, direction):
+        """
+        Returns the interned coordinates next to the given ones in the given direction. For coordinates inside this
+        world the neighbor is found with a table lookup, and a new object is only created the first time a square
+        is visited.
+
+        Parameter coordinates is a location: Coordinates
+
+        Parameter direction is a compass direction or a direction code: tuple or int
+
+        Returns the neighboring coordinates: Coordinates
+
+        See Coordinates.get_neighbor(direction)
+        """
+        x = coordinates.x
+        y = coordinates.y
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return coordinates.get_neighbor(direction)
+        index = (y + 1) * self.stride + x + 1 + self.neighbor_offsets[direction]
+        neighbor = self.interned.get(index)
+        if neighbor is None:
+            neighbor = self.interned[index] = Coordinates(x + Direction.get_x_step(direction), y + Direction.get_y_step(direction))
+        return neighbor
 
 
     def get_number_of_robots(self):
@@ -157,11 +683,139 @@ class RobotWorld():
 
     def next_full_turn(self):
         """
-        Lets each robot take its next turn. That is, calls the next_robot_turn
-        a number of times equal to the number of robots in the world.
+        Lets each robot take its next turn. That is, the effect is the same as calling next_robot_turn
+        a number of times equal to the number of robots in the world. However, broken and stuck robots
+        would not do anything during their turns, so only the active robots are visited, in turn order.
+        At the end of the full turn the listeners of the world are notified and the event log is cleared.
+        If the world is being profiled, the profiler takes the turns of the robots, see start_profiling.
+        """
+        robots = self.robots
+        active = self.active
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.full_turn_started()
+        for low, high in ((self.turn, len(robots)), (0, self.turn)):
+            # The active list may change during the turn, so the next active robot is always searched again.
+            position = bisect_left(active, low)
+            while position < len(active) and active[position] < high:
+                number = active[position]
+                if profiler is None:
+                    robots[number].take_turn()
+                else:
+                    profiler.take_turn(robots[number])
+                position = bisect_right(active, number)
+        self.full_turns += 1
+        if self.listeners:
+            for listener in self.listeners:
+                listener.turn_ended(self)
+            del self.event_log[:]
+        if profiler is not None:
+            profiler.full_turn_ended()
+
+
+    def run(self, n_turns, stop_when=None):
+        """
+        Runs the given number of full turns. This is equivalent to calling next_full_turn() repeatedly.
+
+        Parameter n_turns is the number of full turns to run: int
+
+        Parameter stop_when is an optional function that is called with this world after each full turn. If it
+        returns a true value, the run stops early: function
+
+        Returns a summary of what happened during the run: RunSummary
+        """
+        moves = self.moves
+        wall_collisions = self.wall_collisions
+        robot_collisions = self.robot_collisions
+        breakdowns = self.breakdowns
+        turns = 0
+        next_full_turn = self.next_full_turn
+        while turns < n_turns:
+            next_full_turn()
+            turns += 1
+            if stop_when is not None and stop_when(self):
+                break
+        return RunSummary(turns, self.moves - moves, self.wall_collisions - wall_collisions,
+                          self.robot_collisions - robot_collisions, self.breakdowns - breakdowns)
+
+
+    def iter_events(self, turns=None):
+        """
+        Runs full turns and yields a record of every change in the world as it happens: moves, spins, collisions,
+        breakdowns and fixes. The turns are run lazily, one at a time, as the events are consumed, and only the
+        events of one turn are kept in memory, so even an endless run uses constant memory.
+
+        Parameter turns is the number of full turns to run, or None to run until the consumer stops: int
+
+        Returns a generator of events: Event
+
+        See events.Event
+        """
+        collector = EventCollector()
+        self.add_listener(collector)
+        try:
+            count = 0
+            while turns is None or count < turns:
+                self.next_full_turn()
+                count += 1
+                for event in decode(collector.values, self.stride, self.full_turns - 1):
+                    yield event
+        finally:
+            self.remove_listener(collector)
+
+
+    def save_snapshot(self, path):
+        """
+        Saves the walls, the robots, the current turn and the counters of this world in a compact binary file.
+
+        Parameter path is the name of the file: string
+
+        See load_snapshot(path) and snapshot.save_snapshot(world, path)
+        """
+        snapshot.save_snapshot(self, path)
+
+
+    @staticmethod
+    def load_snapshot(path):
+        """
+        Restores a world saved with save_snapshot. Running the restored world gives exactly the same results as
+        running the original world would have.
+
+        Parameter path is the name of the file: string
+
+        Returns the restored world: RobotWorld
+        """
+        return snapshot.load_snapshot(path)
+
+
+    def save_map(self, path):
+        """
+        Saves the wall layers of this world in a map file that can be memory-mapped with open_map.
+
+        Parameter path is the name of the file: string
+
+        See world_map.save_map(world, path)
+        """
+        world_map.save_map(self, path)
+
+
+    @staticmethod
+    def open_map(path, copy_on_write=True):
+        """
+        Creates a new world whose wall layers are memory-mapped from a map file saved with save_map. The walls
+        are not read or copied, so opening even a very large map is fast, and all processes that open the same
+        map share its memory.
+
+        Parameter path is the name of the file: string
+
+        Parameter copy_on_write states whether walls can be added to the world. The new walls are only stored in
+        the memory of this process and the file is never changed. Otherwise add_wall always fails: boolean
+
+        Returns the new world: RobotWorld
+
+        See world_map.open_map(path, copy_on_write)
         """
-        for count in range(self.get_number_of_robots()):      # stepper
-            self.next_robot_turn()
+        return world_map.open_map(path, copy_on_write)
 
 
     def contains(self, coordinates):
@@ -174,7 +828,7 @@ class RobotWorld():
         """
         x_coordinate = coordinates.get_x()
         y_coordinate = coordinates.get_y()
-        return 0 <= x_coordinate < self.get_width() and 0 <= y_coordinate < self.get_height()
+        return 0 <= x_coordinate < self.width and 0 <= y_coordinate < self.height
 
 
     def get_robots(self):
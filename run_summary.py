@@ -0,0 +1,74 @@
+class RunSummary():
+    """
+    The class RunSummary describes what happened in a robot world while it was
+    run for a number of full turns.
+
+    See RobotWorld.run()
+    """
+
+    def __init__(self, turns, moves, wall_collisions, robot_collisions, broken):
+        """
+        Creates a new run summary.
+
+        Parameter turns is the number of full turns that were run: int
+
+        Parameter moves is the number of successful moves: int
+
+        Parameter wall_collisions is the number of times a robot collided with a wall: int
+
+        Parameter robot_collisions is the number of times a robot collided with another robot: int
+
+        Parameter broken is the number of times an intact robot was broken: int
+        """
+        self.turns = turns                          # fixed value
+        self.moves = moves                          # fixed value
+        self.wall_collisions = wall_collisions      # fixed value
+        self.robot_collisions = robot_collisions    # fixed value
+        self.broken = broken                        # fixed value
+
+
+    def get_turns(self):
+        """
+        Returns the number of full turns that were run: int
+        """
+        return self.turns
+
+
+    def get_moves(self):
+        """
+        Returns the number of successful moves: int
+        """
+        return self.moves
+
+
+    def get_wall_collisions(self):
+        """
+        Returns the number of collisions with walls: int
+        """
+        return self.wall_collisions
+
+
+    def get_robot_collisions(self):
+        """
+        Returns the number of collisions with other robots: int
+        """
+        return self.robot_collisions
+
+
+    def get_collisions(self):
+        """
+        Returns the total number of collisions: int
+        """
+        return self.wall_collisions + self.robot_collisions
+
+
+    def get_broken(self):
+        """
+        Returns the number of times an intact robot was broken: int
+        """
+        return self.broken
+
+
+    def __str__(self):
+        return '{} turns: {} moves, {} collisions, {} robots broken'.format(
+            self.turns, self.moves, self.get_collisions(), self.broken)
@@ -0,0 +1,146 @@
+import math
+import random
+
+from robotworld import RobotWorld
+from robot import Robot
+from coordinates import Coordinates
+from direction import Direction
+from spinbot import Spinbot
+from drunkbot import Drunkbot
+from nosebot import Nosebot
+from lovebot import Lovebot
+
+
+def create_main_world(seed=2):
+    """
+    Creates the world of main.py: a 10 x 8 world with two walls, a nosebot, a spinbot, a lovebot that loves
+    the spinbot and a drunkbot.
+
+    Parameter seed is the random seed of the drunkbot: int
+
+    Returns the created world: RobotWorld
+    """
+    world = RobotWorld(10, 8)
+    wall1_coordinates = Coordinates(2, 4)
+    world.add_wall(wall1_coordinates)
+    wall2_coordinates = Coordinates(0, 5)
+    world.add_wall(wall2_coordinates)
+
+    nose_location = Coordinates(9, 7)
+    nose_body = Robot('Nose')
+    nose_brain = Nosebot(nose_body)
+    nose_body.set_brain(nose_brain)
+    world.add_robot(nose_body, nose_location, Direction.EAST)
+
+    spin_location = Coordinates(2, 3)
+    spin_body = Robot('Spin')
+    spin_brain = Spinbot(spin_body)
+    spin_body.set_brain(spin_brain)
+    world.add_robot(spin_body, spin_location, Direction.SOUTH)
+
+    love_location = Coordinates(8, 5)
+    love_body = Robot('Love')
+    love_brain = Lovebot(love_body, spin_body)
+    love_body.set_brain(love_brain)
+    world.add_robot(love_body, love_location, Direction.EAST)
+
+    drunk_location = Coordinates(5, 5)
+    drunk_body = Robot('Drunk')
+    drunk_brain = Drunkbot(drunk_body, seed)
+    drunk_body.set_brain(drunk_brain)
+    world.add_robot(drunk_body, drunk_location, Direction.EAST)
+    return world
+
+
+BRAIN_MIXES = ('spinbot', 'nosebot', 'drunkbot', 'lovebot', 'mixed')    # brain mixes of create_benchmark_world
+
+
+def create_benchmark_world(robots, brains, walled=False, seed=0):
+    """
+    Creates a square world for benchmarks with the given number of robots placed in random empty squares.
+    The world is four times as large as the number of robots, and at least 10 x 10.
+
+    The brain mix is one of BRAIN_MIXES:
+
+     - 'spinbot', 'nosebot' and 'drunkbot': every robot has a brain of the given kind.
+
+     - 'lovebot': the robots form a chain in which each lovebot loves the robot before it. The first robot
+       of the chain is a drunkbot.
+
+     - 'mixed': the robots take turns to be spinbots, nosebots, drunkbots and lovebots that love the robot
+       before them.
+
+    Parameter robots is the number of robots: int
+
+    Parameter brains is the brain mix: string
+
+    Parameter walled is True if a fifth of the squares should be walls, False for an open world: boolean
+
+    Parameter seed is the random seed for placing the walls and the robots and for the drunkbots: int
+
+    Returns the created world: RobotWorld
+
+    Raises ValueError if the brain mix is not one of BRAIN_MIXES.
+    """
+    if brains not in BRAIN_MIXES:
+        raise ValueError('unknown brain mix {!r}'.format(brains))
+    size = max(10, math.ceil(math.sqrt(robots * 4)))
+    generator = random.Random(seed)
+    world = RobotWorld(size, size)
+    squares = [(x, y) for y in range(size) for x in range(size)]
+    generator.shuffle(squares)
+    walls = len(squares) // 5 if walled else 0
+    for x, y in squares[:walls]:
+        world.add_wall(Coordinates(x, y))
+    kinds = {'spinbot': (Spinbot,), 'nosebot': (Nosebot,), 'drunkbot': (Drunkbot,),
+             'lovebot': (Lovebot,), 'mixed': (Spinbot, Nosebot, Drunkbot, Lovebot)}[brains]
+    previous = None
+    for number, (x, y) in enumerate(squares[walls:walls + robots]):     # stepper
+        body = Robot('Robot {}'.format(number))
+        kind = kinds[number % len(kinds)]
+        if kind is Lovebot and previous is None:
+            kind = Drunkbot
+        if kind is Drunkbot:
+            body.set_brain(Drunkbot(body, generator.getrandbits(32)))
+        elif kind is Lovebot:
+            body.set_brain(Lovebot(body, previous))
+        else:
+            body.set_brain(kind(body))
+        world.add_robot(body, Coordinates(x, y), Direction.VALUES[generator.randrange(4)])
+        previous = body
+    return world
+
+
+def create_navigation_world(size, brain_class, obstacles, seed=0):
+    """
+    Creates a square world in which a quarter of the squares are walls, with one navigating robot that has to
+    cross the world and the given number of nosebots moving around as obstacles. The navigating robot starts in
+    the first empty square and its goal is the empty square farthest away from it along the walls.
+
+    Parameter size is the width and height of the world in squares: int
+
+    Parameter brain_class is the class of the brain of the navigating robot, e.g. navigator.Navigator: class
+
+    Parameter obstacles is the number of nosebots: int
+
+    Parameter seed is the random seed for placing the walls and the nosebots: int
+
+    Returns the created world, the navigating robot and the length of the shortest path to its goal: tuple
+    """
+    generator = random.Random(seed)
+    world = RobotWorld(size, size)
+    for count in range(size * size // 4):       # stepper
+        world.add_wall(Coordinates(generator.randrange(size), generator.randrange(size)))
+    empty = [Coordinates(x, y) for y in range(size) for x in range(size)
+             if not world.get_square(Coordinates(x, y)).is_wall_square()]
+    start = empty[0]
+    distances = world.get_distance_field(start)
+    goal = max(empty, key=lambda location: distances[world.get_index(location)])
+    body = Robot('Navigator')
+    body.set_brain(brain_class(body, goal))
+    world.add_robot(body, start, Direction.EAST)
+    for count in range(obstacles):              # stepper
+        obstacle = Robot('Obstacle')
+        obstacle.set_brain(Nosebot(obstacle))
+        world.add_robot(obstacle, generator.choice(empty), Direction.VALUES[generator.randrange(4)])
+    return world, body, distances[world.get_index(goal)]
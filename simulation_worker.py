@@ -0,0 +1,282 @@
+import threading
+import time
+from array import array
+
+from direction import Direction
+
+
+def get_wall_rows(world):
+    """
+    Returns the wall flags of the squares of a world row by row, without the wall border: bytes
+    """
+    stride = world.stride
+    walls = world.walls
+    rows = bytearray()
+    for y in range(world.height):       # stepper
+        start = (y + 1) * stride + 1
+        if isinstance(walls, dict):     # sparse wall layers can not be sliced
+            rows += bytes(walls[index] for index in range(start, start + world.width))
+        else:
+            rows += walls[start:start + world.width]
+    return bytes(rows)
+
+
+class Frame():
+    """
+    The class Frame is a picture of the robots and the walls of a world between two full turns. The contents of a
+    frame never change, so a user interface can draw a frame without holding the lock of the SimulationWorker
+    that published it while the worker goes on with the next full turn.
+
+    The robots are described by their turn numbers: frame.xs[number] is the x coordinate of the robot
+    frame.robots[number], and so on.
+
+    See SimulationWorker.take_frame
+    """
+
+    def __init__(self, full_turns, robots, xs, ys, facings, broken, stuck, wall_changes, walls):
+        """
+        Creates a new frame.
+
+        Parameter full_turns is the number of full turns the world had taken: int
+
+        Parameter robots are the robots of the world in turn order: tuple
+
+        Parameter xs are the x coordinates of the robots: array
+
+        Parameter ys are the y coordinates of the robots: array
+
+        Parameter facings are the direction codes of the facings of the robots: bytes
+
+        Parameter broken are the broken flags of the robots: bytes
+
+        Parameter stuck are the stuck flags of the robots: bytes
+
+        Parameter wall_changes is the number of walls added to the world, see RobotWorld.wall_changes: int
+
+        Parameter walls are the wall flags of the squares, see get_wall_rows: bytes
+        """
+        self.full_turns = full_turns        # fixed value
+        self.robots = robots                # fixed value
+        self.xs = xs                        # fixed value
+        self.ys = ys                        # fixed value
+        self.facings = facings              # fixed value
+        self.broken = broken                # fixed value
+        self.stuck = stuck                  # fixed value
+        self.wall_changes = wall_changes    # fixed value
+        self.walls = walls                  # fixed value
+
+
+class SimulationWorker():
+    """
+    The class SimulationWorker runs the full turns of a robot world in a background thread, so that a user
+    interface can stay responsive while the world is simulated, even as fast as possible.
+
+    The worker holds its lock while it takes a full turn. Any other thread must hold the same lock while it
+    changes the world, e.g. when it adds a robot, so that it always sees the world between two full turns:
+
+        with worker.lock:
+            ...
+            worker.update_frame()
+
+    At the end of each full turn the worker publishes a Frame, a picture of the robots and the walls that never
+    changes. A user interface draws the world from the latest frame, see take_frame, without holding the lock,
+    so drawing never delays the simulation. Only the robots that have changed are examined for a new frame, see
+    RobotWorld.get_changed_robots.
+
+    The worker starts paused. It does not depend on Qt.
+    """
+
+    def __init__(self, world, turns_per_second=None):
+        """
+        Creates a new worker and starts its thread. The worker is paused until play is called.
+
+        Parameter world is the world to simulate: RobotWorld
+
+        Parameter turns_per_second is the target number of full turns per second, or None to run as fast as
+        possible: float
+        """
+        self.world = world                          # fixed value
+        self.lock = threading.Lock()                # fixed value, held while the world is being changed
+        self.turns_per_second = turns_per_second    # most-recent holder
+        self.playing = threading.Event()            # flag, set while the world is being simulated
+        self.stopped = False                        # flag
+        self.xs = array('l')                        # container, x coordinate of each robot for the next frame
+        self.ys = array('l')                        # container, y coordinate of each robot for the next frame
+        self.facings = bytearray()                  # container, facing code of each robot for the next frame
+        self.broken = bytearray()                   # container, broken flag of each robot for the next frame
+        self.stuck = bytearray()                    # container, stuck flag of each robot for the next frame
+        self.robots = ()                            # most-recent holder, robots of the world for the frames
+        self.walls = None                           # most-recent holder, wall flags for the frames, see get_wall_rows
+        self.wall_changes = None                    # most-recent holder, wall changes of the world for the walls
+        self.frame = None                           # most-recent holder, the latest frame
+        self.unseen = set()                         # gatherer, turn numbers of robots changed since take_frame
+        self.frame_published = threading.Condition()    # fixed value, notified when a frame is published
+        with self.lock:
+            self.update_frame()
+        self.thread = threading.Thread(target=self.run, name='SimulationWorker', daemon=True)
+        self.thread.start()
+
+
+    def run(self):
+        """
+        The loop of the worker thread. Takes full turns while the worker is playing, pacing them to the target rate.
+        """
+        deadline = time.monotonic()
+        while not self.stopped:
+            if not self.playing.is_set():
+                self.playing.wait(0.1)
+                deadline = time.monotonic()
+                continue
+            with self.lock:
+                if not self.playing.is_set():
+                    continue
+                self.world.next_full_turn()
+                self.update_frame()
+            turns_per_second = self.turns_per_second
+            if turns_per_second is None:
+                # Let threads waiting for the lock have it between the turns
+                time.sleep(0)
+                deadline = time.monotonic()
+            else:
+                deadline = max(deadline + 1 / turns_per_second, time.monotonic() - 1)
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+
+    def play(self):
+        """
+        Starts or continues simulating the world.
+        """
+        self.playing.set()
+
+
+    def pause(self):
+        """
+        Pauses the simulation. Returns after the full turn that is being taken, if any, has been finished.
+        """
+        self.playing.clear()
+        with self.lock:
+            pass
+
+
+    def is_playing(self):
+        """
+        Returns a boolean value indicating whether the world is being simulated: boolean
+        """
+        return self.playing.is_set()
+
+
+    def step(self):
+        """
+        Takes a single full turn in the calling thread. Does nothing while the worker is playing.
+        """
+        if not self.is_playing():
+            with self.lock:
+                self.world.next_full_turn()
+                self.update_frame()
+
+
+    def update_frame(self):
+        """
+        Publishes a frame of the world as it is now. The caller must hold the lock of the worker.
+        """
+        world = self.world
+        robots = world.robots
+        missing = len(robots) - len(self.facings)
+        if missing > 0:
+            self.xs.extend([0] * missing)
+            self.ys.extend([0] * missing)
+            self.facings.extend(bytes(missing))
+            self.broken.extend(bytes(missing))
+            self.stuck.extend(bytes(missing))
+        changed = world.get_changed_robots()
+        for robot in changed:       # stepper
+            number = robot.turn_number
+            location = robot.get_location()
+            self.xs[number] = location.x
+            self.ys[number] = location.y
+            self.facings[number] = Direction.CODES[robot.get_facing()]
+            self.broken[number] = robot.is_broken()
+            self.stuck[number] = robot.is_stuck()
+        if self.wall_changes != world.wall_changes:
+            self.walls = get_wall_rows(world)
+            self.wall_changes = world.wall_changes
+        if len(self.robots) != len(robots):
+            # Robots are only ever added to a world, so the robots of the frames change only when their number does
+            self.robots = tuple(robots)
+        # Slices of the arrays are copied as they are, without making an int object for each robot
+        frame = Frame(world.full_turns, self.robots, self.xs[:], self.ys[:], bytes(self.facings),
+                      bytes(self.broken), bytes(self.stuck), self.wall_changes, self.walls)
+        with self.frame_published:
+            self.frame = frame
+            self.unseen.update(robot.turn_number for robot in changed)
+            self.frame_published.notify_all()
+
+
+    def take_frame(self):
+        """
+        Returns the latest frame and the turn numbers of the robots that have changed since the previous call,
+        and forgets them. The first call returns every robot. This method does not wait for the lock of the
+        worker, so a user interface can call it whenever it draws the world.
+
+        Returns the frame and a set of turn numbers: tuple
+        """
+        with self.frame_published:
+            unseen = self.unseen
+            self.unseen = set()
+            return self.frame, unseen
+
+
+    def wait_for_frame(self, full_turns, timeout=None):
+        """
+        Waits until a frame of the world after the given number of full turns has been published.
+
+        Parameter full_turns is the smallest number of full turns of the frame: int
+
+        Parameter timeout is the longest time to wait in seconds, or None to wait as long as it takes: float
+
+        Returns the latest frame, or None if the time ran out first: Frame
+        """
+        with self.frame_published:
+            if self.frame_published.wait_for(lambda: self.frame.full_turns >= full_turns, timeout):
+                return self.frame
+            return None
+
+
+    def fix_robot(self, robot):
+        """
+        Fixes a broken robot between two full turns and publishes a new frame, e.g. when the user clicks the robot.
+
+        Parameter robot is the robot to fix: Robot
+        """
+        with self.lock:
+            if robot.is_broken():
+                robot.fix()
+            self.update_frame()
+
+
+    def set_turns_per_second(self, turns_per_second):
+        """
+        Sets the target number of full turns per second.
+
+        Parameter turns_per_second is the target rate, or None to run as fast as possible: float
+        """
+        self.turns_per_second = turns_per_second
+
+
+    def get_turns_per_second(self):
+        """
+        Returns the target number of full turns per second, or None if the world is run as fast as possible: float
+        """
+        return self.turns_per_second
+
+
+    def stop(self):
+        """
+        Stops the worker thread and waits for it to finish its current full turn.
+        """
+        self.stopped = True
+        self.playing.set()
+        self.thread.join()
+        self.playing.clear()
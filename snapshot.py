@@ -0,0 +1,279 @@
+import random
+import struct
+import sys
+import zlib
+from array import array
+
+from direction import Direction
+from robot import Robot
+from robot_brain import RobotBrain
+from spinbot import Spinbot
+from nosebot import Nosebot
+from drunkbot import Drunkbot
+from lovebot import Lovebot
+from homingbot import Homingbot
+from navigator import Navigator, ReplanningNavigator
+
+
+MAGIC = b'RWSNAP'
+VERSION = 3
+HEADER = struct.Struct('<6sHIIIQQQQI')    # magic, version, width, height, turn, moves, wall collisions,
+                                          # robot collisions, breakdowns, number of robots
+FULL_TURNS = struct.Struct('<Q')          # full turns of the world
+LENGTH = struct.Struct('<I')
+GAUSS = struct.Struct('<Bd')              # flag and value of the saved Gaussian of a random generator
+RANDOM_STATE = struct.Struct('<625I')     # words of the state of a random generator, including its position
+
+BRAIN_TYPES = [None, Spinbot, Nosebot, Drunkbot, Lovebot, Homingbot,    # brain classes by brain type code
+               Navigator, ReplanningNavigator]
+
+
+def save_snapshot(world, path):
+    """
+    Saves the state of the given world in a binary file.
+
+    Parameter world is the world to save: RobotWorld
+
+    Parameter path is the name of the file: string
+
+    See dumps(world)
+    """
+    with open(path, 'wb') as file:
+        file.write(dumps(world))
+
+
+def load_snapshot(path):
+    """
+    Restores a world from a file saved with save_snapshot.
+
+    Parameter path is the name of the file: string
+
+    Returns the restored world: RobotWorld
+
+    See loads(data)
+    """
+    with open(path, 'rb') as file:
+        return loads(file.read(), path)
+
+
+def dumps(world):
+    """
+    Returns the state of the given world in the binary snapshot format, which contains the following sections:
+
+     1. A header with the format version, the dimensions of the world, the current turn, the counters of the world
+        and the number of full turns.
+     2. The wall layer of the world without its border, compressed with zlib.
+     3. The robot table in columns: names, x and y coordinates, facing codes, broken flags and brain type codes.
+     4. The brain states: the random generator states of the drunkbots and the turn numbers of the beloveds of the
+        lovebots and homingbots, in turn order.
+     5. The navigator states: for each navigator in turn order, the coordinates of its goal, the number of turns
+        it has looked around and the index and last seen turn of each obstacle it remembers, oldest first. The
+        searches of the navigators are not saved, since a navigator that plans again from scratch chooses the
+        same steps as one that repairs its search.
+
+    Parameter world is the world to save: RobotWorld
+
+    Returns the snapshot: bytes
+
+    Raises ValueError if the world is sparse, some robot has a brain whose state can not be saved, or a lovebot
+    loves a robot that is not in the same world.
+    """
+    if isinstance(world.walls, dict):
+        # A sparse world has no wall layer to save, see SparseRobotWorld.save_snapshot
+        raise ValueError('sparse robot worlds can not be saved as snapshots')
+    robots = world.robots
+    xs = array('i', [robot.location.x for robot in robots])
+    ys = array('i', [robot.location.y for robot in robots])
+    facings = bytes(Direction.CODES[robot.facing] for robot in robots)
+    destroyed = bytes(robot.destroyed for robot in robots)
+    names = [robot.get_name().encode('utf-8') for robot in robots]
+    name_lengths = array('I', [len(name) for name in names])
+    brain_types = bytearray()
+    random_states = []
+    gausses = []
+    beloveds = array('i')
+    navigators = array('q')
+    for robot in robots:
+        brain = robot.get_brain()
+        if brain is not None and type(brain) not in BRAIN_TYPES:
+            raise ValueError('the brain of {} can not be saved'.format(robot.get_name()))
+        brain_types.append(BRAIN_TYPES.index(type(brain)) if brain is not None else 0)
+        if isinstance(brain, Drunkbot):
+            version, words, gauss = brain.random.getstate()
+            random_states.append(RANDOM_STATE.pack(*words))
+            gausses.append(GAUSS.pack(gauss is not None, gauss or 0.0))
+        elif isinstance(brain, Lovebot):
+            beloved = brain.get_beloved()
+            if beloved.get_world() is not world:
+                raise ValueError('the beloved of {} is not in the same world'.format(robot.get_name()))
+            beloveds.append(beloved.turn_number)
+        elif isinstance(brain, Navigator):
+            navigators.extend((brain.goal.x, brain.goal.y, brain.turns, len(brain.obstacles)))
+            for index, seen in brain.obstacles.items():     # stepper
+                navigators.extend((index, seen))
+
+    walls = bytearray()
+    for y in range(world.height):       # stepper
+        start = (y + 1) * world.stride + 1
+        walls += world.walls[start:start + world.width]
+
+    sections = [
+        HEADER.pack(MAGIC, VERSION, world.width, world.height, world.turn, world.moves, world.wall_collisions,
+                    world.robot_collisions, world.breakdowns, len(robots)),
+        FULL_TURNS.pack(world.full_turns),
+        _block(zlib.compress(bytes(walls))),
+        _block(_to_bytes(name_lengths)), _block(b''.join(names)),
+        _block(_to_bytes(xs)), _block(_to_bytes(ys)), _block(facings), _block(destroyed), _block(bytes(brain_types)),
+        _block(b''.join(random_states)), _block(b''.join(gausses)), _block(_to_bytes(beloveds)),
+        _block(_to_bytes(navigators)),
+    ]
+    return b''.join(sections)
+
+
+def loads(data, name='data'):
+    """
+    Restores a world from a snapshot returned by dumps.
+
+    Parameter data is the snapshot: bytes
+
+    Parameter name is the name of the snapshot for error messages: string
+
+    Returns the restored world: RobotWorld
+
+    Raises ValueError if the data is not a snapshot or has an unsupported format version.
+    """
+    from robotworld import RobotWorld
+
+    if len(data) < HEADER.size:
+        raise ValueError('{} is not a robot world snapshot'.format(name))
+    magic, version, width, height, turn, moves, wall_collisions, robot_collisions, breakdowns, count = \
+        HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('{} is not a robot world snapshot'.format(name))
+    if version != VERSION:
+        raise ValueError('unsupported snapshot version {}'.format(version))
+    full_turns, = FULL_TURNS.unpack_from(data, HEADER.size)
+    blocks = _read_blocks(data, HEADER.size + FULL_TURNS.size)
+
+    world = RobotWorld(width, height)
+    walls = zlib.decompress(next(blocks))
+    for y in range(height):             # stepper
+        start = (y + 1) * world.stride + 1
+        world.walls[start:start + width] = walls[y * width:(y + 1) * width]
+    world.recount_adjacent_walls()
+
+    name_lengths = _from_bytes('I', next(blocks))
+    names = next(blocks)
+    xs = _from_bytes('i', next(blocks))
+    ys = _from_bytes('i', next(blocks))
+    facings = next(blocks)
+    destroyed = next(blocks)
+    brain_types = next(blocks)
+    random_states = next(blocks)
+    gausses = next(blocks)
+    beloveds = _from_bytes('i', next(blocks))
+    navigators = _from_bytes('q', next(blocks))
+
+    robots = world.robots
+    stride = world.stride
+    occupants = world.occupants
+    adjacent_walls = world.adjacent_walls
+    get_coordinates = world.get_coordinates
+    lovebots = []
+    name_start = 0
+    random_start = 0
+    gauss_start = 0
+    navigator_start = 0
+    for number in range(count):         # stepper
+        name_end = name_start + name_lengths[number]
+        robot = Robot(names[name_start:name_end].decode('utf-8'))
+        name_start = name_end
+        x = xs[number]
+        y = ys[number]
+        index = (y + 1) * stride + x + 1
+        robot.world = world
+        robot.location = get_coordinates(x, y)
+        robot.facing = Direction.VALUES[facings[number]]
+        robot.destroyed = destroyed[number] != 0
+        robot.turn_number = number
+        brain_type = BRAIN_TYPES[brain_types[number]]
+        if brain_type is Drunkbot:
+            # The generator is created without seeding it, since its whole state is restored anyway.
+            brain = Drunkbot.__new__(Drunkbot)
+            RobotBrain.__init__(brain, robot)
+            brain.random = random.Random.__new__(random.Random)
+            words = RANDOM_STATE.unpack_from(random_states, random_start)
+            has_gauss, gauss = GAUSS.unpack_from(gausses, gauss_start)
+            brain.random.setstate((3, words, gauss if has_gauss else None))
+            random_start += RANDOM_STATE.size
+            gauss_start += GAUSS.size
+        elif brain_type is Lovebot or brain_type is Homingbot:
+            brain = brain_type(robot, None)
+            lovebots.append(brain)
+        elif brain_type is Navigator or brain_type is ReplanningNavigator:
+            goal_x, goal_y, turns, obstacles = navigators[navigator_start:navigator_start + 4]
+            brain = brain_type(robot, get_coordinates(goal_x, goal_y))
+            brain.turns = turns
+            values = navigators[navigator_start + 4:navigator_start + 4 + 2 * obstacles]
+            for position in range(0, len(values), 2):   # stepper
+                brain.obstacles[values[position]] = values[position + 1]
+            navigator_start += 4 + 2 * obstacles
+        elif brain_type is not None:
+            brain = brain_type(robot)
+        else:
+            brain = None
+        robot.brain = brain
+        robots.append(robot)
+        occupants[index] = number + 1
+        if brain is not None and not robot.destroyed and adjacent_walls[index] != 4:
+            world.active.append(number)
+    for brain, beloved in zip(lovebots, beloveds):
+        brain.beloved = robots[beloved]
+    world.recount_blocked()
+
+    world.turn = turn
+    world.moves = moves
+    world.wall_collisions = wall_collisions
+    world.robot_collisions = robot_collisions
+    world.breakdowns = breakdowns
+    world.full_turns = full_turns
+    return world
+
+
+def _block(data):
+    """
+    Returns the given bytes prefixed with their length: bytes
+    """
+    return LENGTH.pack(len(data)) + data
+
+
+def _read_blocks(data, offset):
+    """
+    Yields the length-prefixed blocks of the given data starting from the given offset.
+    """
+    while offset < len(data):
+        length, = LENGTH.unpack_from(data, offset)
+        offset += LENGTH.size
+        yield data[offset:offset + length]
+        offset += length
+
+
+def _to_bytes(values):
+    """
+    Returns the contents of the given array as little-endian bytes: bytes
+    """
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode, data):
+    """
+    Returns an array of the given type with the contents of the given little-endian bytes: array
+    """
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
@@ -0,0 +1,170 @@
+from fenwick_tree import FenwickTree
+from robotworld import RobotWorld
+
+
+class SparseLayer(dict):
+    """
+    The class SparseLayer is a layer of a robot world that only stores the squares whose values differ from
+    their default values. It can be indexed with square indices just like the bytearrays and arrays that
+    ordinary robot worlds use as their layers.
+    """
+
+    def __init__(self, default):
+        """
+        Creates a new layer in which every square has its default value.
+
+        Parameter default is a function that returns the default value of the square with the given index: function
+        """
+        super(SparseLayer, self).__init__()
+        self.default = default    # fixed value
+
+
+    def __missing__(self, index):
+        return self.default(index)
+
+
+    def __setitem__(self, index, value):
+        if value == self.default(index):
+            self.pop(index, None)
+        else:
+            super(SparseLayer, self).__setitem__(index, value)
+
+
+class SparseRobotWorld(RobotWorld):
+    """
+    The class SparseRobotWorld is a robot world for huge and mostly empty maps. It works exactly like RobotWorld,
+    but its layers are SparseLayer objects which only store walls, the squares next to walls and robots and the
+    squares that contain robots. Its memory use depends on the number of walls and robots, not on the size of the world.
+
+    Sparse worlds can not be saved as snapshots or maps, since those store the whole wall layer, and they have no
+    distance fields, which would cover the whole world.
+
+    See the documentation of RobotWorld
+    """
+
+    def __init__(self, width, height):
+        """
+        Creates a new sparse robot world with the specified dimensions.
+        Initially all the squares of the new world are empty.
+
+        Parameter width is the width of the world in squares: int
+
+        Parameter height is the height of the world in squares: int
+        """
+        self.stride = width + 2
+        super(SparseRobotWorld, self).__init__(width, height, SparseLayer(self.is_border),
+                                               SparseLayer(self.count_adjacent_border), SparseLayer(self.empty),
+                                               SparseLayer(self.mask_border))
+
+
+    def is_border(self, index):
+        """
+        Determines whether the square with the given index belongs to the wall border of the world.
+
+        Parameter index is the index of a square: int
+
+        Returns 1 for border squares and 0 for other squares: int
+        """
+        y, x = divmod(index, self.stride)
+        return int(x == 0 or x == self.stride - 1 or y == 0 or y == self.height + 1)
+
+
+    def count_adjacent_border(self, index):
+        """
+        Counts the border squares next to the square with the given index.
+
+        Parameter index is the index of a square: int
+
+        Returns the number of adjacent border squares: int
+        """
+        y, x = divmod(index, self.stride)
+        if not (0 < x < self.stride - 1 and 0 < y < self.height + 1):
+            return 0
+        return (x == 1) + (x == self.width) + (y == 1) + (y == self.height)
+
+
+    def mask_border(self, index):
+        """
+        Computes the blocked mask of the square with the given index from the border squares next to it,
+        see RobotWorld.get_blocked_mask.
+
+        Parameter index is the index of a square: int
+
+        Returns the blocked mask of the square: int
+        """
+        y, x = divmod(index, self.stride)
+        if not (0 < x < self.stride - 1 and 0 < y < self.height + 1):
+            return 0
+        return (y == 1) | (x == self.width) << 1 | (y == self.height) << 2 | (x == 1) << 3
+
+
+    def recount_blocked(self):
+        """
+        Does nothing, since the blocked masks of a sparse world are computed from its border on demand and kept
+        up to date as walls and robots are added, so there is never anything to recount.
+        """
+
+
+    def empty(self, index):
+        """
+        Returns the default value of the occupant layer, i.e. no robot: int
+        """
+        return 0
+
+
+    def get_wall_counts(self):
+        """
+        Returns the tree of the number of walls in each square of this world, see RobotWorld.get_wall_counts.
+        The entries of the tree are stored in a sparse layer and the walls are added one at a time, so the tree
+        takes memory and time in proportion to the number of walls, not to the size of the world.
+
+        Returns the tree: FenwickTree
+        """
+        if self.wall_counts is None:
+            self.wall_counts = FenwickTree(self.width, self.height, SparseLayer(self.empty))
+            for index in list(self.walls):      # stepper
+                if self.walls[index] and not self.is_border(index):
+                    y, x = divmod(index, self.stride)
+                    self.wall_counts.add(x - 1, y - 1, 1)
+        return self.wall_counts
+
+
+    def get_robot_counts(self):
+        """
+        Returns the tree of the number of robots in each square of this world, see RobotWorld.get_robot_counts.
+        Like the wall counts, the tree only stores its non-zero entries.
+
+        Returns the tree: FenwickTree
+        """
+        if self.robot_counts is None:
+            self.robot_counts = FenwickTree(self.width, self.height, SparseLayer(self.empty))
+            for robot in self.robots:           # stepper
+                self.robot_counts.add(robot.get_location().get_x(), robot.get_location().get_y(), 1)
+        return self.robot_counts
+
+
+    def get_distance_field(self, target):
+        """
+        Sparse worlds have no distance fields, since a field would cover the whole world.
+
+        Raises ValueError always.
+        """
+        raise ValueError('distance fields would cover the whole of a sparse robot world')
+
+
+    def save_snapshot(self, path):
+        """
+        Sparse worlds can not be saved as snapshots, since a snapshot stores the whole wall layer.
+
+        Raises ValueError always.
+        """
+        raise ValueError('sparse robot worlds can not be saved as snapshots')
+
+
+    def save_map(self, path):
+        """
+        Sparse worlds can not be saved as maps, since a map stores the whole wall layer.
+
+        Raises ValueError always.
+        """
+        raise ValueError('sparse robot worlds can not be saved as maps')
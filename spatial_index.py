@@ -0,0 +1,212 @@
+class SpatialIndex():
+    """
+    The class SpatialIndex keeps the robots of a world in buckets by grid cell, so that the robots near a location
+    can be found without going through all the robots of the world. The world is divided into square cells of
+    cell_size x cell_size squares, and each cell that contains robots has a set of their turn numbers. Robots
+    are added to the index when they are added to the world and moved between the buckets when they move to
+    another cell, which is a single comparison for moves within a cell.
+
+    Distances are Manhattan distances, i.e. the number of steps between two squares. Only the cells near the
+    query location are examined, and when the area to examine has more cells than there are cells with robots
+    in them, the cells with robots are examined instead, so queries on huge and mostly empty worlds are fast too.
+
+    See RobotWorld.nearest_robot and RobotWorld.robots_within
+    """
+
+    def __init__(self, world, cell_size=8):
+        """
+        Creates a new index of the robots currently in the given world.
+
+        Parameter world is the world whose robots are indexed: RobotWorld
+
+        Parameter cell_size is the width and height of a cell in squares: int
+        """
+        self.world = world                                      # fixed value
+        self.cell_size = cell_size                              # fixed value
+        self.columns = (world.width + cell_size - 1) // cell_size   # fixed value, cells in a row
+        self.rows = (world.height + cell_size - 1) // cell_size     # fixed value, cells in a column
+        self.cells = {}                                         # container, sets of turn numbers by cell number
+        self.robot_cells = []                                   # container, cell number of each robot by turn number
+        for robot in world.robots:          # stepper
+            self.add(robot.turn_number, world.get_index(robot.get_location()))
+
+
+    def get_cell(self, index):
+        """
+        Returns the number of the cell that contains the square with the given index: int
+        """
+        y, x = divmod(index, self.world.stride)
+        return (y - 1) // self.cell_size * self.columns + (x - 1) // self.cell_size
+
+
+    def add(self, number, index):
+        """
+        Adds a robot to the index. Robots must be added in turn order.
+
+        Parameter number is the turn number of the robot: int
+
+        Parameter index is the index of the square of the robot: int
+        """
+        cell = self.get_cell(index)
+        members = self.cells.get(cell)
+        if members is None:
+            members = self.cells[cell] = set()
+        members.add(number)
+        self.robot_cells.append(cell)
+
+
+    def move(self, number, index):
+        """
+        Updates the index after a robot has moved.
+
+        Parameter number is the turn number of the robot: int
+
+        Parameter index is the index of the square the robot moved to: int
+        """
+        y, x = divmod(index, self.world.stride)
+        cell = (y - 1) // self.cell_size * self.columns + (x - 1) // self.cell_size
+        old_cell = self.robot_cells[number]
+        if cell != old_cell:
+            self.robot_cells[number] = cell
+            members = self.cells[old_cell]
+            members.discard(number)
+            if not members:
+                del self.cells[old_cell]
+            members = self.cells.get(cell)
+            if members is None:
+                members = self.cells[cell] = set()
+            members.add(number)
+
+
+    def get_gap(self, coordinate, cell_coordinate):
+        """
+        Returns the distance along one axis from the given coordinate to the nearest square of the cells with the
+        given cell coordinate, zero if the coordinate is within them: int
+        """
+        low = cell_coordinate * self.cell_size
+        if coordinate < low:
+            return low - coordinate
+        high = low + self.cell_size - 1
+        if coordinate > high:
+            return coordinate - high
+        return 0
+
+
+    def robots_within(self, location, radius):
+        """
+        Returns the robots whose Manhattan distance from the given location is at most the given radius.
+
+        Parameter location is the center of the area: Coordinates
+
+        Parameter radius is the largest distance included: int
+
+        Returns the robots in turn order: list
+        """
+        x = location.get_x()
+        y = location.get_y()
+        size = self.cell_size
+        low_column = max(0, (x - radius) // size)
+        high_column = min(self.columns - 1, (x + radius) // size)
+        low_row = max(0, (y - radius) // size)
+        high_row = min(self.rows - 1, (y + radius) // size)
+        if high_column < low_column or high_row < low_row:
+            return []
+        if (high_column - low_column + 1) * (high_row - low_row + 1) > len(self.cells):
+            cells = list(self.cells)
+        else:
+            cells = [row * self.columns + column for row in range(low_row, high_row + 1)
+                     for column in range(low_column, high_column + 1)]
+        robots = self.world.robots
+        numbers = []
+        for cell in cells:                  # stepper
+            members = self.cells.get(cell)
+            if not members:
+                continue
+            row, column = divmod(cell, self.columns)
+            if self.get_gap(x, column) + self.get_gap(y, row) > radius:
+                continue
+            for number in members:          # stepper
+                robot_location = robots[number].location
+                if abs(robot_location.x - x) + abs(robot_location.y - y) <= radius:
+                    numbers.append(number)
+        numbers.sort()
+        return [robots[number] for number in numbers]
+
+
+    def nearest_robot(self, location, predicate=None):
+        """
+        Returns the robot closest to the given location by Manhattan distance, among the robots for which the
+        predicate is true. Of equally close robots the one with the lowest turn number is returned. The cells
+        are examined in rings around the cell of the location until no robot in the remaining cells can be
+        closer than the closest one found.
+
+        Parameter location is the location to search from: Coordinates
+
+        Parameter predicate is an optional function that is called with a robot and returns whether the robot
+        may be returned, e.g. to skip the robot at the location or broken robots: function
+
+        Returns the nearest robot, or None if there is no such robot: Robot
+        """
+        x = location.get_x()
+        y = location.get_y()
+        size = self.cell_size
+        column = min(max(x // size, 0), self.columns - 1)
+        row = min(max(y // size, 0), self.rows - 1)
+        robots = self.world.robots
+        best = None                 # most-recent holder, (distance, turn number) of the nearest robot found
+        ring = 0
+        while ring <= max(self.columns, self.rows):
+            if 8 * ring > len(self.cells):
+                # The rings have become larger than the occupied part of the world, so the remaining occupied
+                # cells are examined directly, nearest first.
+                cells = []
+                for cell in self.cells:     # stepper
+                    cell_row, cell_column = divmod(cell, self.columns)
+                    if max(abs(cell_column - column), abs(cell_row - row)) >= ring:
+                        cells.append((self.get_gap(x, cell_column) + self.get_gap(y, cell_row), cell))
+                cells.sort()
+            else:
+                cells = [(self.get_gap(x, cell_column) + self.get_gap(y, cell_row), cell_row * self.columns + cell_column)
+                         for cell_row, cell_column in self.get_ring(row, column, ring)]
+            for gap, cell in cells:         # stepper
+                if best is not None and gap > best[0]:
+                    continue
+                for number in self.cells.get(cell, ()):     # stepper
+                    robot = robots[number]
+                    candidate = (abs(robot.location.x - x) + abs(robot.location.y - y), number)
+                    if (best is None or candidate < best) and (predicate is None or predicate(robot)):
+                        best = candidate
+            if 8 * ring > len(self.cells):
+                break
+            ring += 1
+            # Every square of the next ring is at least this far away along one axis.
+            if best is not None and best[0] < (ring - 1) * size + 1:
+                break
+        return None if best is None else robots[best[1]]
+
+
+    def get_ring(self, row, column, ring):
+        """
+        Returns the cells of the world whose distance from the given cell is exactly the given number of cells
+        along the row or along the column, i.e. the cells on the edge of a square of cells around it.
+
+        Parameter row is the row of the center cell: int
+
+        Parameter column is the column of the center cell: int
+
+        Parameter ring is the distance in cells: int
+
+        Returns the (row, column) pairs of the cells: list
+        """
+        if ring == 0:
+            return [(row, column)]
+        cells = []
+        for cell_column in range(max(column - ring, 0), min(column + ring, self.columns - 1) + 1):   # stepper
+            for cell_row in (row - ring, row + ring):       # stepper
+                if 0 <= cell_row < self.rows:
+                    cells.append((cell_row, cell_column))
+        for cell_row in range(max(row - ring + 1, 0), min(row + ring - 1, self.rows - 1) + 1):     # stepper
+            for cell_column in (column - ring, column + ring):  # stepper
+                if 0 <= cell_column < self.columns:
+                    cells.append((cell_row, cell_column))
+        return cells
@@ -2,37 +2,51 @@ class Square():
     """
     The class Square represents a single square in a robot world.
     A square can contain either a wall or a robot or it can be empty.
+
+    A Square object does not store any state of its own. It is a lightweight
+    view of one cell of the wall and occupant layers of a robot world, and
+    robot worlds create these views only on demand (see RobotWorld.get_square).
+    A square that is not located in any robot world always contains a wall.
     """
 
-    def __init__(self, is_wall=False):
+    __slots__ = ('world', 'index')
+
+    def __init__(self, world=None, index=0):
         """
-        Creates a new square. Initially there is no robot in the square.
+        Creates a new view of a square.
 
-        Parameter is_wall_square is a boolean value stating whether there is a wall in the square or not: boolean
+        Parameter world is the robot world the square belongs to, or None for a wall square outside of any world: RobotWorld
+
+        Parameter index is the index of the square in the layers of the robot world: int
         """
-        self.robot = None     # most-recent holder (None if no robot in square)
-        self.is_wall = is_wall  # flag (one-way currently, since walls can not be removed)
+        self.world = world    # fixed value
+        self.index = index    # fixed value
 
 
     def get_robot(self):
         """
         Returns the robot in the square or None if there is no robot in the square: Robot
         """
-        return self.robot
+        if self.world is None:
+            return None
+        occupant = self.world.occupants[self.index]
+        if occupant:
+            return self.world.robots[occupant - 1]
+        return None
 
 
     def is_wall_square(self):
         """
         Returns a boolean value stating whether there is a wall in the square or not: boolean
         """
-        return self.is_wall
+        return self.world is None or self.world.walls[self.index] != 0
 
 
     def is_empty(self):
         """
         Returns a boolean value stating whether the square is empty (A square is empty if it does not contain a wall or a robot) or not: boolean
         """
-        return not self.is_wall_square() and self.robot is None
+        return self.world is not None and not self.world.walls[self.index] and not self.world.occupants[self.index]
 
 
     def set_robot(self, robot):
@@ -40,12 +54,13 @@ class Square():
         Marks the square as containing a robot, if possible.
         If the square was not empty, the method fails to do anything.
 
-        Parameter robot is the robot to be placed in this square: Robot
+        Parameter robot is the robot to be placed in this square. It must already be listed in the robot world: Robot
 
         Returns a boolean value indicating if the operation succeeded: boolean
         """
         if self.is_empty():
-            self.robot = robot
+            self.world.occupants[self.index] = robot.turn_number + 1
+            self.world.block_square(self.index)
             return True
         else:
             return False
@@ -58,19 +73,25 @@ class Square():
         Returns the robot removed from the square or None, if there was no robot: Robot
         """
         removed_robot = self.get_robot()
-        self.robot = None
+        if removed_robot is not None:
+            self.world.occupants[self.index] = 0
+            self.world.unblock_square(self.index)
         return removed_robot
 
 
     def set_wall(self):
         """
         Sets a wall in this square, if possible.
-        If the square was not empty, the method fails to do anything.
+        If the square was not empty or the walls of the world are read-only, the method fails to do anything.
 
         Returns a boolean value indicating if the operation succeeded: boolean
         """
-        if self.is_empty():
-            self.is_wall = True
+        if self.is_empty() and self.world.walls_writable:
+            self.world.walls[self.index] = 1
+            self.world.block_square(self.index)
             return True
         else:
             return False
+
+
+OUTSIDE = Square()   # the shared wall square returned for all locations outside of robot worlds
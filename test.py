@@ -1,3 +1,8 @@
+import copy
+import os
+import pickle
+import tempfile
+import threading
 import unittest
 
 from robotworld import RobotWorld
@@ -8,6 +13,22 @@ from spinbot import Spinbot
 from drunkbot import Drunkbot
 from lovebot import Lovebot
 from nosebot import Nosebot
+from homingbot import Homingbot
+from robot_brain import RobotBrain
+from drunkbot_engine import DrunkbotEngine
+from sparse_robotworld import SparseRobotWorld
+from scenarios import create_main_world
+from batch import run_batch
+from recorder import Recorder, Recording
+from events import Event
+from simulation_worker import SimulationWorker
+from flow_field import FlowFieldCache
+import renderer
+from renderer import Renderer
+import benchmark
+from scenarios import create_benchmark_world, create_navigation_world
+from navigator import Navigator, ReplanningNavigator
+import snapshot
 
 
 class Test(unittest.TestCase):
@@ -75,5 +96,696 @@ class Test(unittest.TestCase):
                         'the drunkbot collided with the nosebot, the nosebot should be broken')
 
 
+    def test_squares(self):
+        """
+        Tests the square views of the robot world.
+        """
+        self.assertTrue(self.test_world.get_square(Coordinates(2, 4)).is_wall_square(),
+                        'there should be a wall in (2, 4)')
+        self.assertTrue(self.test_world.get_square(Coordinates(5, 0)).is_wall_square(),
+                        'squares outside of the world should be walls')
+        self.assertIs(self.test_world.get_square(Coordinates(-1, 2)), self.test_world.get_square(Coordinates(2, 9)),
+                      'all squares outside of the world should be the same shared wall square')
+        self.assertIs(self.test_world.get_robot(0), self.test_world.get_square(Coordinates(4, 3)).get_robot(),
+                      'the spinbot should be in (4, 3)')
+        self.assertTrue(self.test_world.get_square(Coordinates(0, 0)).is_empty(), 'the square (0, 0) should be empty')
+        self.assertFalse(self.test_world.add_wall(Coordinates(4, 3)), 'a wall can not be added on top of a robot')
+
+
+    def test_coordinates(self):
+        """
+        Tests the equality, hashing and interning of coordinates.
+        """
+        self.assertEqual(Coordinates(1, 2), Coordinates(1, 2), 'equal coordinate pairs should be equal')
+        self.assertNotEqual(Coordinates(1, 2), Coordinates(2, 1), 'different coordinate pairs should not be equal')
+        self.assertEqual(1, len({Coordinates(1, 2), Coordinates(1, 2)}), 'equal coordinates should have equal hashes')
+        with self.assertRaises(AttributeError):
+            Coordinates(1, 2).x = 3
+        self.assertEqual(Coordinates(1, 2), pickle.loads(pickle.dumps(Coordinates(1, 2))), 'coordinates should pickle')
+        self.assertEqual(Coordinates(1, 2), copy.deepcopy(Coordinates(1, 2)), 'coordinates should copy')
+
+        location = self.test_world.get_coordinates(1, 2)
+        self.assertIs(location, self.test_world.get_coordinates(1, 2), 'coordinates should be interned')
+        self.assertIs(self.test_world.get_coordinates(2, 2), self.test_world.get_neighbor(location, Direction.EAST),
+                      'neighbors should be interned')
+        self.assertEqual(Coordinates(1, 1), self.test_world.get_neighbor(location, Direction.NORTH))
+
+
+    def test_stuck(self):
+        """
+        Tests that a robot is stuck once all of its neighbors are walls.
+        """
+        self.assertFalse(self.test_world.get_robot(0).is_stuck(), 'the spinbot should not be stuck at first')
+        self.test_world.add_wall(Coordinates(4, 2))
+        self.test_world.add_wall(Coordinates(3, 3))
+        self.assertFalse(self.test_world.get_robot(0).is_stuck(), 'the spinbot can still move south')
+        self.test_world.add_wall(Coordinates(4, 4))
+        self.assertTrue(self.test_world.get_robot(0).is_stuck(),
+                        'the spinbot should be stuck between three walls and the edge of the world')
+
+
+    def test_blocked_mask(self):
+        """
+        Tests that the blocked masks of the squares follow the walls and the robots.
+        """
+        world = self.test_world
+        self.assertEqual(0b0111, world.get_blocked_mask(world.get_index(Coordinates(4, 4))),
+                         'Bart and the border should block the corner')
+        self.assertEqual(0b1100, world.get_blocked_mask(world.get_index(Coordinates(3, 4))),
+                         'the wall and the border should block the square next to the wall')
+        world.get_robot(0).move(Direction.WEST)
+        self.assertEqual(0b0110, world.get_blocked_mask(world.get_index(Coordinates(4, 4))),
+                         'moving away should unblock the square')
+        self.assertEqual(0b1101, world.get_blocked_mask(world.get_index(Coordinates(3, 4))),
+                         'moving in should block the square')
+        computed = world.compute_blocked()
+        for index in range(len(computed)):
+            if not world.walls[index]:
+                self.assertEqual(computed[index], world.blocked[index], 'the masks should be up to date')
+
+
+    def test_active_robots(self):
+        """
+        Tests that broken and stuck robots leave the active robots and fixed ones rejoin them.
+        """
+        spinbot = self.test_world.get_robot(0)
+        self.assertEqual(1, self.test_world.get_number_of_active_robots())
+        spinbot.destroy()
+        self.assertEqual(0, self.test_world.get_number_of_active_robots(), 'a broken robot should not be active')
+        self.test_world.next_full_turn()
+        self.assertEqual(Direction.EAST, spinbot.get_facing(), 'a broken robot should not spin')
+        spinbot.fix()
+        self.test_world.next_full_turn()
+        self.assertEqual(Direction.SOUTH, spinbot.get_facing(), 'a fixed robot should spin again')
+        for location in (Coordinates(4, 2), Coordinates(3, 3), Coordinates(4, 4)):
+            self.test_world.add_wall(location)
+        self.assertEqual(0, self.test_world.get_number_of_active_robots(), 'a stuck robot should not be active')
+
+
+    def test_direction(self):
+        """
+        Tests the direction tables with both direction tuples and direction codes.
+        """
+        self.assertEqual(Direction.SOUTH, Direction.get_next_clockwise(Direction.EAST))
+        self.assertEqual(Direction.NORTH, Direction.get_next_clockwise(Direction.WEST))
+        self.assertEqual(Direction.WEST, Direction.get_next_counter_clockwise(Direction.NORTH))
+        self.assertEqual(2, Direction.get_next_clockwise(1), 'codes should rotate to codes')
+        self.assertEqual(3, Direction.get_code(Direction.WEST))
+        self.assertEqual(Direction.SOUTH, Direction.from_code(2))
+        self.assertEqual(270, Direction.get_degrees(Direction.WEST))
+        self.assertEqual(-1, Direction.get_y_step(0))
+        with self.assertRaises(ValueError):
+            Direction.get_degrees((1, 1))
+        self.assertEqual(Coordinates(2, 4), Coordinates(2, 3).get_neighbor(2), 'codes should step like tuples')
+        self.assertEqual(Coordinates(3, 3), self.test_world.get_neighbor(Coordinates(4, 3), 3))
+        robot = self.test_world.get_robot(0)
+        self.assertTrue(robot.move(0), 'robots should move in the direction of a code')
+        self.assertEqual((Coordinates(4, 2), Direction.NORTH), (robot.get_location(), robot.get_facing()))
+        robot.spin(1)
+        self.assertEqual(Direction.EAST, robot.get_facing(), 'robots should face the direction tuple of a code')
+
+
+    def test_run(self):
+        """
+        Tests running several full turns at once.
+        """
+        second_body = Robot('Homer')
+        second_body.set_brain(Drunkbot(second_body, 4522))
+        self.test_world.add_robot(second_body, Coordinates(2, 2), Direction.SOUTH)
+        reference_world = RobotWorld(5, 5)
+        reference_world.add_wall(Coordinates(2, 4))
+        reference_body = Robot('Homer')
+        reference_body.set_brain(Drunkbot(reference_body, 4522))
+        reference_world.add_robot(reference_body, Coordinates(2, 2), Direction.SOUTH)
+
+        summary = self.test_world.run(20)
+        for count in range(20):
+            reference_world.next_full_turn()
+
+        self.assertEqual(20, summary.get_turns())
+        self.assertEqual(str(reference_body.get_location()), str(second_body.get_location()),
+                         'run should move the robots like next_full_turn')
+        self.assertEqual(3, summary.get_moves())
+        self.assertEqual(1, summary.get_wall_collisions(), 'the drunkbot should collide with a wall')
+        self.assertEqual(1, summary.get_broken(), 'the drunkbot should be broken by the collision')
+
+        summary = self.test_world.run(10, stop_when=lambda world: True)
+        self.assertEqual(1, summary.get_turns(), 'the run should stop after the first full turn')
+
+
+    def test_drunkbot_engine(self):
+        """
+        Tests that the drunkbot engine gives the same results as the robot world.
+        """
+        worlds = []
+        for count in range(2):
+            world = RobotWorld(12, 12)
+            world.add_wall(Coordinates(5, 5))
+            for number in range(30):
+                body = Robot('Drunk {}'.format(number))
+                body.set_brain(Drunkbot(body, number))
+                world.add_robot(body, Coordinates(number % 12, number // 12 * 4), Direction.EAST)
+            world.next_robot_turn()
+            worlds.append(world)
+
+        reference_summary = worlds[0].run(30)
+        summary = DrunkbotEngine(worlds[1]).run(30)
+        worlds[0].run(5)
+        worlds[1].run(5)
+
+        self.assertEqual(str(reference_summary), str(summary))
+        for reference, robot in zip(worlds[0].get_robots(), worlds[1].get_robots()):
+            self.assertEqual(str(reference), str(robot))
+            self.assertEqual(reference.get_facing(), robot.get_facing())
+            self.assertEqual(reference.is_broken(), robot.is_broken())
+        self.assertEqual(worlds[0].occupants, worlds[1].occupants)
+        with self.assertRaises(ValueError):
+            DrunkbotEngine(self.test_world)
+
+
+    def test_snapshot(self):
+        """
+        Tests that a world restored from a snapshot continues exactly like the original one.
+        """
+        homer = Robot('Homer')
+        homer.set_brain(Drunkbot(homer, 4522))
+        self.test_world.add_robot(homer, Coordinates(2, 2), Direction.SOUTH)
+        lover = Robot('Marge')
+        lover.set_brain(Lovebot(lover, homer))
+        self.test_world.add_robot(lover, Coordinates(0, 0), Direction.EAST)
+        self.test_world.next_full_turn()
+        self.test_world.next_robot_turn()
+
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.test_world.save_snapshot(path)
+            restored = RobotWorld.load_snapshot(path)
+        finally:
+            os.remove(path)
+
+        self.assertEqual(self.test_world.turn, restored.turn, 'the turn should be restored')
+        self.assertIs(restored.get_robot(1), restored.get_robot(2).get_brain().get_beloved(),
+                      'the beloved should be restored')
+        self.assertEqual(homer.get_brain().random.getstate(), restored.get_robot(1).get_brain().random.getstate(),
+                         'the random generator of the drunkbot should be restored')
+        with self.assertRaises(ValueError):
+            snapshot.dumps(SparseRobotWorld(10, 10))
+        for count in range(10):
+            self.test_world.next_full_turn()
+            restored.next_full_turn()
+        for original, robot in zip(self.test_world.get_robots(), restored.get_robots()):
+            self.assertEqual(str(original), str(robot))
+            self.assertEqual(original.get_facing(), robot.get_facing())
+            self.assertEqual(original.is_broken(), robot.is_broken())
+
+
+    def test_map(self):
+        """
+        Tests memory-mapped world maps.
+        """
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.test_world.add_wall(Coordinates(0, 1))
+            self.test_world.save_map(path)
+            world = RobotWorld.open_map(path)
+            self.assertEqual(5, world.get_width())
+            self.assertTrue(world.get_square(Coordinates(0, 1)).is_wall_square(), 'the walls should be mapped')
+            self.assertTrue(world.add_wall(Coordinates(1, 0)), 'walls can be added copy-on-write')
+            body = Robot('Stuck')
+            body.set_brain(Spinbot(body))
+            world.add_robot(body, Coordinates(0, 0), Direction.EAST)
+            self.assertTrue(body.is_stuck(), 'the adjacent wall counts should be mapped too')
+
+            read_only = RobotWorld.open_map(path, copy_on_write=False)
+            self.assertFalse(read_only.get_square(Coordinates(1, 0)).is_wall_square(),
+                             'walls added copy-on-write should not change the file')
+            self.assertFalse(read_only.add_wall(Coordinates(1, 0)), 'walls can not be added to read-only maps')
+            corner = read_only.get_index(Coordinates(0, 0))
+            self.assertEqual(13, read_only.get_blocked_mask(corner), 'the blocked masks should be mapped without robots')
+            self.assertTrue(read_only.add_robot(Robot('Blocker'), Coordinates(1, 0), Direction.EAST))
+            self.assertEqual(15, read_only.get_blocked_mask(corner), 'robots should block read-only maps too')
+            del world, read_only
+        finally:
+            os.remove(path)
+
+
+    def test_sparse_world(self):
+        """
+        Tests that a huge sparse world only stores its contents and works like an ordinary world.
+        """
+        world = SparseRobotWorld(100000, 100000)
+        world.add_wall(Coordinates(99997, 99999))
+        nose = Robot('Speedy Gonzales')
+        nose.set_brain(Nosebot(nose))
+        world.add_robot(nose, Coordinates(99999, 99999), Direction.WEST)
+        homer = Robot('Homer')
+        homer.set_brain(Drunkbot(homer, 4522))
+        world.add_robot(homer, Coordinates(50000, 50000), Direction.SOUTH)
+
+        self.assertTrue(world.get_square(Coordinates(99997, 99999)).is_wall_square())
+        self.assertTrue(world.get_square(Coordinates(100000, 5)).is_wall_square())
+        self.assertFalse(world.get_square(Coordinates(5, 5)).is_wall_square())
+        world.run(2)
+        self.assertEqual('(99998, 99998)', str(nose.get_location()), 'the nosebot should hug the wall and the edge')
+        self.assertEqual(1, len(world.walls), 'only the added wall should be stored')
+        self.assertEqual(2, len(world.occupants), 'only the squares of the robots should be stored')
+        world.recount_blocked()
+        self.assertEqual(0b0110, world.get_blocked_mask(world.get_index(Coordinates(99999, 99999))),
+                         'recounting should keep the masks')
+        with self.assertRaises(ValueError):
+            world.save_snapshot(os.path.join(tempfile.gettempdir(), 'sparse.snapshot'))
+        with self.assertRaises(ValueError):
+            world.get_distance_field(Coordinates(0, 0))
+
+
+    def test_batch(self):
+        """
+        Tests that batch results do not depend on the number of workers.
+        """
+        serial = list(run_batch(create_main_world, range(4), 50, workers=1))
+        parallel = list(run_batch(create_main_world, range(4), 50, workers=2))
+        self.assertEqual([0, 1, 2, 3], [result.get_parameter() for result in parallel],
+                         'the results should be in the order of the parameters')
+        for expected, result in zip(serial, parallel):
+            self.assertEqual(expected.get_positions(), result.get_positions())
+            self.assertEqual(expected.get_broken(), result.get_broken())
+            self.assertEqual(str(expected.get_summary()), str(result.get_summary()))
+
+
+    def test_recorder(self):
+        """
+        Tests recording a world and restoring it from the recording.
+        """
+        homer = Robot('Homer')
+        homer.set_brain(Drunkbot(homer, 4522))
+        self.test_world.add_robot(homer, Coordinates(2, 2), Direction.SOUTH)
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            first_recorder = Recorder(self.test_world, path, keyframe_interval=4)
+            self.test_world.run(10)
+            first_recorder.close()
+            recording = Recording(path)
+            self.assertEqual([0, 4, 8], recording.get_keyframe_turns())
+            self.assertEqual(9, recording.get_last_turn())
+
+            events = list(recording.iter_events())
+            self.assertEqual((Event.SPIN, Direction.EAST, Direction.SOUTH),
+                             (events[0].kind, events[0].source, events[0].target), 'the spinbot should spin first')
+            collisions = [event for event in events if event.kind == Event.WALL_COLLISION]
+            self.assertEqual(1, len(collisions), 'the drunkbot should collide with a wall once')
+            self.assertEqual(Coordinates(2, 4), collisions[0].target)
+
+            world = recording.load_world(6)
+            self.assertEqual(6, world.full_turns)
+            self.assertEqual(sum(1 for event in events if event.kind == Event.MOVE and event.turn < 6), world.moves)
+            self.assertEqual(3, len(recording.chunks), 'the events should be written in a chunk per keyframe')
+            self.assertEqual([event.turn for event in events if 5 <= event.turn < 7],
+                             [event.turn for event in recording.iter_events(5, 7)])
+            recording.close()
+
+            with self.assertRaises(RuntimeError):
+                with Recorder(world, path, keyframe_interval=100) as second_recorder:
+                    world.run(3)
+                    raise RuntimeError('the simulation failed')
+            self.assertTrue(second_recorder.file.closed, 'the recorder should be closed by the with statement')
+            self.assertIsNone(world.event_log, 'the recorder should stop recording')
+            with Recording(path) as recording:
+                self.assertEqual(8, recording.get_last_turn(), 'the events kept in memory should be written')
+
+            thoughtless = Robot('Thoughtless')
+            thoughtless.set_brain(RobotBrain(thoughtless))
+            world.add_robot(thoughtless, Coordinates(0, 0), Direction.NORTH)
+            with self.assertRaises(ValueError):
+                Recorder(world, path)
+            self.assertEqual([], [thread for thread in threading.enumerate() if thread.name == 'Recorder'],
+                             'a recorder that fails to start should leave no writer thread behind')
+            self.assertIsNone(world.event_log, 'a recorder that fails to start should not record')
+        finally:
+            os.remove(path)
+
+
+    def test_iter_events(self):
+        """
+        Tests the lazy event stream of a world.
+        """
+        fifth_body = Robot('Speedy Gonzales')
+        fifth_body.set_brain(Nosebot(fifth_body))
+        self.test_world.add_robot(fifth_body, Coordinates(4, 4), Direction.WEST)
+
+        events = self.test_world.iter_events()
+        first = next(events)
+        self.assertEqual((0, 0, Event.SPIN), (first.turn, first.robot, first.kind))
+        second = next(events)
+        self.assertEqual((0, 1, Event.MOVE, Coordinates(4, 4), Coordinates(3, 4)),
+                         (second.turn, second.robot, second.kind, second.source, second.target))
+        self.assertEqual(1, self.test_world.full_turns, 'only the first turn should have been run')
+        events.close()
+        self.assertIsNone(self.test_world.event_log, 'closing the stream should stop recording')
+        kinds = [event.kind for event in self.test_world.iter_events(2)]
+        self.assertEqual([Event.SPIN, Event.SPIN, Event.MOVE, Event.SPIN, Event.MOVE], kinds,
+                         'the nosebot should turn at the wall before moving')
+
+        world = RobotWorld(3, 3)
+        cornered = Robot('Cornered')
+        cornered.set_brain(Nosebot(cornered))
+        world.add_robot(cornered, Coordinates(0, 0), Direction.WEST)
+        events = [(event.kind, event.target) for event in world.iter_events(1)]
+        self.assertEqual([(Event.SPIN, Direction.NORTH), (Event.SPIN, Direction.EAST), (Event.MOVE, Coordinates(1, 0))],
+                         events, 'the nosebot should record a spin for each quarter turn')
+
+
+    def test_changed_robots(self):
+        """
+        Tests tracking the robots that have changed.
+        """
+        bart = self.test_world.get_robot(0)
+        idle = Robot('Idle')
+        self.test_world.add_robot(idle, Coordinates(0, 0), Direction.NORTH)
+        self.assertEqual([bart, idle], self.test_world.get_changed_robots(), 'all robots should change at first')
+
+        self.test_world.next_full_turn()
+        self.assertEqual([bart], self.test_world.get_changed_robots(), 'only the spinbot should have changed')
+        self.assertEqual([], self.test_world.get_changed_robots(), 'nothing should have changed')
+
+        idle.destroy()
+        newcomer = Robot('Newcomer')
+        self.test_world.add_robot(newcomer, Coordinates(0, 4), Direction.NORTH)
+        self.assertEqual([idle, newcomer], self.test_world.get_changed_robots(),
+                         'changes between turns should be tracked')
+        self.test_world.next_full_turn()
+        self.assertEqual([bart], self.test_world.get_changed_robots(), 'changes should not be reported twice')
+
+        self.test_world.add_wall(Coordinates(0, 3))
+        self.test_world.add_wall(Coordinates(1, 4))
+        self.assertEqual([newcomer], self.test_world.get_changed_robots(), 'getting stuck should be tracked')
+
+
+    def test_simulation_worker(self):
+        """
+        Tests simulating a world in a background thread.
+        """
+        worker = SimulationWorker(self.test_world)
+        try:
+            frame, changed = worker.take_frame()
+            self.assertEqual((0, {0}), (frame.full_turns, changed), 'the first frame should show every robot')
+            worker.step()
+            self.assertEqual(1, self.test_world.full_turns, 'a paused worker should take single steps')
+            worker.play()
+            self.assertIsNotNone(worker.wait_for_frame(100, 10), 'the worker should publish a frame after each turn')
+            worker.pause()
+            with worker.lock:
+                turns = self.test_world.full_turns
+            worker.step()
+            self.assertFalse(worker.is_playing(), 'the worker should stay paused')
+            self.assertIsNone(worker.wait_for_frame(turns + 2, 0.05), 'a paused worker should only take single steps')
+            frame, changed = worker.take_frame()
+            self.assertEqual(turns + 1, frame.full_turns, 'the frame should show the latest turn')
+            self.assertEqual({0}, changed, 'the spinbot should have changed')
+            self.assertEqual((Direction.get_code(Direction.EAST) + turns + 1) % 4, frame.facings[0],
+                             'the spinbot should spin once per turn')
+            self.assertEqual(Direction.VALUES[frame.facings[0]], self.test_world.get_robot(0).get_facing(),
+                             'the frame should match the world')
+            self.assertEqual((4, 3, 0), (frame.xs[0], frame.ys[0], frame.broken[0]), 'the frame should match the world')
+            worker.fix_robot(self.test_world.get_robot(0))
+            self.assertEqual(set(), worker.take_frame()[1], 'fixing a working robot should not change it')
+            with worker.lock:
+                self.test_world.get_robot(0).destroy()
+                worker.update_frame()
+            frame, changed = worker.take_frame()
+            self.assertEqual((1, {0}), (frame.broken[0], changed), 'the frame should show the broken robot')
+            worker.fix_robot(self.test_world.get_robot(0))
+            self.assertEqual(0, worker.take_frame()[0].broken[0], 'fixing the robot should publish a new frame')
+            self.assertEqual(1, frame.broken[0], 'a published frame should never change')
+            self.assertIs(frame.robots, worker.take_frame()[0].robots, 'the robots should be shared while none are added')
+        finally:
+            worker.stop()
+        self.assertFalse(worker.thread.is_alive(), 'the worker thread should have stopped')
+
+
+    def test_renderer(self):
+        """
+        Tests drawing a world without Qt.
+        """
+        drawing = Renderer(self.test_world, 10)
+        image = drawing.render()
+        self.assertEqual(50 * 50, len(image), 'the image should have one byte per pixel')
+        self.assertEqual(renderer.WALL, image[40 * 50 + 20], 'the wall should be drawn')
+        self.assertEqual(renderer.FLOOR, image[0], 'the floor should be drawn')
+        # Bart faces east, so the tip of his triangle is at the right edge of his square
+        tip = (30 + 5) * 50 + 40 + 8
+        self.assertEqual(renderer.WORKING, image[tip], 'the tip should point east')
+        self.assertEqual(renderer.FLOOR, image[(30 + 1) * 50 + 40 + 8], 'the triangle should be rotated')
+        self.test_world.get_robot(0).destroy()
+        self.assertEqual(renderer.BROKEN, drawing.render()[tip], 'broken robots should be red')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'world.gif')
+            drawing.save_gif(path, 5)
+            with open(path, 'rb') as file:
+                data = file.read()
+            self.assertTrue(data.startswith(b'GIF89a') and data.endswith(b';'), 'the GIF should be complete')
+            self.assertEqual(5, data.count(b'\x21\xf9\x04'), 'the GIF should have a frame for each turn')
+            drawing.save_frames(os.path.join(directory, 'frame{}.png'), 2)
+            with open(os.path.join(directory, 'frame1.png'), 'rb') as file:
+                self.assertEqual(renderer.PNG_SIGNATURE, file.read(8), 'the frames should be PNG images')
+
+
+    def test_benchmark(self):
+        """
+        Tests running a benchmark scenario and comparing its results to saved ones.
+        """
+        result = benchmark.run_benchmark('mixed', 10, True, turns=2)
+        self.assertEqual('mixed-10-walled', result['scenario'], 'the scenario should be named')
+        self.assertEqual(2, result['turns'], 'the given number of turns should be run')
+        self.assertGreater(result['peak_memory_bytes'], 0, 'the memory use should be measured')
+        edge_result = benchmark.benchmark_edge_nosebots(10, 2)
+        self.assertEqual(('edge-nosebots-10', 20), (edge_result['scenario'], edge_result['robots']),
+                         'the edge scenario should be named')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            benchmark.save_results([result, edge_result], path)
+            with open(os.devnull, 'w') as output:
+                ratios = benchmark.compare_results([result, edge_result], path, output)
+        self.assertEqual({'mixed-10-walled': 1.0, 'edge-nosebots-10': 1.0}, ratios, 'equal results should compare equal')
+        engine_result, = benchmark.benchmark_drunkbot_engine(((20, 5),), walled=True)
+        self.assertEqual((20, 5), (engine_result['robots'], engine_result['turns']), 'the case should be run')
+        self.assertGreater(engine_result['speedup'], 0, 'both runs should be timed')
+
+
+    def test_profiling(self):
+        """
+        Tests that profiling measures the turns without changing them.
+        """
+        profiled = create_benchmark_world(50, 'mixed', True)
+        plain = create_benchmark_world(50, 'mixed', True)
+        self.assertIsNone(profiled.get_profile_report(), 'a new world should not be profiled')
+        profiled.start_profiling()
+        summary = profiled.run(20)
+        self.assertEqual(str(plain.run(20)), str(summary), 'profiling should not change the run')
+        report = profiled.stop_profiling()
+        self.assertEqual(20, report['full_turns'], 'every full turn should be measured')
+        self.assertEqual(summary.get_moves(), report['moves'], 'every move should be counted')
+        self.assertEqual(summary.get_collisions(), report['wall_collisions'] + report['robot_collisions'],
+                         'every collision should be counted')
+        self.assertEqual(report['stuck_checks'], sum(brain['calls'] for brain in report['brains'].values()),
+                         'every turn should start with a stuck check')
+        self.assertEqual({'Spinbot', 'Nosebot', 'Drunkbot', 'Lovebot'}, set(report['brains']),
+                         'every brain class should be measured')
+        self.assertEqual(0, report['brains']['Spinbot']['failed_moves'], 'spinning is not a failed move')
+        self.assertEqual(report['wall_collisions'] + report['robot_collisions'], report['failed_moves'])
+        self.assertNotIn('next_full_turn', vars(profiled), 'profiling should not replace methods')
+        self.assertIsNone(profiled.get_profile_report(), 'profiling should have stopped')
+
+
+    def test_homingbot(self):
+        """
+        Tests that homingbots find their way around walls and share one distance field.
+        """
+        world = RobotWorld(7, 7)
+        for y in range(6):
+            world.add_wall(Coordinates(3, y))
+        target = Robot('Target')
+        target.set_brain(Spinbot(target))
+        world.add_robot(target, Coordinates(6, 0), Direction.NORTH)
+        chasers = []
+        for y in range(4):
+            chaser = Robot('Chaser {}'.format(y))
+            chaser.set_brain(Homingbot(chaser, target))
+            world.add_robot(chaser, Coordinates(0, y), Direction.EAST)
+            chasers.append(chaser)
+
+        world.run(30)
+        self.assertEqual(0, world.breakdowns, 'homingbots should not collide with anything')
+        self.assertEqual(1, world.flow_fields.get_searches(), 'the chasers should share the field of the target')
+        field = world.get_distance_field(target.get_location())
+        distances = sorted(field[world.get_index(chaser.get_location())] for chaser in chasers)
+        self.assertEqual([1, 2, 3, 4], distances, 'the chasers should have queued up next to the target')
+        self.assertEqual(2, FlowFieldCache(world, cells=2 * len(world.walls) + 1).size,
+                         'the cache should keep only as many fields as fit in its cells')
+        restored = snapshot.loads(snapshot.dumps(world))
+        self.assertIs(restored.get_robot(0), restored.get_robot(1).get_brain().get_beloved(),
+                      'homingbots should be restored from snapshots')
+        self.assertIs(Homingbot, type(restored.get_robot(1).get_brain()))
+
+        world.add_wall(Coordinates(3, 6))
+        self.assertEqual(-1, world.get_distance_field(target.get_location())[world.get_index(Coordinates(0, 0))],
+                         'adding a wall should invalidate the fields')
+
+
+    def test_navigator(self):
+        """
+        Tests that navigators follow shortest paths on walled maps and repair them around robots.
+        """
+        for seed in range(3):
+            for brain_class in (Navigator, ReplanningNavigator):
+                world, body, distance = create_navigation_world(20, brain_class, 0, seed)
+                world.run(distance)
+                self.assertEqual(body.get_brain().get_goal(), body.get_location(),
+                                 'the navigator should arrive along a shortest path')
+
+        # Two routes around a block of walls: the short one along the top, the long one along the bottom
+        world = RobotWorld(7, 4)
+        for x in range(1, 6):
+            for y in range(1, 3):
+                world.add_wall(Coordinates(x, y))
+        body = Robot('Navigator')
+        body.set_brain(Navigator(body, Coordinates(6, 0)))
+        world.add_robot(body, Coordinates(0, 0), Direction.EAST)
+        world.next_full_turn()
+        self.assertEqual(Coordinates(1, 0), body.get_location(), 'the navigator should take the short route')
+        blocker = Robot('Blocker')
+        blocker.set_brain(Spinbot(blocker))
+        world.add_robot(blocker, Coordinates(2, 0), Direction.EAST)
+        world.next_full_turn()
+        self.assertEqual(Coordinates(0, 0), body.get_location(), 'the navigator should turn back')
+        expansions = body.get_brain().get_expansions()
+        world.run(12)
+        self.assertEqual(Coordinates(6, 0), body.get_location(), 'the navigator should arrive by the long route')
+        self.assertEqual(expansions, body.get_brain().get_expansions(),
+                         'turns in which nothing changes should not search at all')
+        self.assertEqual(0, world.breakdowns, 'the navigator should not collide with anything')
+
+        # The blocker of the short route steps aside into a pocket, and another robot then blocks the long route
+        for brain_class in (Navigator, ReplanningNavigator):
+            world = RobotWorld(7, 5)
+            for x in range(1, 6):
+                for y in range(1, 4):
+                    if (x, y) != (2, 1):
+                        world.add_wall(Coordinates(x, y))
+            body = Robot('Navigator')
+            body.set_brain(brain_class(body, Coordinates(6, 1)))
+            world.add_robot(body, Coordinates(0, 2), Direction.EAST)
+            world.run(3)
+            self.assertEqual(Coordinates(1, 0), body.get_location(), 'the navigator should take the short route')
+            blocker = Robot('Blocker')
+            blocker.set_brain(Spinbot(blocker))
+            world.add_robot(blocker, Coordinates(2, 0), Direction.EAST)
+            world.next_full_turn()
+            self.assertEqual(Coordinates(0, 0), body.get_location(), 'the navigator should turn back')
+            blocker.move(Direction.SOUTH)
+            second = Robot('Second blocker')
+            second.set_brain(Spinbot(second))
+            world.add_robot(second, Coordinates(3, 4), Direction.EAST)
+            world.run(Navigator.MEMORY + 25)
+            self.assertEqual(Coordinates(6, 1), body.get_location(),
+                             'the navigator should forget the blocker that left and take the short route')
+            self.assertEqual(0, world.breakdowns, 'the navigator should not collide with anything')
+
+        for brain_class in (Navigator, ReplanningNavigator):
+            world, body, distance = create_navigation_world(40, brain_class, 150, 2)
+            world.run(30)
+            restored = snapshot.loads(snapshot.dumps(world))
+            self.assertEqual(body.get_brain().obstacles, restored.get_robot(body.turn_number).get_brain().obstacles)
+            world.run(40)
+            restored.run(40)
+            self.assertEqual([(robot.get_location(), robot.get_facing()) for robot in world.get_robots()],
+                             [(robot.get_location(), robot.get_facing()) for robot in restored.get_robots()],
+                             'a restored navigator should take the same steps')
+
+
+    def test_spatial_index(self):
+        """
+        Tests that the robots near a location are found correctly as the robots are added and move, also when
+        the world is run with the drunkbot engine.
+        """
+        def distance(robot, location):
+            return abs(robot.get_location().get_x() - location.get_x()) + abs(robot.get_location().get_y() - location.get_y())
+
+        for brains in ('mixed', 'drunkbot'):
+            world = create_benchmark_world(200, brains, walled=True, seed=1)
+            self.assertEqual([], world.robots_within(Coordinates(-10, -10), 5))
+            newcomer = Robot('Newcomer')
+            newcomer.set_brain(Drunkbot(newcomer, 5))
+            empty = next(Coordinates(x, y) for y in range(world.get_height()) for x in range(world.get_width())
+                         if world.get_square(Coordinates(x, y)).is_empty())
+            world.add_robot(newcomer, empty, Direction.NORTH)
+            self.assertIs(newcomer, world.nearest_robot(empty), 'added robots should be indexed')
+            for count in range(5):          # stepper
+                if brains == 'drunkbot' and count % 2:
+                    DrunkbotEngine(world).run(4)
+                else:
+                    world.run(4)
+                for location in (Coordinates(0, 0), Coordinates(13, 7), Coordinates(world.get_width() - 1, 20)):
+                    expected = [robot for robot in world.get_robots() if distance(robot, location) <= 6]
+                    self.assertEqual(expected, world.robots_within(location, 6))
+                    intact = [robot for robot in world.get_robots() if not robot.is_broken()]
+                    nearest = min(intact, key=lambda robot: (distance(robot, location), robot.turn_number))
+                    self.assertIs(nearest, world.nearest_robot(location, lambda robot: not robot.is_broken()))
+
+        world = SparseRobotWorld(100000, 100000)
+        for x, y in ((5, 5), (50000, 50000), (99999, 0)):
+            robot = Robot('Far')
+            robot.set_brain(Spinbot(robot))
+            world.add_robot(robot, Coordinates(x, y), Direction.NORTH)
+        self.assertEqual('(99999, 0)', str(world.nearest_robot(Coordinates(80000, 10)).get_location()))
+        self.assertEqual(2, len(world.robots_within(Coordinates(0, 0), 99999)))
+        self.assertIsNone(world.nearest_robot(Coordinates(0, 0), lambda robot: False))
+
+
+    def test_rectangle_counts(self):
+        """
+        Tests that the walls and robots in rectangles are counted correctly as walls and robots are added and
+        the robots move, also when the world is run with the drunkbot engine and in a sparse world.
+        """
+        world = create_benchmark_world(100, 'drunkbot', walled=True, seed=2)
+        corner = Coordinates(world.get_width() - 1, world.get_height() - 1)
+        self.assertEqual(world.get_number_of_robots(), world.count_robots(Coordinates(0, 0), corner))
+        walls = world.count_walls(Coordinates(0, 0), corner)
+        self.assertEqual(walls, world.count_walls(Coordinates(-5, 100), Coordinates(100, -5)),
+                         'the rectangle should be clipped to the world and its corners may be given in any order')
+        self.assertEqual(0, world.count_walls(Coordinates(-1, -1), Coordinates(-1, 9)), 'the border is not counted')
+        empty = next(Coordinates(x, 0) for x in range(world.get_width()) if world.get_square(Coordinates(x, 0)).is_empty())
+        world.add_wall(empty)
+        self.assertEqual(walls + 1, world.count_walls(Coordinates(0, 0), corner))
+        self.assertEqual(1, world.count_walls(empty, empty))
+        for count in range(4):          # stepper
+            if count % 2:
+                DrunkbotEngine(world).run(3)
+            else:
+                world.run(3)
+            for first, second in ((Coordinates(0, 0), Coordinates(7, 11)), (Coordinates(3, 4), Coordinates(15, 9))):
+                expected = [robot for robot in world.get_robots()
+                            if first.get_x() <= robot.get_location().get_x() <= second.get_x()
+                            and first.get_y() <= robot.get_location().get_y() <= second.get_y()]
+                self.assertEqual(len(expected), world.count_robots(first, second))
+
+        world = SparseRobotWorld(100000, 100000)
+        world.add_wall(Coordinates(5, 99999))
+        world.count_walls(Coordinates(0, 0), Coordinates(0, 0))
+        world.add_wall(Coordinates(70000, 3))
+        homer = Robot('Homer')
+        homer.set_brain(Spinbot(homer))
+        world.add_robot(homer, Coordinates(50000, 50000), Direction.SOUTH)
+        self.assertEqual(1, world.count_robots(Coordinates(0, 0), Coordinates(50000, 50000)))
+        homer.move(Direction.EAST)
+        self.assertEqual(0, world.count_robots(Coordinates(0, 0), Coordinates(50000, 50000)))
+        self.assertEqual(2, world.count_walls(Coordinates(0, 0), Coordinates(99999, 99999)))
+        self.assertEqual(1, world.count_walls(Coordinates(0, 0), Coordinates(69999, 99999)))
+        self.assertLess(len(world.robot_counts.tree), 1000, 'only the entries of the robot should be stored')
+
+
 if __name__ == "__main__":
     unittest.main()
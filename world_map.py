@@ -0,0 +1,73 @@
+import mmap
+import struct
+
+
+MAGIC = b'RWMAP\x00'
+VERSION = 2
+HEADER = struct.Struct('<6sHII')    # magic, version, width, height
+HEADER_SIZE = 64                    # size of the header including padding
+
+
+def save_map(world, path):
+    """
+    Saves the wall layers of the given world in a map file. The file starts with a header of HEADER_SIZE bytes
+    containing the format version and the dimensions of the world. The header is followed by the wall layer,
+    the layer of adjacent wall counts and the blocked masks of the squares as if there were no robots, all
+    including the border of the world, one byte per square.
+
+    Parameter world is the world whose walls are saved: RobotWorld
+
+    Parameter path is the name of the file: string
+    """
+    header = HEADER.pack(MAGIC, VERSION, world.width, world.height)
+    with open(path, 'wb') as file:
+        file.write(header + bytes(HEADER_SIZE - len(header)))
+        file.write(world.walls)
+        file.write(world.adjacent_walls)
+        file.write(world.compute_blocked(robots=False))
+
+
+def open_map(path, copy_on_write=True):
+    """
+    Creates a new world whose wall layers are views of a memory-mapped map file saved with save_map. Neither
+    the walls nor the occupants of the world are initialised up front, so the time it takes does not depend on
+    the size of the map.
+
+    Parameter path is the name of the file: string
+
+    Parameter copy_on_write states whether the file is mapped copy-on-write, so that walls can be added to the
+    world without changing the file. Otherwise the file is mapped read-only and add_wall always fails: boolean
+
+    Returns the new world: RobotWorld
+
+    Raises ValueError if the file is not a map or has an unsupported format version.
+    """
+    from robotworld import RobotWorld
+
+    with open(path, 'rb') as file:
+        memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY if copy_on_write else mmap.ACCESS_READ)
+    if len(memory) < HEADER_SIZE:
+        raise ValueError('{} is not a robot world map'.format(path))
+    magic, version, width, height = HEADER.unpack_from(memory)
+    if magic != MAGIC:
+        raise ValueError('{} is not a robot world map'.format(path))
+    if version != VERSION:
+        raise ValueError('unsupported map version {}'.format(version))
+    area = (width + 2) * (height + 2)
+    if len(memory) != HEADER_SIZE + 3 * area:
+        raise ValueError('{} is not a complete robot world map'.format(path))
+    view = memoryview(memory)
+    walls = view[HEADER_SIZE:HEADER_SIZE + area]
+    adjacent_walls = view[HEADER_SIZE + area:HEADER_SIZE + 2 * area]
+    if copy_on_write:
+        blocked = view[HEADER_SIZE + 2 * area:]
+    else:
+        # The blocked masks change as robots move, so they are mapped copy-on-write even if the walls are not.
+        with open(path, 'rb') as file:
+            blocked = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY))[HEADER_SIZE + 2 * area:]
+    # The occupant layer is anonymous memory, which the operating system only allocates as it is used.
+    occupants = memoryview(mmap.mmap(-1, 8 * area)).cast('q')
+    world = RobotWorld(width, height, walls, adjacent_walls, occupants, blocked)
+    world.walls_writable = copy_on_write
+    return world
+